@@ -0,0 +1,152 @@
+import argparse
+import json
+import logging
+import os
+import platform
+import shutil
+import tempfile
+import time
+import tracemalloc
+
+import pandas as pd
+import streamlit as st
+
+import graphs
+from graphs import (
+    AMAZON_SALES_FILE, INTERNATIONAL_SALES_FILE, STOCK_REPORT_FILE,
+    PRODUCT_INFO_2021_FILE, PRODUCT_INFO_2022_FILE, columnar_path
+)
+
+# Headless benchmarks for the dashboard's data work. Each stage calls
+# load_data() or one tab's render function outside a Streamlit session, where
+# st.* calls are no-ops and widgets return their defaults, so what is timed is
+# the loading, aggregation and figure preparation behind that tab rather than
+# chart rendering in a browser.
+#
+# Fact tables (Amazon orders, international sales) are replicated to reach
+# each scale; stock and product tables stay at 1x so joins keep their shape.
+#
+#   python benchmarks.py --scales 1 10 100 --output benchmark_results.json
+
+FACT_FILES = [AMAZON_SALES_FILE, INTERNATIONAL_SALES_FILE]
+DIMENSION_FILES = [STOCK_REPORT_FILE, PRODUCT_INFO_2021_FILE, PRODUCT_INFO_2022_FILE]
+
+STAGES = {
+    'load_data': lambda: graphs.load_data(),
+    'sales_overview (KPIs, heatmaps)': lambda: graphs.render_sales_overview(graphs.load_data()),
+    'product_analysis/stock_analysis': graphs.render_stock_analysis,
+    'product_analysis/state_analytics': graphs.render_state_analytics,
+    'product_analysis/city_analytics': graphs.render_city_analytics,
+    'product_analysis/promotion_analysis': graphs.render_promotion_analysis,
+    'product_analysis/order_shipping': graphs.render_order_shipping,
+    'product_analysis/b2b_analysis': graphs.render_b2b_analysis,
+    'product_analysis/product_performance': graphs.render_product_performance,
+    'product_analysis/time_series': graphs.render_time_series,
+    'inventory_stock (low stock, overstock)': graphs.render_inventory_stock,
+    'product_returns (return rates)': graphs.render_product_returns,
+    'stock_returns_correlation (correlation matrix)': graphs.render_stock_returns_correlation,
+    'customer_insights': graphs.render_customer_insights,
+    'profit_margin_analysis (YoY comparison)': graphs.render_profit_margin_analysis
+}
+
+# Tabs report failures through st.error instead of raising; collect them so a
+# broken stage is not mistaken for a fast one
+errors = []
+
+def record_error(body, *args, **kwargs):
+    errors.append(str(body))
+
+def quiet_streamlit():
+    for name in list(logging.root.manager.loggerDict):
+        if name.startswith('streamlit'):
+            logging.getLogger(name).setLevel(logging.ERROR)
+
+# Write a copy of the datasets with every fact table repeated `scale` times
+def build_scaled_dataset(source_dir, target_dir, scale):
+    for name in FACT_FILES:
+        df = pd.read_csv(os.path.join(source_dir, name))
+        scaled = pd.concat([df] * scale, ignore_index=True)
+        scaled.to_csv(os.path.join(target_dir, name), index=False)
+        if os.path.exists(os.path.join(source_dir, columnar_path(name))):
+            scaled.to_parquet(os.path.join(target_dir, columnar_path(name)), index=False, compression='zstd')
+    for name in DIMENSION_FILES:
+        for path in (name, columnar_path(name)):
+            if os.path.isfile(os.path.join(source_dir, path)):
+                shutil.copy2(os.path.join(source_dir, path), os.path.join(target_dir, path))
+
+def dataset_rows(data_dir):
+    return {
+        name: int(sum(1 for _ in open(os.path.join(data_dir, name), encoding='utf-8', errors='ignore')) - 1)
+        for name in FACT_FILES + DIMENSION_FILES
+        if os.path.exists(os.path.join(data_dir, name))
+    }
+
+# Time one stage; cold runs start from empty caches, warm runs reuse them
+def measure(stage, cold):
+    if cold:
+        st.cache_resource.clear()
+        st.cache_data.clear()
+    del errors[:]
+    tracemalloc.start()
+    start = time.perf_counter()
+    stage()
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {'seconds': round(elapsed, 4), 'peak_mb': round(peak / 1024 ** 2, 2), 'errors': list(errors)}
+
+def run_scale(data_dir, scale, repeat):
+    cwd = os.getcwd()
+    os.chdir(data_dir)
+    try:
+        results = {'scale': scale, 'rows': dataset_rows(data_dir), 'stages': {}}
+        for name, stage in STAGES.items():
+            cold = [measure(stage, cold=True) for _ in range(repeat)]
+            warm = [measure(stage, cold=False) for _ in range(repeat)]
+            results['stages'][name] = {
+                'cold': min(cold, key=lambda r: r['seconds']),
+                'warm': min(warm, key=lambda r: r['seconds'])
+            }
+            print(f"  {name:<50} cold {results['stages'][name]['cold']['seconds']:8.3f}s "
+                  f"{results['stages'][name]['cold']['peak_mb']:9.1f} MB | "
+                  f"warm {results['stages'][name]['warm']['seconds']:8.3f}s")
+        return results
+    finally:
+        os.chdir(cwd)
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the dashboard's data preparation per tab")
+    parser.add_argument('--data-dir', default='.', help="directory holding the cleaned datasets")
+    parser.add_argument('--scales', type=int, nargs='+', default=[1, 10, 100])
+    parser.add_argument('--repeat', type=int, default=1, help="runs per stage; the fastest is reported")
+    parser.add_argument('--output', default='benchmark_results.json')
+    args = parser.parse_args()
+
+    quiet_streamlit()
+    st.error = record_error
+    data_dir = os.path.abspath(args.data_dir)
+
+    report = {
+        'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'python': platform.python_version(),
+        'pandas': pd.__version__,
+        'results': []
+    }
+    for scale in args.scales:
+        print(f"Scale {scale}x")
+        if scale == 1:
+            report['results'].append(run_scale(data_dir, scale, args.repeat))
+            continue
+        scaled_dir = tempfile.mkdtemp(prefix=f'benchmark_{scale}x_')
+        try:
+            build_scaled_dataset(data_dir, scaled_dir, scale)
+            report['results'].append(run_scale(scaled_dir, scale, args.repeat))
+        finally:
+            shutil.rmtree(scaled_dir, ignore_errors=True)
+
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"Results written to {args.output}")
+
+if __name__ == "__main__":
+    main()
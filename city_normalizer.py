@@ -0,0 +1,221 @@
+import argparse
+import hashlib
+import json
+import os
+import re
+import unicodedata
+from collections import Counter, defaultdict
+
+import pandas as pd
+
+# City-name normalization for the Amazon order data. Canonical names come from
+# the bundled indian_cities.xlsx (GeoNames export made by the notebook), so no
+# network access is needed. Every distinct raw spelling is resolved once:
+#   1. regex clean-up (case, bracketed suffixes, direction/district words,
+#      digits and punctuation; commas separate address parts)
+#   2. exact match of the cleaned name, then of its word runs (longest first,
+#      left to right) over the whole address, old spellings going through
+#      CITY_ALIASES
+#   3. fuzzy match of each address part through a trigram index of the
+#      canonical names, accepted only for a unique best candidate
+# and the raw -> canonical result is persisted, so later runs only map values.
+#
+#   python city_normalizer.py        # normalize the store's cities, export mismatches
+
+CITY_LOOKUP_FILE = 'indian_cities.xlsx'
+CITY_CACHE_FILE = 'city_cache.json'
+CITY_MISMATCH_FILE = 'city_mismatches.xlsx'
+
+# Minimum Dice similarity between trigram sets for a fuzzy match. Names one
+# letter apart score about 0.78 (BANGALORE / MANGALORE), so stay above that.
+FUZZY_THRESHOLD = 0.8
+# Shorter names carry too few trigrams to be matched fuzzily
+FUZZY_MIN_LENGTH = 4
+
+UNKNOWN_CITY = 'UNKNOWN'
+
+# Old or alternative spellings of cities, mapped to the spelling of the
+# canonical list. Names the fuzzy match cannot bridge go here.
+CITY_ALIASES = {
+    'BANGALORE': 'BENGALURU',
+    'BANGLORE': 'BENGALURU',
+    'GURUGRAM': 'GURGAON',
+    'BOMBAY': 'MUMBAI',
+    'CALCUTTA': 'KOLKATA',
+    'MADRAS': 'CHENNAI',
+    'POONA': 'PUNE',
+    'BARODA': 'VADODARA',
+    'TRIVANDRUM': 'THIRUVANANTHAPURAM',
+    'VIZAG': 'VISAKHAPATNAM',
+    'KOCHI': 'COCHIN',
+    'PONDICHERRY': 'PUDUCHERRY',
+    'CALICUT': 'KOZHIKODE',
+    'BELGAUM': 'BELAGAVI',
+    'ALLAHABAD': 'PRAYAGRAJ',
+    'GAUHATI': 'GUWAHATI',
+    'MYSURU': 'MYSORE',
+    'MANGALURU': 'MANGALORE',
+    'BHUBANESWAR': 'BHUBANESHWAR',
+    'SIMLA': 'SHIMLA',
+    'TUTICORIN': 'THOOTHUKUDI',
+    'BENARES': 'VARANASI'
+}
+
+# Bumped whenever the matching rules change, so cached resolutions made by
+# older rules are not reused
+RESOLVER_VERSION = 2
+
+def ascii_upper(text):
+    folded = unicodedata.normalize('NFKD', text).encode('ascii', 'ignore').decode('ascii')
+    return re.sub(r'\s+', ' ', folded.upper()).strip()
+
+# Version of the canonical list together with the rules resolving against it
+def lookup_version(path=CITY_LOOKUP_FILE):
+    digest = hashlib.sha1()
+    with open(path, 'rb') as f:
+        digest.update(f.read())
+    rules = {'resolver': RESOLVER_VERSION, 'aliases': CITY_ALIASES, 'threshold': FUZZY_THRESHOLD}
+    digest.update(json.dumps(rules, sort_keys=True).encode())
+    return digest.hexdigest()
+
+# Canonical names in the accent-free upper-case spelling used by the store
+def load_canonical_cities(path=CITY_LOOKUP_FILE):
+    names = pd.read_excel(path)['Indian City'].dropna().astype(str)
+    return {key for key in map(ascii_upper, names) if key}
+
+def trigrams(text):
+    padded = f' {text} '
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+# Inverted index: trigram -> canonical keys containing it
+def build_trigram_index(keys):
+    index = defaultdict(list)
+    for key in keys:
+        for gram in trigrams(key):
+            index[gram].append(key)
+    return index
+
+# Best canonical key by Dice similarity of trigram sets. Only keys sharing at
+# least one trigram with the name are scored, via the index posting lists.
+# Ties for the best score are ambiguous and give no match.
+def fuzzy_match(name, index, threshold=FUZZY_THRESHOLD):
+    if len(name) < FUZZY_MIN_LENGTH:
+        return None
+    grams = trigrams(name)
+    shared = Counter(key for gram in grams for key in index.get(gram, ()))
+    scores = sorted(
+        (2 * common / (len(grams) + len(trigrams(key))), key)
+        for key, common in shared.items()
+    )
+    if not scores or scores[-1][0] < threshold:
+        return None
+    if len(scores) > 1 and scores[-2][0] == scores[-1][0]:
+        return None
+    return scores[-1][1]
+
+# Regex clean-up of one raw spelling (or one comma-separated part of it)
+def clean_city_text(raw):
+    text = ascii_upper(str(raw))
+    text = re.sub(r'\([^)]*\)', ' ', text)
+    text = re.sub(r'\b(EAST|WEST|NORTH|SOUTH|DIST|DISTRICT|DISTERICT|[WESN])\b', ' ', text)
+    text = re.sub(r'[^A-Z ]+', ' ', text)
+    return re.sub(r'\s+', ' ', text).strip()
+
+def address_parts(raw):
+    return [part for part in map(clean_city_text, str(raw).split(',')) if part]
+
+# Canonical spelling of a name, through the alias table
+def canonical_name(name, canonical):
+    name = CITY_ALIASES.get(name, name)
+    return name if name in canonical else None
+
+# First run of words naming a city, trying longer runs (NAVI MUMBAI) before
+# their single words and runs nearer the start of the address first
+def word_match(words, canonical, longest=3):
+    for size in range(min(longest, len(words)), 0, -1):
+        for start in range(len(words) - size + 1):
+            name = ' '.join(words[start:start + size])
+            if len(name) > 2:
+                match = canonical_name(name, canonical)
+                if match is not None:
+                    return match
+    return None
+
+# Resolve one raw spelling and report how it was matched
+def resolve_city(raw, canonical, index):
+    cleaned = clean_city_text(raw)
+    if not cleaned or cleaned == UNKNOWN_CITY:
+        return UNKNOWN_CITY, 'empty'
+    match = canonical_name(cleaned, canonical)
+    if match is not None:
+        return match, 'exact' if match == cleaned else 'alias'
+    match = word_match(cleaned.split(), canonical)
+    if match is not None:
+        return match, 'word'
+    for part in address_parts(raw):
+        match = fuzzy_match(part, index)
+        if match is not None:
+            return match, 'fuzzy'
+    return cleaned, 'unmatched'
+
+# Persisted raw -> canonical cache. It is discarded when the canonical city
+# list changes, since earlier resolutions may no longer hold.
+def load_city_cache(path=CITY_CACHE_FILE, lookup_path=CITY_LOOKUP_FILE):
+    version = lookup_version(lookup_path)
+    if os.path.exists(path):
+        with open(path) as f:
+            cache = json.load(f)
+        if cache.get('lookup_version') == version:
+            return cache
+    return {'lookup_version': version, 'cities': {}, 'methods': {}}
+
+def save_city_cache(cache, path=CITY_CACHE_FILE):
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w') as f:
+        json.dump(cache, f, indent=1, ensure_ascii=False)
+    os.replace(tmp_path, path)
+
+# Normalize a Series of raw city names. Only spellings missing from the cache
+# go through the clean-up and matching; the rest is a dictionary map.
+def normalize_cities(cities, cache_path=CITY_CACHE_FILE, lookup_path=CITY_LOOKUP_FILE):
+    cache = load_city_cache(cache_path, lookup_path)
+    known = cache['cities']
+    raw_values = cities.where(cities.isna(), cities.astype(str))
+    new_values = [value for value in pd.unique(raw_values.dropna()) if value not in known]
+
+    if new_values:
+        canonical = load_canonical_cities(lookup_path)
+        index = build_trigram_index(canonical)
+        for value in new_values:
+            known[value], cache['methods'][value] = resolve_city(value, canonical, index)
+        save_city_cache(cache, cache_path)
+
+    return raw_values.map(known)
+
+# Raw spellings whose normalized name differs from the spelling itself
+def city_mismatches(cache):
+    rows = [
+        {'Original City': raw, 'Normalized City': city, 'Match': cache['methods'].get(raw)}
+        for raw, city in cache['cities'].items()
+        if raw != city
+    ]
+    return pd.DataFrame(rows, columns=['Original City', 'Normalized City', 'Match'])
+
+if __name__ == "__main__":
+    from graphs import AMAZON_SALES_FILE
+
+    parser = argparse.ArgumentParser(description="Normalize the city names of an order file")
+    parser.add_argument('source', nargs='?', default=AMAZON_SALES_FILE)
+    parser.add_argument('--column', default='city')
+    args = parser.parse_args()
+
+    cities = pd.read_csv(args.source, usecols=[args.column])[args.column]
+    normalized = normalize_cities(cities)
+    cache = load_city_cache()
+
+    methods = pd.Series(cache['methods']).value_counts()
+    print(f"{cities.nunique():,} distinct spellings -> {normalized.nunique():,} cities")
+    print(methods.to_string())
+
+    city_mismatches(cache).to_excel(CITY_MISMATCH_FILE, index=False)
+    print(f"Mismatches written to {CITY_MISMATCH_FILE}")
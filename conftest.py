@@ -0,0 +1,2 @@
+# Makes the top-level modules importable from tests/ (pytest puts this
+# directory on sys.path when it finds a conftest.py here)
@@ -0,0 +1,49 @@
+import openpyxl
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+# Chunked table writers shared by the dashboard's download buttons (see
+# download_table in graphs.py) and the cleaning notebooks. The table is
+# written EXPORT_CHUNK_ROWS rows at a time to a path or binary file object,
+# so no full-size text copy of it is built. Excel files use openpyxl's
+# write-only (constant memory) workbook, continuing on a new sheet whenever a
+# sheet reaches the Excel row limit; installing lxml makes them faster.
+EXPORT_CHUNK_ROWS = 50_000
+EXCEL_MAX_ROWS = 1_048_575
+
+def frame_chunks(df, size=EXPORT_CHUNK_ROWS):
+    for start in range(0, max(len(df), 1), size):
+        yield df.iloc[start:start + size]
+
+def write_csv(df, out):
+    for i, chunk in enumerate(frame_chunks(df)):
+        out.write(chunk.to_csv(index=False, header=i == 0).encode('utf-8'))
+
+def write_parquet(df, out):
+    schema = pa.Schema.from_pandas(df, preserve_index=False)
+    with pq.ParquetWriter(out, schema, compression='zstd') as writer:
+        for chunk in frame_chunks(df):
+            writer.write_table(pa.Table.from_pandas(chunk, schema=schema, preserve_index=False))
+
+def write_excel(df, out):
+    workbook = openpyxl.Workbook(write_only=True)
+    sheet, sheet_rows = None, EXCEL_MAX_ROWS
+    for chunk in frame_chunks(df):
+        values = chunk.astype(object).where(chunk.notna(), None)
+        for row in values.itertuples(index=False, name=None):
+            if sheet_rows == EXCEL_MAX_ROWS:
+                sheet = workbook.create_sheet(f"Sheet{len(workbook.sheetnames) + 1}")
+                sheet.append([str(col) for col in df.columns])
+                sheet_rows = 0
+            sheet.append(row)
+            sheet_rows += 1
+    if sheet is None:
+        workbook.create_sheet("Sheet1").append([str(col) for col in df.columns])
+    workbook.save(out)
+
+# (extension, MIME type, writer) per export format
+EXPORT_FORMATS = {
+    'CSV': ('csv', 'text/csv', write_csv),
+    'Parquet': ('parquet', 'application/vnd.apache.parquet', write_parquet),
+    'Excel': ('xlsx', 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet', write_excel)
+}
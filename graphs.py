@@ -1,13 +1,270 @@
+import hashlib
+import json
+import operator
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from datetime import datetime
+
 import streamlit as st
 import pandas as pd
 import plotly.express as px
+import numpy as np
+import pyarrow.parquet as pq
+from streamlit.runtime.scriptrunner import get_script_run_ctx
 
-# Load the data
-def load_data():
+from exports import EXPORT_FORMATS
+
+# Optional embedded SQL engine; the dashboard runs on pandas without it
+try:
+    import duckdb
+except ImportError:
+    duckdb = None
+
+# Cleaned datasets written by the notebook pipelines
+AMAZON_SALES_FILE = "new_amazon_national_sales.csv"
+INTERNATIONAL_SALES_FILE = "new_international_sales_report.csv"
+STOCK_REPORT_FILE = "new_stock_report.csv"
+PRODUCT_INFO_2021_FILE = "new_2021_product_info.csv"
+PRODUCT_INFO_2022_FILE = "new_2022_product_info.csv"
+
+# Identify a dataset file by path, modification time and size so that a
+# rewritten file gets a fresh cache entry
+def dataset_version(path):
+    stat = os.stat(path)
+    return (path, stat.st_mtime_ns, stat.st_size)
+
+# Schema registry: how every dataset is typed at load time, in one place.
+#   renames - raw or notebook column names mapped to the names the dashboard
+#             uses (column names are also stripped of surrounding spaces)
+#   dates   - date columns and their explicit format, parsed once with
+#             unparseable values becoming NaT
+#   dtypes  - compact in-memory types. Low-cardinality dimensions become
+#             categoricals so groupbys run on integer codes. Measures are
+#             coerced to numbers and downcast to the declared type when the
+#             values allow it.
+# Views receive typed frames and never re-parse or re-coerce columns.
+DATASET_SCHEMAS = {
+    AMAZON_SALES_FILE: {
+        'renames': {
+            'Order_Date': 'date',
+            'Shipping_Postal_Code': 'postal_code',
+            'Business_to_Business': 'b2b',
+            'Shipping_State': 'state',
+            'Shipping_City': 'city',
+            'Sale_Amount': 'sale',
+            'Product_Size': 'size',
+            'Product_Category': 'category',
+            'Product_SKU': 'sku',
+            'Product_Style': 'style',
+            'Quantity': 'quantity',
+            'Shipping_Service_Level': 'shipping_level'
+        },
+        'dates': {'date': '%Y-%m-%d'},
+        'dtypes': {
+            'state': 'category',
+            'city': 'category',
+            'category': 'category',
+            'size': 'category',
+            'Order_Status': 'category',
+            'shipping_level': 'category',
+            'Fulfillment_Type': 'category',
+            'b2b': 'category',
+            'quantity': 'int32',
+            'sale': 'int32',
+            'Promotion_ID_Count': 'int32',
+            'avg. value': 'float32'
+        }
+    },
+    STOCK_REPORT_FILE: {
+        'renames': {
+            'Product_SKU': 'sku',
+            'Design_Number': 'design_no',
+            'Stock_Level': 'stock',
+            'Product_Category': 'category',
+            'Product_Size': 'size',
+            'Product_Color': 'colour'
+        },
+        'dates': {},
+        'dtypes': {
+            'category': 'category',
+            'size': 'category',
+            'colour': 'category',
+            'stock': 'int32'
+        }
+    },
+    INTERNATIONAL_SALES_FILE: {
+        'renames': {
+            'Product_SKU': 'sku',
+            'Product_Style': 'style',
+            'Sale_Date': 'date',
+            'Sale_Month_Clean': 'month'
+        },
+        'dates': {'date': '%d-%m-%Y'},
+        'dtypes': {
+            'Product_Size': 'category',
+            'Quantity_Purchased': 'int32',
+            'Gross_Amount': 'int32',
+            'Price_per_Unit': 'float32'
+        }
+    },
+    PRODUCT_INFO_2021_FILE: {
+        'renames': {
+            'Product_SKU': 'sku',
+            'Product_Style_ID': 'style',
+            'Product_Catalog': 'catalog',
+            'Product_Category': 'category',
+            'Product_Weight': 'weight',
+            'Transfer_Price_Level_2': 'cost_price',
+            'Final_Old_MRP': 'mrp'
+        },
+        'dates': {},
+        'dtypes': {'cost_price': 'float64', 'mrp': 'float64', 'weight': 'float64'}
+    },
+    PRODUCT_INFO_2022_FILE: {
+        'renames': {
+            'Product_SKU': 'sku',
+            'Product_Style_ID': 'style',
+            'Product_Catalog': 'catalog',
+            'Product_Category': 'category',
+            'Product_Weight': 'weight',
+            'Transfer_Price': 'cost_price',
+            'Final_Old_MRP': 'mrp'
+        },
+        'dates': {},
+        'dtypes': {'cost_price': 'float64', 'mrp': 'float64', 'weight': 'float64'}
+    }
+}
+
+# Compact dtype plan of every dataset
+COMPACT_DTYPES = {path: schema['dtypes'] for path, schema in DATASET_SCHEMAS.items()}
+
+# Convert one column to its compact type. Integer targets are only used when
+# every value is a whole number inside the type's range; otherwise the column
+# stays float64 so totals keep full precision.
+def compact_column(series, dtype):
+    if dtype == 'category':
+        return series.astype('category')
+    
+    values = pd.to_numeric(series, errors='coerce')
+    if dtype.startswith('float'):
+        return values.astype(dtype)
+    
+    limits = np.iinfo(dtype)
+    if (
+        values.notna().all()
+        and (values % 1 == 0).all()
+        and (len(values) == 0 or (values.min() >= limits.min and values.max() <= limits.max))
+    ):
+        return values.astype(dtype)
+    return values.astype('float64')
+
+def compact_frame(df, plan):
+    return df.assign(**{
+        col: compact_column(df[col], dtype)
+        for col, dtype in plan.items()
+        if col in df.columns
+    })
+
+# Type one column of a dataset as its schema declares. Date columns already
+# stored as timestamps (e.g. in the Parquet copy) are kept as they are.
+def typed_column(series, path, column):
+    schema = DATASET_SCHEMAS.get(path, {})
+    date_format = schema.get('dates', {}).get(column)
+    if date_format is not None:
+        if pd.api.types.is_datetime64_any_dtype(series):
+            return series
+        return pd.to_datetime(series, format=date_format, errors='coerce')
+    dtype = schema.get('dtypes', {}).get(column)
+    return series if dtype is None else compact_column(series, dtype)
+
+# Dashboard name of a stored column
+def schema_name(path, column):
+    column = column.strip()
+    return DATASET_SCHEMAS.get(path, {}).get('renames', {}).get(column, column)
+
+# Apply a dataset's schema to a frame: stripped and renamed columns, parsed
+# dates and compact dtypes
+def apply_schema(df, path):
+    df = df.rename(columns=lambda col: schema_name(path, col))
+    return df.assign(**{col: typed_column(df[col], path, col) for col in df.columns})
+
+# Parse each dataset once per process and version. Every tab receives the
+# same DataFrame object, so callers must treat it as read-only and derive new
+# frames (assign / filtering) instead of modifying it in place.
+@st.cache_resource(show_spinner=False, max_entries=32)
+def _read_dataset(path, mtime_ns, size):
+    return apply_schema(pd.read_csv(path), path)
+
+# Columnar (Parquet) copy written next to each CSV by the notebook pipelines.
+# It is either a single file or, once ingest_orders.py has appended to it, a
+# directory of part files; both are read as one Parquet dataset.
+def columnar_path(path):
+    return os.path.splitext(path)[0] + ".parquet"
+
+# Use the columnar copy only when it is at least as new as the CSV, so a CSV
+# re-exported without its Parquet twin is never shadowed by stale data
+def _columnar_is_current(path):
+    columnar = columnar_path(path)
+    if not os.path.exists(columnar):
+        return False
+    if not os.path.exists(path):
+        return True
+    return os.stat(columnar).st_mtime_ns >= os.stat(path).st_mtime_ns
+
+@st.cache_resource(show_spinner=False, max_entries=32)
+def _columnar_columns(path, mtime_ns, size):
+    return pq.ParquetDataset(path).schema.names
+
+# Columns are cached one at a time so that views asking for overlapping
+# column sets share the same memory instead of holding several copies
+@st.cache_resource(show_spinner=False, max_entries=256)
+def _read_columnar_column(path, mtime_ns, size, column, dataset):
+    table = pq.read_table(path, columns=[column])
+    series = table.to_pandas()[column]
+    name = schema_name(dataset, column)
+    return typed_column(series, dataset, name).rename(name)
+
+# Version of the file read_dataset() actually loads for a dataset
+def source_version(path):
+    if _columnar_is_current(path):
+        return dataset_version(columnar_path(path))
+    return dataset_version(path)
+
+# Load a dataset, optionally restricted to the columns a view needs.
+# Requested columns that the dataset does not have are skipped.
+def read_dataset(path, columns=None):
+    with timed_span(f"read {path}"):
+        return _load_dataset(path, columns)
+
+def _load_dataset(path, columns):
+    version = source_version(path)
+    if version[0] != path:
+        stored = {schema_name(path, col): col for col in _columnar_columns(*version)}
+        selected = list(stored) if columns is None else [col for col in columns if col in stored]
+        if not selected:
+            return pd.DataFrame()
+        return pd.concat(
+            [_read_columnar_column(*version, stored[col], path) for col in selected],
+            axis=1
+        )
+    
+    df = _read_dataset(*version)
+    if columns is None:
+        return df
+    return df[[col for col in columns if col in df.columns]]
+
+# Build the merged sales overview frame once per version of its inputs
+@st.cache_resource(show_spinner=False, max_entries=4)
+def _build_sales_overview(international_version, stock_version):
     # Load international sales data
-    international_data = pd.read_csv("new_international_sales_report.csv")
+    international_data = read_dataset(INTERNATIONAL_SALES_FILE)
     # Load stock report
-    stock_report = pd.read_csv("new_stock_report.csv")
+    stock_report = read_dataset(STOCK_REPORT_FILE)
     
     # Merge datasets on SKU with left join
     df = pd.merge(
@@ -18,2817 +275,3440 @@ def load_data():
         suffixes=('', '_report')
     )
     
-    # Convert date string to datetime with specific format (DD-MM-YYYY)
-    df['date'] = pd.to_datetime(df['date'], format='%d-%m-%Y')
     # Extract year and month
     df['Year'] = df['date'].dt.year
     df['Month'] = df['date'].dt.strftime('%B')
     return df
 
-def main():
-    st.set_page_config(page_title="Sales Analytics Dashboard", layout="wide")
-    
-    # Custom CSS for attractive tabs
-    st.markdown("""
-        <style>
-        /* Tab styling */
-        .stTabs [data-baseweb="tab-list"] {
-            gap: 4px;
-            background-color: #1e1e1e;
-            padding: 10px;
-            border-radius: 10px;
-            display: flex;
-            justify-content: space-between;
-        }
-        
-        .stTabs [data-baseweb="tab"] {
-            flex: 1;
-            height: 70px;
-            background-color: #2d2d2d;
-            border-radius: 8px;
-            padding: 15px 10px;
-            font-size: 18px;
-            font-weight: 700;
-            color: #ffffff;
-            border: 2px solid transparent;
-            transition: all 0.3s ease;
-            white-space: normal;
-            text-align: center;
-            line-height: 1.3;
-        }
-        
-        .stTabs [data-baseweb="tab"]:hover {
-            background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-            border-color: #667eea;
-            transform: translateY(-2px);
-            box-shadow: 0 4px 15px rgba(102, 126, 234, 0.4);
-        }
-        
-        .stTabs [aria-selected="true"] {
-            background: linear-gradient(135deg, #f093fb 0%, #f5576c 100%) !important;
-            border-color: #f5576c !important;
-            box-shadow: 0 4px 20px rgba(245, 87, 108, 0.5) !important;
-            transform: scale(1.05);
-        }
-        
-        /* Dashboard title styling */
-        h1 {
-            background: linear-gradient(135deg, #f093fb 0%, #f5576c 100%);
-            -webkit-background-clip: text;
-            -webkit-text-fill-color: transparent;
-            font-size: 3em !important;
-            font-weight: 800 !important;
-            text-align: center;
-            padding: 20px 0;
-            text-shadow: 0 0 30px rgba(245, 87, 108, 0.5);
-            animation: glow 2s ease-in-out infinite alternate;
-        }
-        
-        @keyframes glow {
-            from {
-                text-shadow: 0 0 20px rgba(245, 87, 108, 0.5), 0 0 30px rgba(240, 147, 251, 0.3);
-            }
-            to {
-                text-shadow: 0 0 30px rgba(245, 87, 108, 0.8), 0 0 40px rgba(240, 147, 251, 0.5);
-            }
-        }
-        
-        /* Metric cards styling */
-        [data-testid="stMetricValue"] {
-            font-size: 28px;
-            font-weight: 700;
-            color: #667eea;
-        }
-        
-        [data-testid="stMetricLabel"] {
-            font-size: 14px;
-            font-weight: 600;
-            color: #a0a0a0;
-        }
-        
-        /* Add animation to metrics */
-        div[data-testid="metric-container"] {
-            background: linear-gradient(135deg, rgba(102, 126, 234, 0.1) 0%, rgba(118, 75, 162, 0.1) 100%);
-            padding: 15px;
-            border-radius: 10px;
-            border: 1px solid rgba(102, 126, 234, 0.2);
-            transition: all 0.3s ease;
-        }
-        
-        div[data-testid="metric-container"]:hover {
-            transform: translateY(-5px);
-            box-shadow: 0 8px 25px rgba(102, 126, 234, 0.3);
-            border-color: rgba(102, 126, 234, 0.5);
+# Load the data
+def load_data():
+    return _build_sales_overview(
+        source_version(INTERNATIONAL_SALES_FILE),
+        source_version(STOCK_REPORT_FILE)
+    )
+
+# Per-SKU sales velocity over the whole sales history in one grouped pass:
+# last sale date, average days between sales, number of sales and units sold.
+# The average gap equals the mean of consecutive date differences, i.e. the
+# span between first and last dated sale divided by the number of gaps.
+def compute_sku_velocity(sales_df):
+    velocity = sales_df.groupby('sku').agg(
+        Last_Sale_Date=('date', 'max'),
+        First_Sale_Date=('date', 'min'),
+        Dated_Sales=('date', 'count'),
+        Sale_Count=('date', 'size'),
+        Total_Quantity_Sold=('Quantity_Purchased', 'sum')
+    )
+    gaps = velocity['Dated_Sales'] - 1
+    velocity['Avg_Days_Between_Sales'] = (
+        (velocity['Last_Sale_Date'] - velocity['First_Sale_Date']).dt.days / gaps.where(gaps > 0)
+    )
+    return velocity.reset_index()[
+        ['sku', 'Last_Sale_Date', 'Avg_Days_Between_Sales', 'Sale_Count', 'Total_Quantity_Sold']
+    ]
+
+@st.cache_resource(show_spinner=False, max_entries=4)
+def _build_sku_velocity(sales_version):
+    return compute_sku_velocity(read_dataset(INTERNATIONAL_SALES_FILE, columns=['date', 'sku', 'Quantity_Purchased']))
+
+# Shared velocity table for the Low Stock Alert and Overstocked Products sections
+def load_sku_velocity():
+    return _build_sku_velocity(source_version(INTERNATIONAL_SALES_FILE))
+
+# Customer dimension of the international sales history, built once per data
+# version. The order rows (those with a customer, amount and date) are sorted
+# by customer, so each customer's orders are one contiguous block; the
+# customer table holds per customer the total spend, order count, quantity,
+# first and last purchase, active months, favourite style by spend and the
+# start/stop row offsets of its block.
+def compute_customer_summary(sales_df):
+    orders = sales_df.dropna(subset=['Customer_Name', 'Gross_Amount', 'date'])
+    orders = orders.sort_values('Customer_Name', kind='stable')
+    customers = orders.assign(month=orders['date'].dt.to_period('M')).groupby('Customer_Name').agg(
+        total_spend=('Gross_Amount', 'sum'),
+        orders=('Gross_Amount', 'size'),
+        quantity=('Quantity_Purchased', 'sum'),
+        first_purchase=('date', 'min'),
+        last_purchase=('date', 'max'),
+        active_months=('month', 'nunique')
+    )
+    style_spend = orders.groupby(['Customer_Name', 'style'])['Gross_Amount'].sum().reset_index()
+    favorite = (
+        style_spend.sort_values('Gross_Amount', ascending=False, kind='stable')
+        .drop_duplicates('Customer_Name')
+        .set_index('Customer_Name')
+    )
+    customers['favorite_style'] = favorite['style']
+    customers['favorite_style_spend'] = favorite['Gross_Amount']
+    customers['stop'] = customers['orders'].cumsum()
+    customers['start'] = customers['stop'] - customers['orders']
+    return {'customers': customers, 'orders': orders}
+
+@st.cache_resource(show_spinner=False, max_entries=4)
+def _build_customer_summary(sales_version):
+    columns = ['date', 'Customer_Name', 'style', 'Gross_Amount', 'Quantity_Purchased']
+    return compute_customer_summary(read_dataset(INTERNATIONAL_SALES_FILE, columns=columns))
+
+def load_customer_summary():
+    return _build_customer_summary(source_version(INTERNATIONAL_SALES_FILE))
+
+# Order rows of one customer, sliced by the offsets of the customer table
+def customer_orders(summary, customer):
+    row = summary['customers'].loc[customer]
+    return summary['orders'].iloc[row['start']:row['stop']]
+
+# Customer search index, built once per data version over the customer table
+# (positions are rows of that table, i.e. customers in name order). Short
+# queries binary-search the sorted lower-cased names for prefixes; longer queries
+# intersect the posting lists of their character trigrams and confirm the
+# substring on the few candidates left. Matches are ranked by total spend.
+CUSTOMER_NGRAM = 3
+CUSTOMER_SEARCH_LIMIT = 25
+
+def ngrams(text, n=CUSTOMER_NGRAM):
+    return {text[i:i + n] for i in range(len(text) - n + 1)}
+
+def build_customer_index(customers):
+    keys = customers.index.str.lower().to_numpy(dtype=object)
+    by_key = np.argsort(keys, kind='stable')
+    postings = {}
+    for position, key in enumerate(keys):
+        for gram in ngrams(key):
+            postings.setdefault(gram, []).append(position)
+    spend = customers['total_spend'].to_numpy()
+    return {
+        'names': customers.index.to_numpy(dtype=object),
+        'keys': keys,
+        'sorted_keys': keys[by_key],
+        'by_key': by_key,
+        'postings': {gram: np.array(positions) for gram, positions in postings.items()},
+        'by_spend': np.argsort(-spend, kind='stable'),
+        'spend': spend
+    }
+
+@st.cache_resource(show_spinner=False, max_entries=4)
+def _build_customer_index(sales_version):
+    return build_customer_index(_build_customer_summary(sales_version)['customers'])
+
+def load_customer_index():
+    return _build_customer_index(source_version(INTERNATIONAL_SALES_FILE))
+
+# Positions of the customers whose name contains the query (case-insensitive;
+# queries shorter than a trigram match name prefixes only)
+def customer_positions(index, query):
+    query = query.strip().lower()
+    if not query:
+        return np.arange(len(index['names']))
+    if len(query) < CUSTOMER_NGRAM:
+        start, stop = np.searchsorted(index['sorted_keys'], [query, query + '\uffff'])
+        return np.sort(index['by_key'][start:stop])
+    lists = sorted((index['postings'].get(gram) for gram in ngrams(query)), key=lambda p: 0 if p is None else len(p))
+    if lists[0] is None:
+        return np.array([], dtype=np.intp)
+    candidates = lists[0]
+    for positions in lists[1:]:
+        candidates = np.intersect1d(candidates, positions, assume_unique=True)
+    return np.array([pos for pos in candidates if query in index['keys'][pos]], dtype=np.intp)
+
+# Names of the top customers by spend matching the query
+def search_customers(index, query, limit=CUSTOMER_SEARCH_LIMIT):
+    positions = customer_positions(index, query)
+    if len(positions) == len(index['names']):
+        ranked = index['by_spend'][:limit]
+    else:
+        ranked = positions[np.argsort(-index['spend'][positions], kind='stable')][:limit]
+    return index['names'][ranked].tolist()
+
+# Product price history: one row per SKU and P&L snapshot period (the first
+# day of the snapshot month) with transfer price, MRP and profit margin %,
+# kept in a single Parquet store that price_history.py appends to. Rows
+# without prices or with a zero transfer price are dropped. The two bundled
+# snapshots seed the history for periods the store does not hold yet.
+PRICE_HISTORY_FILE = "product_price_history.parquet"
+PRICE_HISTORY_COLUMNS = ['period', 'sku', 'category', 'catalog', 'cost_price', 'mrp', 'margin']
+PRICE_SNAPSHOTS = {'2021-03': PRODUCT_INFO_2021_FILE, '2022-05': PRODUCT_INFO_2022_FILE}
+
+def period_label(period):
+    return pd.Timestamp(period).strftime('%B %Y')
+
+def price_snapshot(df, period):
+    snapshot = df.dropna(subset=['cost_price', 'mrp'])
+    margin = ((snapshot['mrp'] - snapshot['cost_price']) / snapshot['cost_price']) * 100
+    snapshot = snapshot.assign(
+        period=pd.Timestamp(period).to_period('M').to_timestamp(),
+        margin=margin.replace([np.inf, -np.inf], np.nan)
+    )
+    snapshot = snapshot.dropna(subset=['margin'])
+    return snapshot.reindex(columns=PRICE_HISTORY_COLUMNS).reset_index(drop=True)
+
+def price_snapshot_versions():
+    return tuple(
+        (period, source_version(path)) for period, path in PRICE_SNAPSHOTS.items()
+        if os.path.exists(path) or os.path.exists(columnar_path(path))
+    )
+
+@st.cache_resource(show_spinner=False, max_entries=4)
+def _build_price_history(store_version, snapshot_versions):
+    frames = []
+    if store_version is not None:
+        frames.append(pd.read_parquet(PRICE_HISTORY_FILE, columns=PRICE_HISTORY_COLUMNS))
+    stored = set() if not frames else set(frames[0]['period'])
+    for period, _ in snapshot_versions:
+        if pd.Timestamp(period) not in stored:
+            frames.append(price_snapshot(read_dataset(PRICE_SNAPSHOTS[period]), period))
+    if not frames:
+        return pd.DataFrame(columns=PRICE_HISTORY_COLUMNS)
+    history = pd.concat(frames, ignore_index=True)
+    return history.sort_values('period', kind='stable').reset_index(drop=True)
+
+def price_history_version():
+    store_version = dataset_version(PRICE_HISTORY_FILE) if os.path.exists(PRICE_HISTORY_FILE) else None
+    return store_version, price_snapshot_versions()
+
+def load_price_history():
+    return _build_price_history(*price_history_version())
+
+# Mean margin of every group (category or SKU) in each of the given periods,
+# one column per period label, keeping the groups present in all of them
+def period_margins(history, periods, by):
+    compared = history[history['period'].isin(periods)]
+    margins = compared.groupby([by, 'period'])['margin'].mean().unstack('period')
+    margins = margins.reindex(columns=periods).dropna()
+    margins.columns = [period_label(period) for period in periods]
+    return margins.reset_index()
+
+# Business rules of the Inventory Stock and Product Returns tabs, evaluated
+# over whole columns. A bucket rule labels one column by the first upper
+# bound the value does not exceed; values above every bound (or missing) get
+# the last label. A case rule is an ordered list of (clauses, value): every
+# clause (column, operator, threshold) must hold, the first matching case
+# wins and rows matching none get the default. Values may be labels or
+# functions of the frame computing a column. Labels come back as
+# categoricals, so counting them includes labels no row received.
+RULE_OPERATORS = {
+    '<': operator.lt, '<=': operator.le, '>': operator.gt,
+    '>=': operator.ge, '==': operator.eq, '!=': operator.ne
+}
+
+STOCK_LEVEL_BUCKETS = {'bounds': [10, 50], 'labels': ["Low", "Medium", "High"]}
+
+RETURN_RATE_BUCKETS = {
+    'bounds': [10, 20, 30, 40, 50, 60, 70, 80, 90],
+    'labels': ["0-10%", "10-20%", "20-30%", "30-40%", "40-50%",
+               "50-60%", "60-70%", "70-80%", "80-90%", "90-100%"]
+}
+
+REORDER_PRIORITY_RULES = {
+    'cases': [
+        ([('Sale_Count', '>', 10), ('Days_Since_Last_Sale', '<', 30)], "High"),
+        ([('Sale_Count', '>', 5)], "Medium")
+    ],
+    'default': "Low"
+}
+
+# Recommended reorder quantity of high priority items: two months of demand
+# estimated from the sales interval, or a monthly estimate without one
+REORDER_QUANTITY_RULES = {
+    'cases': [
+        ([('Reorder_Priority', '==', "High"), ('Sale_Count', '>', 0), ('Avg_Days_Between_Sales', '>', 0)],
+         lambda df: 30 / df['Avg_Days_Between_Sales'] * (df['Total_Quantity_Sold'] / df['Sale_Count']) * 2),
+        ([('Reorder_Priority', '==', "High"), ('Sale_Count', '>', 0)],
+         lambda df: df['Total_Quantity_Sold'] / df['Sale_Count'] * 30)
+    ],
+    'default': 0
+}
+
+OVERSTOCK_RECOMMENDATION_RULES = {
+    'cases': [
+        ([('Days_Since_Last_Sale', '>', 180), ('Total_Sales', '<', 5)], "Consider discontinuing"),
+        ([('Days_Since_Last_Sale', '>', 90)], "Urgent discount needed"),
+        ([('Stock_to_Sales_Ratio', '>', 10)], "Promote heavily")
+    ],
+    'default': "Monitor closely"
+}
+
+def bucket(values, rule):
+    codes = np.searchsorted(rule['bounds'], np.asarray(values, dtype='float64'), side='left')
+    return pd.Categorical.from_codes(codes, rule['labels'])
+
+def rule_mask(df, clauses):
+    mask = np.ones(len(df), dtype=bool)
+    for column, op, threshold in clauses:
+        mask &= RULE_OPERATORS[op](df[column], threshold).to_numpy(dtype=bool, na_value=False)
+    return mask
+
+def apply_rules(df, rules):
+    cases = rules['cases']
+    conditions = [rule_mask(df, clauses) for clauses, _ in cases]
+    if any(callable(value) for _, value in cases):
+        choices = [value(df) if callable(value) else value for _, value in cases]
+        return np.select(conditions, choices, default=rules['default'])
+    codes = np.full(len(df), len(cases))
+    for case in reversed(range(len(cases))):
+        codes[conditions[case]] = case
+    return pd.Categorical.from_codes(codes, [value for _, value in cases] + [rules['default']])
+
+# True on a thread running a session's script. Background threads (see
+# start_warmup) have no session and use the default settings.
+def in_session():
+    return get_script_run_ctx(suppress_warning=True) is not None
+
+# Optional in-process SQL engine (DuckDB) over the same files read_dataset()
+# would load. Queries scan only the columns they reference, push their filters
+# into the scan and run on every core, so order aggregations return small
+# frames without materializing the order rows. Enabled from the sidebar.
+def sql_engine_enabled():
+    return duckdb is not None and in_session() and st.session_state.get('sql_engine', False)
+
+# One database per process; each query runs on its own cursor so concurrent
+# sessions do not share a connection
+@st.cache_resource(show_spinner=False)
+def _sql_connection():
+    connection = duckdb.connect(database=':memory:')
+    connection.execute(f"SET threads TO {os.cpu_count() or 1}")
+    return connection
+
+def sql_literal(value):
+    return "'" + str(value).replace("'", "''") + "'"
+
+def sql_name(column):
+    return '"' + column.replace('"', '""') + '"'
+
+# Table function scanning the source of a dataset: the columnar copy (a file
+# or a directory of part files) when it is current, otherwise the CSV
+def sql_source(path):
+    if _columnar_is_current(path):
+        columnar = columnar_path(path)
+        if os.path.isdir(columnar):
+            columnar = os.path.join(columnar, "**", "*.parquet")
+        return f"read_parquet({sql_literal(columnar)}, union_by_name = true)"
+    return f"read_csv_auto({sql_literal(path)}, header = true)"
+
+@st.cache_resource(show_spinner=False, max_entries=64)
+def _sql_frame(query, params, version):
+    return _sql_connection().cursor().execute(query, list(params)).df()
+
+# Run a query against one dataset; {source} in the query is replaced with the
+# dataset's scan. Results are cached per query, parameters and file version;
+# they are small, so callers get their own copy to modify.
+def sql_frame(path, query, params=()):
+    with timed_span(f"sql {path}"):
+        query = query.replace("{source}", sql_source(path))
+        return _sql_frame(query, tuple(params), source_version(path)).copy()
+
+# Orders whose status marks a cancellation or a return
+SQL_IS_RETURN = "regexp_matches(lower(Order_Status), 'cancelled|returned')"
+
+# Amazon cube (see build_amazon_cube) computed by the engine
+def sql_amazon_cube():
+    measures = []
+    for measure in AMAZON_CUBE_MEASURES:
+        column = sql_name(measure)
+        measures += [
+            f"CAST(COALESCE(SUM({column}), 0) AS DOUBLE) AS {sql_name(measure)}",
+            f"MIN({column}) AS {sql_name(measure + ' min')}",
+            f"MAX({column}) AS {sql_name(measure + ' max')}",
+            f"COUNT({column}) AS {sql_name(measure + ' count')}"
+        ]
+    cube = sql_frame(AMAZON_SALES_FILE, f"""
+        SELECT state, city, category, size,
+               month(TRY_CAST(date AS DATE)) AS month,
+               Order_Status, shipping_level, b2b, Promotion_ID_Count,
+               quantity IS NOT NULL AND sale IS NOT NULL AS priced,
+               COUNT(*) AS orders,
+               {', '.join(measures)}
+        FROM {{source}}
+        GROUP BY ALL
+    """)
+    plan = COMPACT_DTYPES[AMAZON_SALES_FILE]
+    return compact_frame(cube, {col: dtype for col, dtype in plan.items() if dtype == 'category'})
+
+# Per-state sums of the selected metrics over the orders of the selected
+# states whose metric values fall inside every range
+def sql_state_totals(states, metrics, range_filters):
+    conditions = ["list_contains(?, state)"]
+    params = [[str(state) for state in states]]
+    for metric, (min_val, max_val) in range_filters.items():
+        conditions.append(f"{sql_name(metric)} BETWEEN ? AND ?")
+        params += [min_val, max_val]
+    sums = ", ".join(f"COALESCE(SUM({sql_name(m)}), 0) AS {sql_name(m)}" for m in metrics)
+    return sql_frame(AMAZON_SALES_FILE, f"""
+        SELECT state, {sums}
+        FROM {{source}}
+        WHERE {' AND '.join(conditions)}
+        GROUP BY state
+    """, params)
+
+# Orders, returns and average sale per SKU
+def sql_sku_return_metrics():
+    return sql_frame(AMAZON_SALES_FILE, f"""
+        SELECT sku,
+               COUNT(Order_ID) AS total_orders,
+               COUNT(*) FILTER (WHERE {SQL_IS_RETURN}) AS total_returns,
+               AVG(sale) AS avg_sale_price
+        FROM {{source}}
+        WHERE sku IS NOT NULL
+        GROUP BY sku
+    """)
+
+# Orders and returns per order month (YYYY-MM)
+def sql_monthly_returns():
+    return sql_frame(AMAZON_SALES_FILE, f"""
+        SELECT strftime(TRY_CAST(date AS DATE), '%Y-%m') AS Month,
+               COUNT(Order_ID) AS total_orders,
+               COUNT(*) FILTER (WHERE {SQL_IS_RETURN}) AS total_returns
+        FROM {{source}}
+        GROUP BY Month
+    """)
+
+# Distinct orders, returned order lines and order lines overall
+def sql_return_totals():
+    return sql_frame(AMAZON_SALES_FILE, f"""
+        SELECT COUNT(DISTINCT Order_ID) AS orders,
+               COUNT(Order_ID) FILTER (WHERE {SQL_IS_RETURN}) AS returns,
+               COUNT(*) AS lines
+        FROM {{source}}
+    """).iloc[0]
+
+# Return metrics of the Amazon order history in one pass: orders, returns and
+# average sale per SKU, orders and returns per order month, and overall
+# totals (distinct orders, returned order lines, order lines)
+def compute_order_returns(amazon_df):
+    orders = amazon_df.assign(
+        Month=amazon_df['date'].dt.to_period('M').astype(str),
+        # Identify returns/cancellations (case-insensitive)
+        is_return=amazon_df['Order_Status'].str.lower().str.contains('cancelled|returned', na=False)
+    )
+    counts = {'total_orders': ('Order_ID', 'count'), 'total_returns': ('is_return', 'sum')}
+    return {
+        'sku': orders.groupby('sku').agg(**counts, avg_sale_price=('sale', 'mean')).reset_index(),
+        'monthly': orders.groupby('Month').agg(**counts).reset_index(),
+        'totals': {
+            'orders': orders['Order_ID'].nunique(),
+            'returns': orders.loc[orders['is_return'], 'Order_ID'].count(),
+            'lines': len(orders)
         }
-        </style>
-    """, unsafe_allow_html=True)
+    }
+
+@st.cache_resource(show_spinner=False, max_entries=4)
+def _build_order_returns(amazon_version, use_sql=False):
+    if use_sql:
+        return {'sku': sql_sku_return_metrics(), 'monthly': sql_monthly_returns(), 'totals': sql_return_totals()}
+    columns = ['Order_ID', 'date', 'Order_Status', 'sku', 'sale']
+    return compute_order_returns(read_dataset(AMAZON_SALES_FILE, columns=columns))
+
+def load_order_returns():
+    return _build_order_returns(source_version(AMAZON_SALES_FILE), sql_engine_enabled())
+
+# Per-SKU fact table shared by the Product Returns and Stock & Returns
+# Correlation tabs: every stock row with its orders, returns, return rate,
+# average sale price and estimated per-day holding cost (0.15 per unit per
+# day plus 0.1% of the average sale price). 'ordered' marks SKUs that appear
+# in the order history; the others have no orders and a zero return rate.
+def build_sku_facts(sku_returns, stock_df):
+    sku_returns = sku_returns.assign(
+        return_rate=(sku_returns['total_returns'] / sku_returns['total_orders'] * 100).fillna(0)
+    )
+    facts = stock_df.merge(sku_returns, on='sku', how='left')
+    facts = facts.assign(
+        ordered=facts['total_orders'].notna(),
+        return_rate=facts['return_rate'].fillna(0),
+        total_orders=facts['total_orders'].fillna(0).astype('int64'),
+        total_returns=facts['total_returns'].fillna(0).astype('int64'),
+        **{'per-day_cost': facts['stock'] * 0.15 + facts['avg_sale_price'].fillna(0) * 0.001}
+    )
+    return facts.dropna(subset=['stock', 'category']).reset_index(drop=True)
+
+@st.cache_resource(show_spinner=False, max_entries=4)
+def _build_sku_facts(amazon_version, stock_version, use_sql=False):
+    sku_returns = _build_order_returns(amazon_version, use_sql)['sku']
+    return build_sku_facts(sku_returns, read_dataset(STOCK_REPORT_FILE))
+
+def load_sku_facts():
+    return _build_sku_facts(
+        source_version(AMAZON_SALES_FILE), source_version(STOCK_REPORT_FILE), sql_engine_enabled()
+    )
+
+# Amazon national sales cube: one row per combination of the dimensions the
+# Product Analysis sub-tabs filter and group on, holding additive measures
+# (sums, order counts, non-null counts) plus min/max so slider bounds can be
+# derived without touching the order rows. Promotion_ID_Count is part of the
+# grain so distinct promotion counts stay exact under any roll-up, and
+# 'priced' marks cells whose orders have both quantity and sale.
+AMAZON_CUBE_DIMENSIONS = [
+    'state', 'city', 'category', 'size', 'month', 'Order_Status',
+    'shipping_level', 'b2b', 'Promotion_ID_Count', 'priced'
+]
+AMAZON_CUBE_MEASURES = ['quantity', 'sale', 'avg. value']
+
+def build_amazon_cube(df_amazon):
+    facts = df_amazon.assign(
+        month=df_amazon['date'].dt.month,
+        priced=df_amazon['quantity'].notna() & df_amazon['sale'].notna()
+    )
+    aggregations = {'orders': ('priced', 'size')}
+    for measure in AMAZON_CUBE_MEASURES:
+        aggregations[measure] = (measure, 'sum')
+        aggregations[f'{measure} min'] = (measure, 'min')
+        aggregations[f'{measure} max'] = (measure, 'max')
+        aggregations[f'{measure} count'] = (measure, 'count')
+    return facts.groupby(AMAZON_CUBE_DIMENSIONS, observed=True, dropna=False).agg(**aggregations).reset_index()
+
+# Aggregate a cube (or an existing roll-up) down to fewer dimensions
+def rollup_cube(cube, dimensions):
+    aggregations = {}
+    for col in cube.columns:
+        if col in AMAZON_CUBE_DIMENSIONS:
+            continue
+        if col.endswith(' min'):
+            aggregations[col] = 'min'
+        elif col.endswith(' max'):
+            aggregations[col] = 'max'
+        else:
+            aggregations[col] = 'sum'
+    return cube.groupby(list(dimensions), observed=True, dropna=False).agg(aggregations).reset_index()
+
+# Cube persisted and kept up to date by ingest_orders.py
+def cube_path(path):
+    return os.path.splitext(path)[0] + ".cube.parquet"
+
+# The persisted cube is used when it is at least as new as the data it
+# summarizes; otherwise the cube is rebuilt from the order rows, by the SQL
+# engine when it is enabled
+@st.cache_resource(show_spinner=False, max_entries=2)
+def _build_amazon_cube(amazon_version, use_sql=False):
+    cube_file = cube_path(AMAZON_SALES_FILE)
+    if os.path.exists(cube_file) and os.stat(cube_file).st_mtime_ns >= amazon_version[1]:
+        return pd.read_parquet(cube_file)
+    if use_sql:
+        return sql_amazon_cube()
+    columns = ['date'] + [col for col in AMAZON_CUBE_DIMENSIONS if col not in ('month', 'priced')]
+    return build_amazon_cube(read_dataset(AMAZON_SALES_FILE, columns=columns + AMAZON_CUBE_MEASURES))
+
+@st.cache_resource(show_spinner=False, max_entries=32)
+def _rollup_amazon_cube(amazon_version, dimensions, use_sql=False):
+    return rollup_cube(_build_amazon_cube(amazon_version, use_sql), dimensions)
+
+# Cached roll-up of the Amazon cube to the given dimensions. Each sub-tab asks
+# for the smallest roll-up its filters need and groups that instead of orders.
+def load_amazon_cube(*dimensions):
+    return _rollup_amazon_cube(source_version(AMAZON_SALES_FILE), tuple(dimensions), sql_engine_enabled())
+
+# Apply row-level range filters to a cube roll-up. Cells entirely inside every
+# range are kept and cells entirely outside are dropped; if any cell straddles
+# a range boundary the cube cannot answer exactly and None is returned so the
+# caller falls back to the order rows.
+def filter_cube_ranges(cube, range_filters):
+    keep = pd.Series(True, index=cube.index)
+    for metric, (min_val, max_val) in range_filters.items():
+        low, high, count = cube[f'{metric} min'], cube[f'{metric} max'], cube[f'{metric} count']
+        inside = (low >= min_val) & (high <= max_val) & (count == cube['orders'])
+        outside = (count == 0) | (high < min_val) | (low > max_val)
+        if (~inside & ~outside).any():
+            return None
+        keep &= inside
+    return cube[keep]
+
+# Tabs created with tab_navigation() rerun the script when the selection
+# changes and report the selected tab through .open; other tabs report None,
+# so their bodies always run (Streamlit's default behaviour).
+def tab_is_active(tab):
+    return tab.open is not False
+
+# st.tabs arguments for the selected navigation mode: in on-demand mode only
+# the open tab (and open sub-tab) executes its loading and chart code.
+def tab_navigation(key):
+    if st.session_state.get('on_demand_tabs', True):
+        return {'key': key, 'on_change': 'rerun'}
+    return {}
+
+# Opt-in timing of each rerun. Tabs and sub-tabs run inside timed_span(), and
+# trace_section() marks the start of a named section within the current span
+# (ending the previous one), so sections need no extra indentation. Dataset
+# reads and chart serialization get spans of their own. The spans of a rerun
+# are shown in the sidebar and appended to TRACE_FILE as one JSON line. The
+# file is cut back to its last TRACE_HISTORY records whenever it reaches twice
+# that, and the history panel reads only its tail.
+TRACE_FILE = "dashboard_trace.jsonl"
+TRACE_HISTORY = 500
+TRACE_READ_BLOCK = 64 * 1024
+
+def start_trace():
+    st.session_state['_trace'] = None
+    if st.session_state.get('timing_spans', False):
+        st.session_state['_trace'] = {'started': time.perf_counter(), 'stack': [], 'spans': []}
+
+def _current_trace():
+    if not in_session():
+        return None
+    return st.session_state.get('_trace')
+
+def _span_path(stack):
+    parts = []
+    for frame in stack:
+        parts.append(frame['name'])
+        if frame['section']:
+            parts.append(frame['section'][0])
+    return " / ".join(parts)
+
+def _close_section(trace, frame, now):
+    if frame['section']:
+        name, start = frame['section']
+        trace['spans'].append({'path': _span_path(trace['stack']), 'seconds': now - start})
+        frame['section'] = None
+
+@contextmanager
+def timed_span(name):
+    trace = _current_trace()
+    if trace is None:
+        yield
+        return
+    frame = {'name': name, 'section': None}
+    path = _span_path(trace['stack'] + [frame])
+    trace['stack'].append(frame)
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        now = time.perf_counter()
+        _close_section(trace, frame, now)
+        trace['stack'].pop()
+        trace['spans'].append({'path': path, 'seconds': now - start})
+
+def trace_section(name):
+    trace = _current_trace()
+    if trace is None or not trace['stack']:
+        return
+    now = time.perf_counter()
+    _close_section(trace, trace['stack'][-1], now)
+    trace['stack'][-1]['section'] = (name, now)
+
+def plotly_chart(fig, **kwargs):
+    with timed_span("st.plotly_chart"):
+        st.plotly_chart(fig, **kwargs)
+
+# Spans of one rerun summed per path, slowest first
+def summarize_spans(spans):
+    if not spans:
+        return pd.DataFrame(columns=['path', 'calls', 'seconds'])
+    df = pd.DataFrame(spans)
+    return (
+        df.groupby('path', sort=False)['seconds'].agg(calls='count', seconds='sum')
+        .reset_index().sort_values('seconds', ascending=False)
+    )
+
+# Last `limit` lines of a file, read backwards in blocks from its end
+def tail_lines(path, limit):
+    with open(path, 'rb') as f:
+        start = f.seek(0, os.SEEK_END)
+        data = b''
+        while start > 0 and data.count(b'\n') <= limit:
+            size = min(TRACE_READ_BLOCK, start)
+            start -= size
+            f.seek(start)
+            data = f.read(size) + data
+    lines = data.splitlines(keepends=True)
+    # The first line is partial unless the file was read from its start
+    return lines[1 if start > 0 else 0:][-limit:]
+
+def read_trace_history(path=TRACE_FILE, limit=TRACE_HISTORY):
+    if not os.path.exists(path):
+        return []
+    return [json.loads(line) for line in tail_lines(path, limit) if line.strip()]
+
+# Record count of the trace file, counted once per process and kept with the
+# lock that serializes appends and truncation across sessions
+@st.cache_resource(show_spinner=False)
+def _trace_log(path):
+    records = 0
+    if os.path.exists(path):
+        with open(path, 'rb') as f:
+            records = sum(1 for _ in f)
+    return {'records': records, 'lock': threading.Lock()}
+
+def append_trace(record, path=TRACE_FILE):
+    log = _trace_log(path)
+    with log['lock']:
+        with open(path, 'a') as f:
+            f.write(json.dumps(record, default=str) + "\n")
+        log['records'] += 1
+        if log['records'] >= 2 * TRACE_HISTORY:
+            kept = tail_lines(path, TRACE_HISTORY)
+            with open(path + ".tmp", 'wb') as f:
+                f.writelines(kept)
+            os.replace(path + ".tmp", path)
+            log['records'] = len(kept)
+
+def finish_trace():
+    trace = _current_trace()
+    if trace is None:
+        return
+    total = time.perf_counter() - trace['started']
+    summary = summarize_spans(trace['spans'])
+    record = {
+        'time': datetime.now().isoformat(timespec='seconds'),
+        'main_tab': st.session_state.get('main_tab'),
+        'analysis_tab': st.session_state.get('analysis_tab'),
+        'total_seconds': round(total, 4),
+        'figure_cache': figure_cache_stats(),
+        'spans': [
+            {'path': row.path, 'calls': int(row.calls), 'seconds': round(row.seconds, 4)}
+            for row in summary.itertuples()
+        ]
+    }
+    append_trace(record)
+
+    with st.sidebar.expander("⏱️ Rerun timings", expanded=True):
+        figures = record['figure_cache']
+        st.caption(
+            f"This rerun: {total:.3f}s · figure cache: {figures['hits']} hits, "
+            f"{figures['misses']} misses, {figures['figures']}/{FIGURE_CACHE_SIZE} figures"
+        )
+        st.dataframe(summary.round({'seconds': 3}), hide_index=True)
+
+        history = [span for rerun in read_trace_history() for span in rerun['spans']]
+        if history:
+            st.caption(f"Slowest sections over the last {TRACE_HISTORY} traced reruns ({TRACE_FILE})")
+            slowest = (
+                pd.DataFrame(history).groupby('path')['seconds']
+                .agg(reruns='count', mean='mean', max='max')
+                .sort_values('mean', ascending=False).head(20).round(3).reset_index()
+            )
+            st.dataframe(slowest, hide_index=True)
+
+# Process-wide LRU of built figures. A figure is keyed on a canonical hash of
+# its name, the data version and the filter state it was built from, so
+# revisiting a view returns the same figure without regrouping or re-plotting.
+# Cached figures are shared between sessions and must not be modified.
+FIGURE_CACHE_SIZE = 128
+
+@st.cache_resource(show_spinner=False)
+def _figure_cache():
+    return {'figures': OrderedDict(), 'hits': 0, 'misses': 0, 'lock': threading.Lock()}
+
+def figure_key(name, inputs):
+    canonical = json.dumps([name, inputs], sort_keys=True, default=str)
+    return hashlib.sha1(canonical.encode()).hexdigest()
+
+def cached_figure(name, inputs, build):
+    cache = _figure_cache()
+    key = figure_key(name, inputs)
+    with cache['lock']:
+        if key in cache['figures']:
+            cache['figures'].move_to_end(key)
+            cache['hits'] += 1
+            return cache['figures'][key]
+        cache['misses'] += 1
     
-    st.title("Amazon Sales & Inventory Analytics Dashboard")
+    with timed_span(f"build {name}"):
+        fig = build()
+    with cache['lock']:
+        cache['figures'][key] = fig
+        while len(cache['figures']) > FIGURE_CACHE_SIZE:
+            cache['figures'].popitem(last=False)
+    return fig
+
+def figure_cache_stats():
+    cache = _figure_cache()
+    with cache['lock']:
+        return {'figures': len(cache['figures']), 'hits': cache['hits'], 'misses': cache['misses']}
+
+# Scatter plots of SKU-level data use WebGL markers above
+# SCATTER_WEBGL_THRESHOLD points, the point count at which Plotly's 'auto'
+# render mode switches to WebGL; smaller plots keep 'auto' (SVG). The sidebar
+# can further reduce large plots, either by density-preserving decimation to
+# SCATTER_MAX_POINTS points or by binning into a 2-D density heatmap. Only the drawn points are reduced;
+# callers compute regressions and correlations on the full frame.
+SCATTER_WEBGL_THRESHOLD = 1000
+SCATTER_MAX_POINTS = 20000
+SCATTER_GRID = 50
+LARGE_SCATTER_MODES = ["WebGL (all points)", "WebGL (decimated)", "Density heatmap"]
+
+def large_scatter_mode():
+    return st.session_state.get('large_scatter_mode', LARGE_SCATTER_MODES[0])
+
+# Sample up to max_points rows while keeping the shape of the point cloud:
+# rows are bucketed on a SCATTER_GRID x SCATTER_GRID grid over (x, y) and
+# every non-empty cell keeps its share of the sample, but at least one row,
+# so sparse regions and outliers stay visible.
+def decimate_points(df, x, y, max_points=SCATTER_MAX_POINTS, seed=0):
+    if len(df) <= max_points:
+        return df
+    def cell_index(values):
+        values = values.to_numpy(dtype=float)
+        low, high = np.nanmin(values), np.nanmax(values)
+        if high <= low:
+            return np.zeros(len(values), dtype=np.int64)
+        return np.minimum(((values - low) / (high - low) * SCATTER_GRID).astype(np.int64), SCATTER_GRID - 1)
+
+    cells = pd.Series(cell_index(df[x]) * SCATTER_GRID + cell_index(df[y]), index=df.index)
+    counts = cells.map(cells.value_counts())
+    quota = np.maximum(np.floor(counts * (max_points / len(df))), 1)
+    order = pd.Series(np.random.default_rng(seed).random(len(df)), index=df.index).groupby(cells).rank(method='first')
+    return df[order <= quota]
+
+def large_scatter(df, x, y, **kwargs):
+    if len(df) <= SCATTER_WEBGL_THRESHOLD:
+        return px.scatter(df, x=x, y=y, **kwargs)
+
+    mode = large_scatter_mode()
+    title = kwargs.get('title', '')
+    if mode == "Density heatmap":
+        return px.density_heatmap(
+            df, x=x, y=y, nbinsx=SCATTER_GRID, nbinsy=SCATTER_GRID,
+            title=f"{title} ({len(df):,} points binned)", labels=kwargs.get('labels'),
+            color_continuous_scale='Viridis'
+        )
+    if mode == "WebGL (decimated)" and len(df) > SCATTER_MAX_POINTS:
+        sample = decimate_points(df, x, y)
+        kwargs['title'] = f"{title} ({len(sample):,} of {len(df):,} points shown)"
+        df = sample
+    return px.scatter(df, x=x, y=y, render_mode='webgl', **kwargs)
+
+# Straight trend line over the x range, drawn with two points rather than one
+# point per SKU
+def trend_line_trace(x_values, slope, intercept, **kwargs):
+    import plotly.graph_objects as go
+
+    ends = np.array([x_values.min(), x_values.max()], dtype=float)
+    return go.Scatter(x=ends, y=slope * ends + intercept, mode='lines', **kwargs)
+
+# Tables longer than PAGED_TABLE_MIN_ROWS are filtered, sorted and sliced here
+# and only the visible page is sent to the browser. Row counts in the caption
+# always refer to the full table.
+PAGED_TABLE_MIN_ROWS = 200
+PAGE_SIZES = [25, 50, 100, 250]
+
+def filter_rows(df, text):
+    if not text:
+        return df
+    mask = pd.Series(False, index=df.index)
+    for col in df.columns:
+        if not pd.api.types.is_numeric_dtype(df[col]):
+            mask |= df[col].astype(str).str.contains(text, case=False, regex=False, na=False)
+    return df[mask]
+
+def paged_dataframe(df, key, **kwargs):
+    if not st.session_state.get('paged_tables', True) or len(df) <= PAGED_TABLE_MIN_ROWS:
+        st.dataframe(df, **kwargs)
+        return
+
+    filter_col, sort_col, order_col, size_col, page_col = st.columns([3, 2, 1, 1, 1])
+    with filter_col:
+        text = st.text_input("Filter rows", key=f"{key}_filter", placeholder="Text in any column")
+    with sort_col:
+        sort_by = st.selectbox("Sort by", ["(default)"] + list(df.columns), key=f"{key}_sort")
+    with order_col:
+        descending = st.toggle("Descending", key=f"{key}_desc")
+    with size_col:
+        page_size = st.selectbox("Rows per page", PAGE_SIZES, index=1, key=f"{key}_size")
+
+    view = filter_rows(df, text)
+    if sort_by != "(default)":
+        view = view.sort_values(sort_by, ascending=not descending, kind='stable', na_position='last')
+
+    pages = max(1, -(-len(view) // page_size))
+    page_key = f"{key}_page"
+    if st.session_state.get(page_key, 1) > pages:
+        st.session_state[page_key] = pages
+    with page_col:
+        page = st.number_input("Page", min_value=1, max_value=pages, step=1, key=page_key)
+
+    start = (page - 1) * page_size
+    st.dataframe(view.iloc[start:start + page_size], **kwargs)
+    if view.empty:
+        st.caption(f"No rows match the filter · {len(df):,} rows in total")
+        return
+    matched = f" of {len(view):,} matching" if len(view) != len(df) else ""
+    st.caption(
+        f"Rows {start + 1:,}–{min(start + page_size, len(view)):,}{matched} "
+        f"· {len(df):,} rows in total · page {page} of {pages}"
+    )
+
+# Table exports. The full (filtered) table is written by the chunked writers
+# of exports.py to a temporary file only when a download button is clicked;
+# Streamlit runs the export on its own thread, so the session is not blocked.
+# Streamlit cannot stream download data, so the finished file is read back
+# and held in memory as bytes while it is served.
+# The export's bytes, written through an unnamed temporary file
+def export_file(df, export_format):
+    with tempfile.TemporaryFile() as out:
+        EXPORT_FORMATS[export_format][2](df, out)
+        out.seek(0)
+        return out.read()
+
+# Download buttons for a table in every export format
+def download_table(df, file_name, key):
+    columns = st.columns([1] * len(EXPORT_FORMATS) + [4])
+    for column, (export_format, (extension, mime, _)) in zip(columns, EXPORT_FORMATS.items()):
+        with column:
+            st.download_button(
+                f"⬇️ {export_format}",
+                data=lambda export_format=export_format: export_file(df, export_format),
+                file_name=f"{file_name}.{extension}",
+                mime=mime,
+                key=f"{key}_export_{extension}",
+                on_click='ignore'
+            )
+
+# Sales Overview figures for one year of the merged sales frame
+def monthly_sales_figure(filtered_df, selected_year):
+    # Create monthly summary
+    monthly_sales = filtered_df.groupby('Month')['Gross_Amount'].sum().reset_index()
     
-    # Load data
-    df = load_data()
+    # Sort months chronologically
+    month_order = ['January', 'February', 'March', 'April', 'May', 'June', 
+                   'July', 'August', 'September', 'October', 'November', 'December']
+    monthly_sales['Month'] = pd.Categorical(monthly_sales['Month'], categories=month_order, ordered=True)
+    monthly_sales = monthly_sales.sort_values('Month')
     
-    # Create tabs
-    tab1, tab2, tab3, tab4, tab5, tab6, tab7 = st.tabs([
-        "📊 Sales Overview", 
-        "🔍 Product Analysis", 
-        "📦 Inventory Stock", 
-        "↩️ Product Returns", 
-        "🔗 Stock & Returns Correlation", 
-        "👥 Customer Insights", 
-        "💰 Profit Margin Analysis"
-    ])
+    # Add numeric index for trend line
+    monthly_sales['Month_Num'] = range(len(monthly_sales))
     
-    with tab1:
-        # Year filter (common for all visualizations)
-        # Use years that exist in international sales data
-        years = sorted(df['Year'].unique())
-        selected_year = st.selectbox("Select Year", years)
+    # Create bar chart using plotly
+    fig = px.bar(monthly_sales, 
+                 x='Month', 
+                 y='Gross_Amount',
+                 title=f'Monthly Gross Sales for {selected_year}',
+                 labels={'Gross_Amount': 'Gross Amount (₹)'})
+    
+    # Add trend line
+    import plotly.graph_objects as go
+    from scipy import stats
+    
+    # Calculate linear regression
+    slope, intercept, r_value, p_value, std_err = stats.linregress(monthly_sales['Month_Num'], monthly_sales['Gross_Amount'])
+    trend_line = slope * monthly_sales['Month_Num'] + intercept
+    
+    # Add trend line to the chart
+    fig.add_trace(go.Scatter(
+        x=monthly_sales['Month'],
+        y=trend_line,
+        mode='lines',
+        name='Trend',
+        line=dict(color='red', width=3, dash='dash')
+    ))
+    
+    # Update layout
+    fig.update_layout(
+        xaxis_title="Month",
+        yaxis_title="Gross Amount (₹)",
+        bargap=0.2,
+        height=600,
+        showlegend=True
+    )
+    return fig
+
+def category_month_heatmap(filtered_df, column, color_label, title, color_scale):
+    pivot = filtered_df.groupby(['category', 'Month'], observed=True)[column].sum().reset_index()
+    pivot_table = pivot.pivot(index='category', columns='Month', values=column).fillna(0)
+    # Reorder columns by month
+    month_order = ['January', 'February', 'March', 'April', 'May', 'June', 
+                   'July', 'August', 'September', 'October', 'November', 'December']
+    available_months = [m for m in month_order if m in pivot_table.columns]
+    pivot_table = pivot_table[available_months]
+    
+    fig = px.imshow(pivot_table,
+                    labels=dict(x="Month", y="Category", color=color_label),
+                    x=available_months,
+                    y=pivot_table.index,
+                    title=title,
+                    color_continuous_scale=color_scale,
+                    aspect='auto')
+    
+    fig.update_xaxes(side="bottom")
+    fig.update_layout(height=600)
+    return fig
+
+def top_colors_figure(filtered_df, selected_year):
+    # Group by colour and sum gross amount
+    color_sales = filtered_df.groupby('colour', observed=True)['Gross_Amount'].sum().reset_index()
+    # Sort by gross amount and get top 10
+    color_sales = color_sales.sort_values('Gross_Amount', ascending=False).head(10)
+    
+    # Create a color mapping dictionary for common color names
+    color_map = {
+        'red': 'red',
+        'blue': 'blue',
+        'green': 'green',
+        'yellow': 'yellow',
+        'orange': 'orange',
+        'pink': 'pink',
+        'purple': 'purple',
+        'black': 'black',
+        'white': 'white',
+        'grey': '#808080',
+        'gray': '#808080',
+        'brown': 'brown',
+        'maroon': 'maroon',
+        'navy': 'navy',
+        'beige': '#F5F5DC',
+        'cream': '#FFFDD0',
+        'gold': 'gold',
+        'silver': 'silver',
+        'turquoise': 'turquoise',
+        'lavender': 'lavender',
+        'peach': 'peachpuff',
+        'mint': '#98FF98',
+        'coral': 'coral',
+        'teal': 'teal',
+        'cyan': 'cyan',
+        'magenta': 'magenta',
+        'olive': 'olive',
+        'indigo': 'indigo',
+        'violet': 'violet',
+        'burgundy': 'darkred',
+        'khaki': 'khaki',
+        'off white': '#FAF9F6',
+        'offwhite': '#FAF9F6',
+        'mustard': '#FFDB58',
+        'mustard yellow': '#FFDB58'
+    }
+    
+    # Map colors with case-insensitive matching
+    color_sales['bar_color'] = color_sales['colour'].apply(
+        lambda x: color_map.get(str(x).strip().lower(), '#CCCCCC') if pd.notna(x) else '#CCCCCC'
+    )
+    
+    # Create bar chart for top 10 colors
+    fig_colors = px.bar(color_sales,
+                       x='colour',
+                       y='Gross_Amount',
+                       title=f'Top 10 Colors by Gross Amount ({selected_year})',
+                       labels={'colour': 'Color', 'Gross_Amount': 'Gross Amount (₹)'})
+    
+    # Update bar colors to match the actual color names
+    fig_colors.update_traces(marker_color=color_sales['bar_color'].tolist())
+    
+    fig_colors.update_layout(
+        xaxis_title="Color",
+        yaxis_title="Gross Amount (₹)",
+        bargap=0.2,
+        height=600,
+        showlegend=False
+    )
+    return fig_colors
+
+def top_skus_figure(filtered_df, selected_year):
+    # Group by SKU and calculate total sales
+    sku_sales = filtered_df.groupby('sku').agg({
+        'Gross_Amount': 'sum',
+        'Quantity_Purchased': 'sum'
+    }).reset_index()
+    
+    # Sort by gross amount and get top 10
+    top_skus = sku_sales.sort_values('Gross_Amount', ascending=False).head(10)
+    
+    # Create bar chart for top 10 SKUs
+    fig_sku = px.bar(top_skus,
+                    x='sku',
+                    y='Gross_Amount',
+                    title=f'Top 10 Selling Products by SKU ({selected_year})',
+                    labels={'sku': 'Product SKU', 'Gross_Amount': 'Gross Amount (₹)'},
+                    color='Gross_Amount',
+                    color_continuous_scale='Blues')
+    
+    fig_sku.update_layout(
+        xaxis_title="Product SKU",
+        yaxis_title="Gross Amount (₹)",
+        bargap=0.2,
+        height=600,
+        showlegend=False,
+        xaxis_tickangle=-45
+    )
+    return fig_sku
+
+# Sales overview charts by name, with the column each one needs values in
+SALES_OVERVIEW_FIGURES = {
+    'monthly_sales': (None, monthly_sales_figure),
+    'sales_heatmap': ('category', lambda filtered_df, year: category_month_heatmap(
+        filtered_df, 'Gross_Amount', "Sales (₹)", f'Sales Heatmap by Category and Month ({year})', 'YlOrRd'
+    )),
+    'quantity_heatmap': ('category', lambda filtered_df, year: category_month_heatmap(
+        filtered_df, 'Quantity_Purchased', "Quantity", f'Quantity Heatmap by Category and Month ({year})', 'Blues'
+    )),
+    'top_colors': ('colour', top_colors_figure),
+    'top_skus': (None, top_skus_figure)
+}
+
+def has_values(df, column):
+    return column in df.columns and not df[column].isnull().all()
+
+# Sales overview chart, rebuilt only for a new year or data version
+def sales_overview_figure(name, filtered_df, selected_year):
+    data_version = [source_version(INTERNATIONAL_SALES_FILE), source_version(STOCK_REPORT_FILE)]
+    build = SALES_OVERVIEW_FIGURES[name][1]
+    return cached_figure(name, [data_version, selected_year], lambda: build(filtered_df, selected_year))
+
+def render_sales_overview(df):
+    # Year filter (common for all visualizations)
+    # Use years that exist in international sales data
+    years = sorted(df['Year'].unique())
+    selected_year = st.selectbox("Select Year", years)
+    
+    # Filter data based on selected year
+    filtered_df = df[df['Year'] == selected_year]
+    
+    # ==================== KPI METRICS ====================
+    st.markdown("---")
+    trace_section("Key Performance Indicators")
+    st.subheader(f"📊 Key Performance Indicators - {selected_year}")
+    
+    # Calculate KPIs
+    total_sales = filtered_df['Gross_Amount'].sum()
+    total_quantity = filtered_df['Quantity_Purchased'].sum()
+    total_orders = len(filtered_df)
+    avg_order_value = total_sales / total_orders if total_orders > 0 else 0
+    
+    # Display KPIs in columns
+    kpi_col1, kpi_col2, kpi_col3, kpi_col4 = st.columns(4)
+    
+    with kpi_col1:
+        st.metric(
+            label="💰 Total Sales",
+            value=f"₹{total_sales:,.0f}",
+            help="Total gross sales amount for the selected year"
+        )
+    
+    with kpi_col2:
+        st.metric(
+            label="📦 Total Quantity Sold",
+            value=f"{total_quantity:,.0f}",
+            help="Total quantity of products sold"
+        )
+    
+    with kpi_col3:
+        st.metric(
+            label="🛒 Total Orders",
+            value=f"{total_orders:,}",
+            help="Total number of orders placed"
+        )
+    
+    with kpi_col4:
+        st.metric(
+            label="💵 Avg Order Value",
+            value=f"₹{avg_order_value:,.0f}",
+            help="Average value per order"
+        )
+    
+    # Additional KPIs row
+    st.markdown("")  # Add spacing
+    kpi_col5, kpi_col6, kpi_col7, kpi_col8 = st.columns(4)
+    
+    with kpi_col5:
+        unique_categories = filtered_df['category'].nunique() if 'category' in filtered_df.columns else 0
+        st.metric(
+            label="🏷️ Product Categories",
+            value=f"{unique_categories}",
+            help="Number of unique product categories"
+        )
+    
+    with kpi_col6:
+        unique_products = filtered_df['SKU Code'].nunique() if 'SKU Code' in filtered_df.columns else 0
+        st.metric(
+            label="🔖 Unique Products",
+            value=f"{unique_products:,}",
+            help="Number of unique SKU codes sold"
+        )
+    
+    with kpi_col7:
+        # Calculate best selling month
+        monthly_totals = filtered_df.groupby('Month')['Gross_Amount'].sum()
+        best_month = monthly_totals.idxmax() if len(monthly_totals) > 0 else "N/A"
+        best_month_sales = monthly_totals.max() if len(monthly_totals) > 0 else 0
+        st.metric(
+            label="📅 Best Month",
+            value=best_month,
+            delta=f"₹{best_month_sales:,.0f}",
+            help="Month with highest sales"
+        )
+    
+    with kpi_col8:
+        # Calculate average monthly sales
+        avg_monthly_sales = filtered_df.groupby('Month')['Gross_Amount'].sum().mean()
+        st.metric(
+            label="📈 Avg Monthly Sales",
+            value=f"₹{avg_monthly_sales:,.0f}",
+            help="Average sales per month"
+        )
+    
+    st.markdown("---")
+    
+    # Monthly sales with trend line
+    fig = sales_overview_figure('monthly_sales', filtered_df, selected_year)
+    plotly_chart(fig, use_container_width=True)
+    
+    # Add separator
+    st.markdown("---")
+    trace_section("Category-wise Monthly Analysis")
+    st.header("Category-wise Monthly Analysis")
+    
+    # Check if category data is available
+    if not has_values(filtered_df, 'category'):
+        st.warning(f"No category data available for {selected_year}")
+    else:
+        fig_sales = sales_overview_figure('sales_heatmap', filtered_df, selected_year)
+        plotly_chart(fig_sales, use_container_width=True)
         
-        # Filter data based on selected year
-        filtered_df = df[df['Year'] == selected_year]
+        fig_quantity = sales_overview_figure('quantity_heatmap', filtered_df, selected_year)
+        plotly_chart(fig_quantity, use_container_width=True)
+    
+    # Add separator
+    st.markdown("---")
+    trace_section("Top 10 Colors by Sales")
+    st.header("Top 10 Colors by Sales")
+    
+    # Check if colour data is available
+    if not has_values(filtered_df, 'colour'):
+        st.warning(f"No colour data available for {selected_year}")
+    else:
+        fig_colors = sales_overview_figure('top_colors', filtered_df, selected_year)
+        plotly_chart(fig_colors, use_container_width=True)
+    
+    # Add separator
+    st.markdown("---")
+    trace_section("Top 10 Selling Products by SKU")
+    st.header("Top 10 Selling Products by SKU")
+    
+    fig_sku = sales_overview_figure('top_skus', filtered_df, selected_year)
+    plotly_chart(fig_sku, use_container_width=True)
+
+
+def render_stock_analysis():
+    try:
+        # Load the datasets separately for Product Analysis
+        stock_report = read_dataset(STOCK_REPORT_FILE)
+        international_data = read_dataset(INTERNATIONAL_SALES_FILE, columns=['sku', 'Quantity_Purchased'])
         
-        # ==================== KPI METRICS ====================
-        st.markdown("---")
-        st.subheader(f"📊 Key Performance Indicators - {selected_year}")
-        
-        # Calculate KPIs
-        total_sales = filtered_df['Gross_Amount'].sum()
-        total_quantity = filtered_df['Quantity_Purchased'].sum()
-        total_orders = len(filtered_df)
-        avg_order_value = total_sales / total_orders if total_orders > 0 else 0
-        
-        # Display KPIs in columns
-        kpi_col1, kpi_col2, kpi_col3, kpi_col4 = st.columns(4)
-        
-        with kpi_col1:
-            st.metric(
-                label="💰 Total Sales",
-                value=f"₹{total_sales:,.0f}",
-                help="Total gross sales amount for the selected year"
-            )
+        # Verify required columns exist in stock_report
+        required_stock_columns = ['sku', 'category', 'size', 'colour', 'stock']
+        missing_stock_cols = [col for col in required_stock_columns if col not in stock_report.columns]
+        if missing_stock_cols:
+            st.error(f"Missing columns in stock report: {', '.join(missing_stock_cols)}")
+        else:
+            # Verify required columns exist in international_data
+            required_sales_columns = ['sku', 'Quantity_Purchased']
+            missing_sales_cols = [col for col in required_sales_columns if col not in international_data.columns]
+            if missing_sales_cols:
+                st.error(f"Missing columns in sales report: {', '.join(missing_sales_cols)}")
+            else:
+                # Create filters section
+                trace_section("Filter Products")
+                st.subheader("📊 Filter Products")
+                
+                # Get unique values for filters
+                categories = ['All'] + sorted(stock_report['category'].dropna().unique().tolist())
+                sizes = ['All'] + sorted(stock_report['size'].dropna().unique().tolist())
+                colors = ['All'] + sorted(stock_report['colour'].dropna().unique().tolist())
+                
+                # Create three columns for filters
+                col1, col2, col3 = st.columns(3)
+                
+                with col1:
+                    selected_category = st.selectbox("Product Category", categories, key="orig_product_category")
+                
+                with col2:
+                    selected_size = st.selectbox("Product Size", sizes, key="orig_product_size")
+                
+                with col3:
+                    selected_color = st.selectbox("Product Color", colors, key="orig_product_color")
+                
+                # Apply filters to stock_report
+                filtered_stock = stock_report
+                
+                if selected_category != 'All':
+                    filtered_stock = filtered_stock[filtered_stock['category'] == selected_category]
+                
+                if selected_size != 'All':
+                    filtered_stock = filtered_stock[filtered_stock['size'] == selected_size]
+                
+                if selected_color != 'All':
+                    filtered_stock = filtered_stock[filtered_stock['colour'] == selected_color]
+                
+                # Check if filtered data is empty
+                if len(filtered_stock) == 0:
+                    st.warning("No products match the selected filters. Please adjust your selection.")
+                else:
+                    # Add separator
+                    st.markdown("---")
+                    
+                    # Section 1: Stock Analysis
+                    trace_section("Stock Level Analysis")
+                    st.subheader("📦 Stock Level Analysis")
+                    
+                    # Create two columns for stock charts
+                    stock_col1, stock_col2 = st.columns(2)
+                    
+                    with stock_col1:
+                        # Bar chart: Total Stock Level by Product Category
+                        try:
+                            stock_by_category = filtered_stock.groupby('category', observed=True)['stock'].sum().reset_index()
+                            stock_by_category = stock_by_category.sort_values('stock', ascending=False)
+                            
+                            fig_stock = px.bar(
+                                stock_by_category,
+                                x='category',
+                                y='stock',
+                                title='Total Stock Level by Category',
+                                labels={'category': 'Product Category', 'stock': 'Stock Level'},
+                                color='stock',
+                                color_continuous_scale='Viridis'
+                            )
+                            
+                            fig_stock.update_layout(
+                                xaxis_title="Product Category",
+                                yaxis_title="Total Stock Level",
+                                height=400,
+                                showlegend=False,
+                                xaxis_tickangle=-45
+                            )
+                            
+                            plotly_chart(fig_stock, use_container_width=True)
+                            
+                        except Exception as e:
+                            st.error(f"Error creating stock level chart: {str(e)}")
+                    
+                    with stock_col2:
+                        # Pie chart: Distribution of Product Size
+                        try:
+                            size_distribution = filtered_stock.groupby('size', observed=True).size().reset_index(name='count')
+                            
+                            fig_size = px.pie(
+                                size_distribution,
+                                values='count',
+                                names='size',
+                                title='Product Size Distribution',
+                                color_discrete_sequence=px.colors.qualitative.Pastel1
+                            )
+                            
+                            fig_size.update_traces(
+                                textposition='inside',
+                                textinfo='percent+label'
+                            )
+                            
+                            fig_size.update_layout(height=400)
+                            
+                            plotly_chart(fig_size, use_container_width=True)
+                            
+                        except Exception as e:
+                            st.error(f"Error creating size distribution chart: {str(e)}")
+                    
+                    # Add separator
+                    st.markdown("---")
+                    
+                    # Section 2: Top Selling Products Analysis
+                    trace_section("Top 10 Selling Products")
+                    st.subheader("🏆 Top 10 Selling Products")
+                    
+                    try:
+                        # Calculate top 10 products by total Quantity_Purchased
+                        top_products = international_data.groupby('sku')['Quantity_Purchased'].sum().reset_index()
+                        top_products = top_products.sort_values('Quantity_Purchased', ascending=False).head(10)
+                        top_products.columns = ['Product_SKU', 'Total_Units_Sold']
+                        
+                        # Merge with stock report to get product details
+                        top_products_details = pd.merge(
+                            top_products,
+                            stock_report[['sku', 'category', 'size', 'colour']].drop_duplicates(subset=['sku']),
+                            left_on='Product_SKU',
+                            right_on='sku',
+                            how='left'
+                        )
+                        
+                        # Create bar chart for top 10 products
+                        fig_top = px.bar(
+                            top_products,
+                            x='Product_SKU',
+                            y='Total_Units_Sold',
+                            title='Top 10 Best-Selling Products by Quantity Sold',
+                            labels={'Product_SKU': 'Product SKU', 'Total_Units_Sold': 'Total Units Sold'},
+                            color='Total_Units_Sold',
+                            color_continuous_scale='Teal',
+                            text='Total_Units_Sold'
+                        )
+                        
+                        fig_top.update_traces(
+                            texttemplate='%{text:,.0f}',
+                            textposition='outside'
+                        )
+                        
+                        fig_top.update_layout(
+                            xaxis_title="Product SKU",
+                            yaxis_title="Total Units Sold",
+                            height=500,
+                            showlegend=False,
+                            xaxis_tickangle=-45
+                        )
+                        
+                        plotly_chart(fig_top, use_container_width=True)
+                        
+                        # Display data table with product details
+                        trace_section("Top Selling Products - Detailed View")
+                        st.subheader("📋 Top Selling Products - Detailed View")
+                        
+                        # Prepare display table
+                        display_table = top_products_details[['Product_SKU', 'Total_Units_Sold', 'category', 'size', 'colour']].copy()
+                        display_table.columns = ['Product SKU', 'Total Units Sold', 'Category', 'Size', 'Color']
+                        
+                        # Format numbers with commas
+                        display_table['Total Units Sold'] = display_table['Total Units Sold'].apply(lambda x: f"{x:,.0f}")
+                        
+                        # Display table
+                        st.dataframe(
+                            display_table,
+                            use_container_width=True,
+                            hide_index=True
+                        )
+                        
+                        # Add summary metrics
+                        st.markdown("---")
+                        trace_section("Summary Metrics")
+                        st.subheader("📈 Summary Metrics")
+                        
+                        metric_col1, metric_col2, metric_col3, metric_col4 = st.columns(4)
+                        
+                        with metric_col1:
+                            total_products = len(filtered_stock)
+                            st.metric("Total Products", f"{total_products:,}")
+                        
+                        with metric_col2:
+                            total_stock = filtered_stock['stock'].sum()
+                            st.metric("Total Stock", f"{total_stock:,.0f}")
+                        
+                        with metric_col3:
+                            total_sales = international_data['Quantity_Purchased'].sum()
+                            st.metric("Total Units Sold", f"{total_sales:,.0f}")
+                        
+                        with metric_col4:
+                            unique_categories = filtered_stock['category'].nunique()
+                            st.metric("Product Categories", f"{unique_categories}")
+                        
+                    except Exception as e:
+                        st.error(f"Error analyzing top selling products: {str(e)}")
+                        st.exception(e)
         
-        with kpi_col2:
-            st.metric(
-                label="📦 Total Quantity Sold",
-                value=f"{total_quantity:,.0f}",
-                help="Total quantity of products sold"
-            )
+    except FileNotFoundError as e:
+        st.error(f"Data file not found: {str(e)}")
+        st.info("Please ensure both 'new_stock_report.csv' and 'new_international_sales_report.csv' are in the correct directory.")
+    
+    except Exception as e:
+        st.error(f"An unexpected error occurred: {str(e)}")
+        st.exception(e)
+
+
+def render_state_analytics():
+    try:
+        state_cube = load_amazon_cube('state')
         
-        with kpi_col3:
-            st.metric(
-                label="🛒 Total Orders",
-                value=f"{total_orders:,}",
-                help="Total number of orders placed"
-            )
+        st.subheader("🛍️ Quantity, Sales & Avg Value State-wise Analytics")
         
-        with kpi_col4:
-            st.metric(
-                label="💵 Avg Order Value",
-                value=f"₹{avg_order_value:,.0f}",
-                help="Average value per order"
-            )
+        # Define numeric columns (already numeric through COMPACT_DTYPES)
+        numeric_cols = ['quantity', 'sale', 'avg. value']
         
-        # Additional KPIs row
-        st.markdown("")  # Add spacing
-        kpi_col5, kpi_col6, kpi_col7, kpi_col8 = st.columns(4)
+        # Sidebar filters
+        st.sidebar.header("🔍 State Analytics Filters")
         
-        with kpi_col5:
-            unique_categories = filtered_df['category'].nunique() if 'category' in filtered_df.columns else 0
-            st.metric(
-                label="🏷️ Product Categories",
-                value=f"{unique_categories}",
-                help="Number of unique product categories"
-            )
+        selected_metrics = st.sidebar.multiselect(
+            "Select up to 3 Metrics",
+            options=numeric_cols,
+            default=['sale'],
+            max_selections=3,
+            key="state_metrics"
+        )
         
-        with kpi_col6:
-            unique_products = filtered_df['SKU Code'].nunique() if 'SKU Code' in filtered_df.columns else 0
-            st.metric(
-                label="🔖 Unique Products",
-                value=f"{unique_products:,}",
-                help="Number of unique SKU codes sold"
-            )
+        all_states = sorted(state_cube['state'].dropna().unique())
+        selected_states = st.sidebar.multiselect(
+            "Select States",
+            options=all_states,
+            default=all_states[:5],
+            key="state_filter"
+        )
         
-        with kpi_col7:
-            # Calculate best selling month
-            monthly_totals = filtered_df.groupby('Month')['Gross_Amount'].sum()
-            best_month = monthly_totals.idxmax() if len(monthly_totals) > 0 else "N/A"
-            best_month_sales = monthly_totals.max() if len(monthly_totals) > 0 else 0
-            st.metric(
-                label="📅 Best Month",
-                value=best_month,
-                delta=f"₹{best_month_sales:,.0f}",
-                help="Month with highest sales"
-            )
+        filtered_cube = state_cube[state_cube['state'].isin(selected_states)]
         
-        with kpi_col8:
-            # Calculate average monthly sales
-            avg_monthly_sales = filtered_df.groupby('Month')['Gross_Amount'].sum().mean()
-            st.metric(
-                label="📈 Avg Monthly Sales",
-                value=f"₹{avg_monthly_sales:,.0f}",
-                help="Average sales per month"
-            )
+        # Range filters
+        range_filters = {}
+        for metric in selected_metrics:
+            if filtered_cube[f'{metric} count'].sum() > 0:
+                min_val = int(filtered_cube[f'{metric} min'].min())
+                max_val = int(filtered_cube[f'{metric} max'].max())
+                if min_val == max_val:
+                    max_val += 1
+                step = max((max_val - min_val) // 100, 1)
+                range_filters[metric] = st.sidebar.slider(
+                    f"{metric} Range",
+                    min_value=min_val,
+                    max_value=max_val,
+                    value=(min_val, max_val),
+                    step=step,
+                    key=f"state_{metric}_range"
+                )
         
-        st.markdown("---")
+        # Apply range filters on the cube; ranges that split a state's orders
+        # are applied to the order rows instead
+        filtered_df = filter_cube_ranges(filtered_cube, range_filters)
+        if filtered_df is None and sql_engine_enabled():
+            filtered_df = sql_state_totals(selected_states, selected_metrics, range_filters)
+        elif filtered_df is None:
+            df_amazon = read_dataset(AMAZON_SALES_FILE, columns=['state', 'quantity', 'sale', 'avg. value'])
+            filtered_df = df_amazon[df_amazon['state'].isin(selected_states)]
+            for metric in range_filters:
+                min_val, max_val = range_filters[metric]
+                filtered_df = filtered_df[(filtered_df[metric] >= min_val) & (filtered_df[metric] <= max_val)]
         
-        # Create monthly summary
-        monthly_sales = filtered_df.groupby('Month')['Gross_Amount'].sum().reset_index()
+        top_n = st.sidebar.number_input("Top N States", min_value=1, max_value=50, value=10, key="state_top_n")
+        use_log = st.sidebar.checkbox("Use Log Scale", value=False, key="state_log")
         
-        # Sort months chronologically
-        month_order = ['January', 'February', 'March', 'April', 'May', 'June', 
-                       'July', 'August', 'September', 'October', 'November', 'December']
-        monthly_sales['Month'] = pd.Categorical(monthly_sales['Month'], categories=month_order, ordered=True)
-        monthly_sales = monthly_sales.sort_values('Month')
+        if not filtered_df.empty and selected_metrics:
+            grouped = filtered_df.groupby("state", observed=True)[selected_metrics].sum().reset_index()
+            melted = pd.melt(grouped, id_vars="state", value_vars=selected_metrics,
+                           var_name="Metric", value_name="Value")
+            
+            if use_log:
+                melted = melted[melted["Value"] > 0]
+            
+            melted = melted.sort_values("Value", ascending=False).groupby("Metric").head(top_n)
+            
+            fig = px.bar(
+                melted,
+                x="state",
+                y="Value",
+                color="Metric",
+                barmode="group",
+                title="State vs Selected Metrics",
+                text_auto='.2s',
+                log_y=use_log
+            )
+            fig.update_layout(xaxis_tickangle=-45)
+            plotly_chart(fig, use_container_width=True)
+        else:
+            st.info("No data to display. Please adjust your filters.")
+            
+    except Exception as e:
+        st.error(f"Error in State Analytics: {str(e)}")
+
+
+def render_city_analytics():
+    try:
+        df_amazon = load_amazon_cube('state', 'city')
         
-        # Add numeric index for trend line
-        monthly_sales['Month_Num'] = range(len(monthly_sales))
+        st.subheader("🏙️ Quantity, Sales & Avg Value City-wise Analytics")
         
-        # Create bar chart using plotly
-        fig = px.bar(monthly_sales, 
-                     x='Month', 
-                     y='Gross_Amount',
-                     title=f'Monthly Gross Sales for {selected_year}',
-                     labels={'Gross_Amount': 'Gross Amount (₹)'})
+        numeric_cols = ['quantity', 'sale', 'avg. value']
         
-        # Add trend line
-        import plotly.graph_objects as go
-        from scipy import stats
+        st.sidebar.header("🔍 City Analytics Filters")
         
-        # Calculate linear regression
-        slope, intercept, r_value, p_value, std_err = stats.linregress(monthly_sales['Month_Num'], monthly_sales['Gross_Amount'])
-        trend_line = slope * monthly_sales['Month_Num'] + intercept
+        all_states = sorted(df_amazon['state'].dropna().unique())
+        selected_states_city = st.sidebar.multiselect(
+            "Select State(s)",
+            options=all_states,
+            default=all_states[:3],
+            key="city_state_filter"
+        )
         
-        # Add trend line to the chart
-        fig.add_trace(go.Scatter(
-            x=monthly_sales['Month'],
-            y=trend_line,
-            mode='lines',
-            name='Trend',
-            line=dict(color='red', width=3, dash='dash')
-        ))
+        filtered_state_df = df_amazon[df_amazon['state'].isin(selected_states_city)]
+        filtered_state_df = filtered_state_df[filtered_state_df['city'].str.len() > 1]
         
-        # Update layout
-        fig.update_layout(
-            xaxis_title="Month",
-            yaxis_title="Gross Amount (₹)",
-            bargap=0.2,
-            height=600,
-            showlegend=True
+        all_cities = sorted(filtered_state_df['city'].dropna().unique())
+        selected_cities = st.sidebar.multiselect(
+            "Select City(s)",
+            options=all_cities,
+            default=all_cities[:10],
+            key="city_filter"
         )
         
-        # Display the plot
-        st.plotly_chart(fig, use_container_width=True)
+        filtered_city_df = filtered_state_df[filtered_state_df['city'].isin(selected_cities)]
         
-        # Add separator
-        st.markdown("---")
-        st.header("Category-wise Monthly Analysis")
+        selected_metrics_city = st.sidebar.multiselect(
+            "Select up to 3 Metrics",
+            options=numeric_cols,
+            default=['quantity', 'sale'],
+            max_selections=3,
+            key="city_metrics"
+        )
         
-        # Check if category data is available
-        if 'category' not in filtered_df.columns or filtered_df['category'].isnull().all():
-            st.warning(f"No category data available for {selected_year}")
+        top_n_city = st.sidebar.number_input("Top N Cities", min_value=1, max_value=50, value=10, key="city_top_n")
+        
+        if not filtered_city_df.empty and selected_metrics_city:
+            grouped = filtered_city_df.groupby("city", observed=True)[selected_metrics_city].sum().reset_index()
+            sort_metric = selected_metrics_city[0]
+            grouped = grouped.sort_values(by=sort_metric, ascending=False).head(top_n_city)
+            
+            melted = pd.melt(grouped, id_vars="city", value_vars=selected_metrics_city,
+                           var_name="Metric", value_name="Value")
+            
+            fig = px.bar(
+                melted,
+                x="city",
+                y="Value",
+                color="Metric",
+                barmode="group",
+                title=f"Top {top_n_city} Cities - Metrics",
+                text_auto='.2s'
+            )
+            fig.update_layout(xaxis_tickangle=-45)
+            plotly_chart(fig, use_container_width=True)
         else:
-            # Month order
-            month_order = ['January', 'February', 'March', 'April', 'May', 'June', 
-                           'July', 'August', 'September', 'October', 'November', 'December']
-            
-            # Create pivot table for Sales Heatmap (using Gross_Amount)
-            sales_pivot = filtered_df.groupby(['category', 'Month'])['Gross_Amount'].sum().reset_index()
-            sales_pivot_table = sales_pivot.pivot(index='category', columns='Month', values='Gross_Amount').fillna(0)
-            # Reorder columns by month
-            available_months = [m for m in month_order if m in sales_pivot_table.columns]
-            sales_pivot_table = sales_pivot_table[available_months]
-            
-            # Create Sales Heatmap
-            fig_sales = px.imshow(sales_pivot_table,
-                                  labels=dict(x="Month", y="Category", color="Sales (₹)"),
-                                  x=available_months,
-                                  y=sales_pivot_table.index,
-                                  title=f'Sales Heatmap by Category and Month ({selected_year})',
-                                  color_continuous_scale='YlOrRd',
-                                  aspect='auto')
-            
-            fig_sales.update_xaxes(side="bottom")
-            fig_sales.update_layout(height=600)
-            
-            st.plotly_chart(fig_sales, use_container_width=True)
-            
-            # Create pivot table for Quantity Heatmap (using Quantity_Purchased)
-            quantity_pivot = filtered_df.groupby(['category', 'Month'])['Quantity_Purchased'].sum().reset_index()
-            quantity_pivot_table = quantity_pivot.pivot(index='category', columns='Month', values='Quantity_Purchased').fillna(0)
-            # Reorder columns by month
-            quantity_pivot_table = quantity_pivot_table[available_months]
-            
-            # Create Quantity Heatmap
-            fig_quantity = px.imshow(quantity_pivot_table,
-                                     labels=dict(x="Month", y="Category", color="Quantity"),
-                                     x=available_months,
-                                     y=quantity_pivot_table.index,
-                                     title=f'Quantity Heatmap by Category and Month ({selected_year})',
-                                     color_continuous_scale='Blues',
-                                     aspect='auto')
+            st.info("No data to display. Please adjust your filters.")
             
-            fig_quantity.update_xaxes(side="bottom")
-            fig_quantity.update_layout(height=600)
-            
-            st.plotly_chart(fig_quantity, use_container_width=True)
+    except Exception as e:
+        st.error(f"Error in City Analytics: {str(e)}")
+
+
+def render_promotion_analysis():
+    try:
+        df_amazon = load_amazon_cube('state', 'city', 'Promotion_ID_Count')
+        
+        st.subheader("📢 Promotion Analysis")
+        
+        # State-based Promotion Analysis
+        st.markdown("### 🏪 Promotion by State")
+        
+
+        st.sidebar.header("🔍 Promotion Filters")
+        
+        all_states_promo = sorted(df_amazon['state'].dropna().unique())
+        selected_states_promo = st.sidebar.multiselect(
+            "Select States (Promo)",
+            options=all_states_promo,
+            default=all_states_promo[:10],
+            key="promo_state_filter"
+        )
+        
+        filtered_df_promo = df_amazon[df_amazon['state'].isin(selected_states_promo)]
+        grouped_promo = filtered_df_promo.groupby("state", observed=True)["Promotion_ID_Count"].nunique().reset_index(name="Promotion_Count")
+        
+        if not grouped_promo.empty:
+            top_n_promo = st.sidebar.number_input("Top N States by Promotion", 1, 50, 10, key="promo_top_n")
+            grouped_promo = grouped_promo.sort_values("Promotion_Count", ascending=False).head(top_n_promo)
+            
+            fig_promo_state = px.bar(
+                grouped_promo,
+                x="state",
+                y="Promotion_Count",
+                title="Top States by Promotion Count",
+                text_auto=True,
+                color='Promotion_Count',
+                color_continuous_scale='Plasma'
+            )
+            fig_promo_state.update_layout(xaxis_tickangle=-45)
+            plotly_chart(fig_promo_state, use_container_width=True)
         
-        # Add separator
+        # City-based Promotion Analysis
         st.markdown("---")
-        st.header("Top 10 Colors by Sales")
+        st.markdown("### 🏙️ Promotion by City")
+        
+        df_promo_city = df_amazon[df_amazon['city'].str.len() > 1]
+        df_promo_city = df_promo_city.dropna(subset=['city', 'state'])
+        
+        cities_promo = sorted(df_promo_city['city'].unique())
+        selected_cities_promo = st.sidebar.multiselect(
+            "Select Cities (Promo)",
+            options=cities_promo,
+            default=cities_promo[:10],
+            key="promo_city_filter"
+        )
+        
+        filtered_city_promo = df_promo_city[df_promo_city['city'].isin(selected_cities_promo)]
         
-        # Check if colour data is available
-        if 'colour' not in filtered_df.columns or filtered_df['colour'].isnull().all():
-            st.warning(f"No colour data available for {selected_year}")
+        min_y_promo = st.sidebar.number_input("Min Promotion Count", min_value=0, value=5, key="promo_min_y")
+        top_n_city_promo = st.sidebar.number_input("Top N Cities (Promo)", min_value=1, max_value=100, value=10, key="promo_city_top_n")
+        
+        grouped_city_promo = filtered_city_promo.groupby("city", observed=True)["Promotion_ID_Count"].nunique().reset_index(name='Promotion_Count')
+        grouped_city_promo = grouped_city_promo[grouped_city_promo['Promotion_Count'] >= min_y_promo]
+        grouped_city_promo = grouped_city_promo.sort_values(by="Promotion_Count", ascending=False).head(top_n_city_promo)
+        
+        if not grouped_city_promo.empty:
+            fig_promo_city = px.bar(
+                grouped_city_promo,
+                x="city",
+                y="Promotion_Count",
+                title="Top Cities by Promotion Count",
+                text_auto=True,
+                color='Promotion_Count',
+                color_continuous_scale='Sunset'
+            )
+            fig_promo_city.update_layout(xaxis_tickangle=-45)
+            plotly_chart(fig_promo_city, use_container_width=True)
         else:
-            # Group by colour and sum gross amount
-            color_sales = filtered_df.groupby('colour')['Gross_Amount'].sum().reset_index()
-            # Sort by gross amount and get top 10
-            color_sales = color_sales.sort_values('Gross_Amount', ascending=False).head(10)
+            st.warning("No data available for selected filters.")
             
-            # Create a color mapping dictionary for common color names
-            color_map = {
-                'red': 'red',
-                'blue': 'blue',
-                'green': 'green',
-                'yellow': 'yellow',
-                'orange': 'orange',
-                'pink': 'pink',
-                'purple': 'purple',
-                'black': 'black',
-                'white': 'white',
-                'grey': '#808080',
-                'gray': '#808080',
-                'brown': 'brown',
-                'maroon': 'maroon',
-                'navy': 'navy',
-                'beige': '#F5F5DC',
-                'cream': '#FFFDD0',
-                'gold': 'gold',
-                'silver': 'silver',
-                'turquoise': 'turquoise',
-                'lavender': 'lavender',
-                'peach': 'peachpuff',
-                'mint': '#98FF98',
-                'coral': 'coral',
-                'teal': 'teal',
-                'cyan': 'cyan',
-                'magenta': 'magenta',
-                'olive': 'olive',
-                'indigo': 'indigo',
-                'violet': 'violet',
-                'burgundy': 'darkred',
-                'khaki': 'khaki',
-                'off white': '#FAF9F6',
-                'offwhite': '#FAF9F6',
-                'mustard': '#FFDB58',
-                'mustard yellow': '#FFDB58'
-            }
+    except Exception as e:
+        st.error(f"Error in Promotion Analysis: {str(e)}")
+
+
+def render_order_shipping():
+    try:
+        df_amazon = load_amazon_cube('state', 'city', 'Order_Status', 'shipping_level')
+        
+        st.subheader("📦 Order Status & Shipping Analysis")
+        
+        df_clean = df_amazon.dropna(subset=["city", "state", "Order_Status", "shipping_level"])
+        df_clean = df_clean[~df_clean['city'].str.fullmatch(r'^[A-Z]$', na=False)]
+        
+        st.sidebar.header("🔍 Order & Shipping Filters")
+        
+        filter_type = st.sidebar.radio("Filter By", ["State", "City"], key="order_filter_type")
+        
+        states_order = sorted(df_clean['state'].dropna().unique())
+        selected_states_order = st.sidebar.multiselect("Select States (Order)", states_order, key="order_state_filter")
+        
+        if selected_states_order:
+            filtered_cities_order = sorted(df_clean[df_clean['state'].isin(selected_states_order)]['city'].dropna().unique())
+        else:
+            filtered_cities_order = sorted(df_clean['city'].dropna().unique())
+        
+        selected_cities_order = st.sidebar.multiselect("Select Cities (Order)", filtered_cities_order, key="order_city_filter")
+        
+        metric_type = st.sidebar.radio("Select Metric", ["Count", "Percentage"], key="order_metric")
+        chart_type_order = st.sidebar.selectbox("Chart Type", ['Bar', 'Pie', 'Line'], key="order_chart")
+        
+        if filter_type == "State":
+            group_col = "state"
+            df_clean = df_clean[df_clean['state'].isin(selected_states_order)] if selected_states_order else df_clean
+        else:
+            group_col = "city"
+            df_clean = df_clean[df_clean['city'].isin(selected_cities_order)] if selected_cities_order else df_clean
+        
+        if metric_type == "Count":
+            grouped_order = df_clean.groupby([group_col, 'Order_Status'], observed=True)['orders'].sum().reset_index(name='Count')
+            y_col = 'Count'
+        else:
+            grouped_order = df_clean.groupby([group_col, 'Order_Status'], observed=True)['orders'].sum().reset_index(name='Count')
+            grouped_order['Percentage'] = grouped_order.groupby(group_col, observed=True)['Count'].transform(lambda x: x / x.sum() * 100)
+            y_col = 'Percentage'
+        
+        if not grouped_order.empty:
+            if chart_type_order == "Bar":
+                fig_order = px.bar(
+                    grouped_order,
+                    x=group_col,
+                    y=y_col,
+                    color='Order_Status',
+                    title=f"{y_col} by {group_col} and Order Status",
+                    barmode='stack',
+                    text_auto='.2f' if metric_type == "Percentage" else True
+                )
+                fig_order.update_layout(xaxis_tickangle=-45)
+                plotly_chart(fig_order, use_container_width=True)
+            
+            elif chart_type_order == "Pie":
+                pie_data_order = grouped_order.groupby('Order_Status', observed=True)[y_col].sum().reset_index()
+                fig_order = px.pie(
+                    pie_data_order,
+                    names='Order_Status',
+                    values=y_col,
+                    title=f"Order Status Distribution",
+                    hole=0.3
+                )
+                plotly_chart(fig_order, use_container_width=True)
+            
+            elif chart_type_order == "Line":
+                fig_order = px.line(
+                    grouped_order,
+                    x=group_col,
+                    y=y_col,
+                    color='Order_Status',
+                    title=f"Order Status Trend",
+                    markers=True
+                )
+                plotly_chart(fig_order, use_container_width=True)
+        else:
+            st.warning("No data available for selected filters.")
             
-            # Map colors with case-insensitive matching
-            color_sales['bar_color'] = color_sales['colour'].apply(
-                lambda x: color_map.get(str(x).strip().lower(), '#CCCCCC') if pd.notna(x) else '#CCCCCC'
+    except Exception as e:
+        st.error(f"Error in Order & Shipping Analysis: {str(e)}")
+
+
+def render_b2b_analysis():
+    try:
+        df_amazon = load_amazon_cube('state', 'city', 'b2b')
+        
+        st.subheader("🏢 B2B Distribution Analysis")
+        
+        df_b2b = df_amazon.dropna(subset=['state', 'city', 'b2b'])
+        df_b2b = df_b2b[df_b2b['city'].str.len() > 1]
+        
+        st.sidebar.header("🔍 B2B Filters")
+        
+        analysis_type = st.sidebar.radio("Analysis Type", ['B2B by State', 'B2B by City'], key="b2b_type")
+        
+        if analysis_type == "B2B by State":
+            state_b2b = df_b2b.groupby(['state', 'b2b'], observed=True)['orders'].sum().reset_index(name='Count')
+            state_total = df_b2b.groupby('state', observed=True)['orders'].sum().reset_index(name='Total')
+            state_b2b = state_b2b.merge(state_total, on='state')
+            state_b2b['Percent'] = (state_b2b['Count'] / state_b2b['Total']) * 100
+            
+            fig_b2b = px.bar(
+                state_b2b,
+                x='state',
+                y='Percent',
+                color='b2b',
+                barmode='stack',
+                title="B2B % Distribution by State",
+                text_auto='.2f'
             )
+            fig_b2b.update_layout(xaxis_tickangle=-45)
+            plotly_chart(fig_b2b, use_container_width=True)
+        
+        else:
+            states_b2b = sorted(df_b2b['state'].unique())
+            selected_states_b2b = st.sidebar.multiselect("Select States (B2B)", states_b2b, default=states_b2b[:5], key="b2b_state_filter")
             
-            # Create bar chart for top 10 colors
-            fig_colors = px.bar(color_sales,
-                               x='colour',
-                               y='Gross_Amount',
-                               title=f'Top 10 Colors by Gross Amount ({selected_year})',
-                               labels={'colour': 'Color', 'Gross_Amount': 'Gross Amount (₹)'})
+            filtered_df_b2b = df_b2b[df_b2b['state'].isin(selected_states_b2b)]
             
-            # Update bar colors to match the actual color names
-            fig_colors.update_traces(marker_color=color_sales['bar_color'].tolist())
+            cities_b2b = sorted(filtered_df_b2b['city'].unique())
+            selected_cities_b2b = st.sidebar.multiselect("Select Cities (B2B)", cities_b2b, default=cities_b2b[:10], key="b2b_city_filter")
             
-            fig_colors.update_layout(
-                xaxis_title="Color",
-                yaxis_title="Gross Amount (₹)",
-                bargap=0.2,
-                height=600,
-                showlegend=False
-            )
+            top_n_b2b = st.sidebar.number_input("Top N Cities (B2B)", 1, 100, 10, key="b2b_top_n")
             
-            st.plotly_chart(fig_colors, use_container_width=True)
+            df_city_b2b = filtered_df_b2b[filtered_df_b2b['city'].isin(selected_cities_b2b)]
+            top_cities_b2b = df_city_b2b.groupby('city', observed=True)['orders'].sum().sort_values(ascending=False).head(top_n_b2b).index
+            df_city_b2b = df_city_b2b[df_city_b2b['city'].isin(top_cities_b2b)]
+            
+            if not df_city_b2b.empty:
+                city_b2b = df_city_b2b.groupby(['city', 'b2b'], observed=True)['orders'].sum().reset_index(name='Count')
+                city_total = df_city_b2b.groupby('city', observed=True)['orders'].sum().reset_index(name='Total')
+                city_b2b = city_b2b.merge(city_total, on='city')
+                city_b2b['Percent'] = (city_b2b['Count'] / city_b2b['Total']) * 100
+                
+                fig_b2b_city = px.bar(
+                    city_b2b,
+                    x='city',
+                    y='Percent',
+                    color='b2b',
+                    barmode='stack',
+                    title="B2B % Distribution by City",
+                    text_auto='.2f'
+                )
+                fig_b2b_city.update_layout(xaxis_tickangle=-45)
+                plotly_chart(fig_b2b_city, use_container_width=True)
+            else:
+                st.warning("No data for selected filters.")
+                
+    except Exception as e:
+        st.error(f"Error in B2B Analysis: {str(e)}")
+
+
+def render_product_performance():
+    try:
+        df_amazon = load_amazon_cube('state', 'category', 'size', 'priced')
+        
+        st.subheader("👗 Product Category & Size Performance")
+        
+        df_product = df_amazon[df_amazon['priced']].dropna(subset=['state', 'category', 'size'])
+        df_product = df_product[~df_product['state'].str.fullmatch(r"[A-Za-z]", na=False)]
+        
+        st.sidebar.header("🔍 Product Performance Filters")
+        
+        metric_product = st.sidebar.selectbox("Select Metric", ["quantity", "sale"], key="product_metric")
+        
+        states_product = sorted(df_product['state'].dropna().unique())
+        selected_states_product = st.sidebar.multiselect("Select States (Product)", states_product, default=states_product[:5], key="product_state_filter")
+        
+        df_filtered_product = df_product[df_product['state'].isin(selected_states_product)]
         
-        # Add separator
+        top_n_product = st.sidebar.number_input("Top N States (Product)", min_value=1, max_value=50, value=10, key="product_top_n")
+        
+        # Category Analysis
+        st.markdown("### 📊 By Product Category")
+        grouped_cat = df_filtered_product.groupby(['state', 'category'], observed=True)[metric_product].sum().reset_index()
+        grouped_cat = grouped_cat.sort_values(by=metric_product, ascending=False).groupby('state', observed=True).head(top_n_product)
+        
+        fig_cat = px.bar(grouped_cat, x="state", y=metric_product, color="category",
+                       title=f"{metric_product} by Product Category and State", barmode="group")
+        fig_cat.update_layout(xaxis_tickangle=-45)
+        plotly_chart(fig_cat, use_container_width=True)
+        
+        # Percentage by Category
+        df_cat_pct = grouped_cat.copy()
+        df_cat_pct["Percentage"] = df_cat_pct.groupby("state", observed=True)[metric_product].transform(lambda x: x / x.sum() * 100)
+        fig_pct_cat = px.bar(df_cat_pct, x="state", y="Percentage", color="category",
+                           title=f"% {metric_product} by Product Category", barmode="stack")
+        fig_pct_cat.update_layout(xaxis_tickangle=-45)
+        plotly_chart(fig_pct_cat, use_container_width=True)
+        
+        # Size Analysis
         st.markdown("---")
-        st.header("Top 10 Selling Products by SKU")
+        st.markdown("### 📏 By Product Size")
+        grouped_size = df_filtered_product.groupby(['state', 'size'], observed=True)[metric_product].sum().reset_index()
+        grouped_size = grouped_size.sort_values(by=metric_product, ascending=False).groupby('state', observed=True).head(top_n_product)
         
-        # Group by SKU and calculate total sales
-        sku_sales = filtered_df.groupby('sku').agg({
-            'Gross_Amount': 'sum',
-            'Quantity_Purchased': 'sum'
-        }).reset_index()
+        fig_size = px.bar(grouped_size, x="state", y=metric_product, color="size",
+                        title=f"{metric_product} by Product Size and State", barmode="group")
+        fig_size.update_layout(xaxis_tickangle=-45)
+        plotly_chart(fig_size, use_container_width=True)
         
-        # Sort by gross amount and get top 10
-        top_skus = sku_sales.sort_values('Gross_Amount', ascending=False).head(10)
+        # Percentage by Size
+        df_size_pct = grouped_size.copy()
+        df_size_pct["Percentage"] = df_size_pct.groupby("state", observed=True)[metric_product].transform(lambda x: x / x.sum() * 100)
+        fig_pct_size = px.bar(df_size_pct, x="state", y="Percentage", color="size",
+                            title=f"% {metric_product} by Product Size", barmode="stack")
+        fig_pct_size.update_layout(xaxis_tickangle=-45)
+        plotly_chart(fig_pct_size, use_container_width=True)
         
-        # Create bar chart for top 10 SKUs
-        fig_sku = px.bar(top_skus,
-                        x='sku',
-                        y='Gross_Amount',
-                        title=f'Top 10 Selling Products by SKU ({selected_year})',
-                        labels={'sku': 'Product SKU', 'Gross_Amount': 'Gross Amount (₹)'},
-                        color='Gross_Amount',
-                        color_continuous_scale='Blues')
-        
-        fig_sku.update_layout(
-            xaxis_title="Product SKU",
-            yaxis_title="Gross Amount (₹)",
-            bargap=0.2,
-            height=600,
-            showlegend=False,
-            xaxis_tickangle=-45
+        # Category vs Size Analysis
+        st.markdown("---")
+        st.markdown("### 🔄 Category vs Size Analysis")
+        
+        constant_col = st.selectbox("Group by", ["category", "size"], key="product_group_by")
+        dynamic_col = "size" if constant_col == "category" else "category"
+        
+        grouped_cross = df_filtered_product.groupby([constant_col, dynamic_col], observed=True)[metric_product].sum().reset_index()
+        options = grouped_cross[constant_col].unique().tolist()
+        selected_group = st.selectbox(f"Select {constant_col}", options, key="product_selected_group")
+        
+        filtered_cross = grouped_cross[grouped_cross[constant_col] == selected_group]
+        
+        fig_cross = px.bar(
+            filtered_cross,
+            x=dynamic_col,
+            y=metric_product,
+            title=f"{selected_group} - {dynamic_col}: {metric_product}",
+            color_discrete_sequence=["#1f77b4"]
         )
+        fig_cross.update_layout(xaxis_tickangle=-45)
+        plotly_chart(fig_cross, use_container_width=True)
         
-        st.plotly_chart(fig_sku, use_container_width=True)
-    
-    with tab2:
-        st.header("📊 Comprehensive Product Analysis Dashboard")
-        
-        # Create sub-tabs for different analysis types
-        analysis_tabs = st.tabs([
-            "📦 Stock Analysis",
-            "🏪 State Analytics", 
-            "🏙️ City Analytics",
-            "📢 Promotion Analysis",
-            "📦 Order & Shipping",
-            "🏢 B2B Analysis",
-            "👗 Product Performance",
-            "📈 Time Series"
-        ])
-        
-        # ==================== TAB 0: Original Product Analysis ====================
-        with analysis_tabs[0]:
-            try:
-                # Load the datasets separately for Product Analysis
-                stock_report = pd.read_csv("new_stock_report.csv")
-                international_data = pd.read_csv("new_international_sales_report.csv")
-                
-                # Verify required columns exist in stock_report
-                required_stock_columns = ['sku', 'category', 'size', 'colour', 'stock']
-                missing_stock_cols = [col for col in required_stock_columns if col not in stock_report.columns]
-                if missing_stock_cols:
-                    st.error(f"Missing columns in stock report: {', '.join(missing_stock_cols)}")
-                else:
-                    # Verify required columns exist in international_data
-                    required_sales_columns = ['sku', 'Quantity_Purchased']
-                    missing_sales_cols = [col for col in required_sales_columns if col not in international_data.columns]
-                    if missing_sales_cols:
-                        st.error(f"Missing columns in sales report: {', '.join(missing_sales_cols)}")
-                    else:
-                        # Create filters section
-                        st.subheader("📊 Filter Products")
-                        
-                        # Get unique values for filters
-                        categories = ['All'] + sorted(stock_report['category'].dropna().unique().tolist())
-                        sizes = ['All'] + sorted(stock_report['size'].dropna().unique().tolist())
-                        colors = ['All'] + sorted(stock_report['colour'].dropna().unique().tolist())
-                        
-                        # Create three columns for filters
-                        col1, col2, col3 = st.columns(3)
-                        
-                        with col1:
-                            selected_category = st.selectbox("Product Category", categories, key="orig_product_category")
-                        
-                        with col2:
-                            selected_size = st.selectbox("Product Size", sizes, key="orig_product_size")
-                        
-                        with col3:
-                            selected_color = st.selectbox("Product Color", colors, key="orig_product_color")
-                        
-                        # Apply filters to stock_report
-                        filtered_stock = stock_report.copy()
-                        
-                        if selected_category != 'All':
-                            filtered_stock = filtered_stock[filtered_stock['category'] == selected_category]
-                        
-                        if selected_size != 'All':
-                            filtered_stock = filtered_stock[filtered_stock['size'] == selected_size]
-                        
-                        if selected_color != 'All':
-                            filtered_stock = filtered_stock[filtered_stock['colour'] == selected_color]
-                        
-                        # Check if filtered data is empty
-                        if len(filtered_stock) == 0:
-                            st.warning("No products match the selected filters. Please adjust your selection.")
-                        else:
-                            # Add separator
-                            st.markdown("---")
-                            
-                            # Section 1: Stock Analysis
-                            st.subheader("📦 Stock Level Analysis")
-                            
-                            # Create two columns for stock charts
-                            stock_col1, stock_col2 = st.columns(2)
-                            
-                            with stock_col1:
-                                # Bar chart: Total Stock Level by Product Category
-                                try:
-                                    stock_by_category = filtered_stock.groupby('category')['stock'].sum().reset_index()
-                                    stock_by_category = stock_by_category.sort_values('stock', ascending=False)
-                                    
-                                    fig_stock = px.bar(
-                                        stock_by_category,
-                                        x='category',
-                                        y='stock',
-                                        title='Total Stock Level by Category',
-                                        labels={'category': 'Product Category', 'stock': 'Stock Level'},
-                                        color='stock',
-                                        color_continuous_scale='Viridis'
-                                    )
-                                    
-                                    fig_stock.update_layout(
-                                        xaxis_title="Product Category",
-                                        yaxis_title="Total Stock Level",
-                                        height=400,
-                                        showlegend=False,
-                                        xaxis_tickangle=-45
-                                    )
-                                    
-                                    st.plotly_chart(fig_stock, use_container_width=True)
-                                    
-                                except Exception as e:
-                                    st.error(f"Error creating stock level chart: {str(e)}")
-                            
-                            with stock_col2:
-                                # Pie chart: Distribution of Product Size
-                                try:
-                                    size_distribution = filtered_stock.groupby('size').size().reset_index(name='count')
-                                    
-                                    fig_size = px.pie(
-                                        size_distribution,
-                                        values='count',
-                                        names='size',
-                                        title='Product Size Distribution',
-                                        color_discrete_sequence=px.colors.qualitative.Pastel1
-                                    )
-                                    
-                                    fig_size.update_traces(
-                                        textposition='inside',
-                                        textinfo='percent+label'
-                                    )
-                                    
-                                    fig_size.update_layout(height=400)
-                                    
-                                    st.plotly_chart(fig_size, use_container_width=True)
-                                    
-                                except Exception as e:
-                                    st.error(f"Error creating size distribution chart: {str(e)}")
-                            
-                            # Add separator
-                            st.markdown("---")
-                            
-                            # Section 2: Top Selling Products Analysis
-                            st.subheader("🏆 Top 10 Selling Products")
-                            
-                            try:
-                                # Calculate top 10 products by total Quantity_Purchased
-                                top_products = international_data.groupby('sku')['Quantity_Purchased'].sum().reset_index()
-                                top_products = top_products.sort_values('Quantity_Purchased', ascending=False).head(10)
-                                top_products.columns = ['Product_SKU', 'Total_Units_Sold']
-                                
-                                # Merge with stock report to get product details
-                                top_products_details = pd.merge(
-                                    top_products,
-                                    stock_report[['sku', 'category', 'size', 'colour']].drop_duplicates(subset=['sku']),
-                                    left_on='Product_SKU',
-                                    right_on='sku',
-                                    how='left'
-                                )
-                                
-                                # Create bar chart for top 10 products
-                                fig_top = px.bar(
-                                    top_products,
-                                    x='Product_SKU',
-                                    y='Total_Units_Sold',
-                                    title='Top 10 Best-Selling Products by Quantity Sold',
-                                    labels={'Product_SKU': 'Product SKU', 'Total_Units_Sold': 'Total Units Sold'},
-                                    color='Total_Units_Sold',
-                                    color_continuous_scale='Teal',
-                                    text='Total_Units_Sold'
-                                )
-                                
-                                fig_top.update_traces(
-                                    texttemplate='%{text:,.0f}',
-                                    textposition='outside'
-                                )
-                                
-                                fig_top.update_layout(
-                                    xaxis_title="Product SKU",
-                                    yaxis_title="Total Units Sold",
-                                    height=500,
-                                    showlegend=False,
-                                    xaxis_tickangle=-45
-                                )
-                                
-                                st.plotly_chart(fig_top, use_container_width=True)
-                                
-                                # Display data table with product details
-                                st.subheader("📋 Top Selling Products - Detailed View")
-                                
-                                # Prepare display table
-                                display_table = top_products_details[['Product_SKU', 'Total_Units_Sold', 'category', 'size', 'colour']].copy()
-                                display_table.columns = ['Product SKU', 'Total Units Sold', 'Category', 'Size', 'Color']
-                                
-                                # Format numbers with commas
-                                display_table['Total Units Sold'] = display_table['Total Units Sold'].apply(lambda x: f"{x:,.0f}")
-                                
-                                # Display table
-                                st.dataframe(
-                                    display_table,
-                                    use_container_width=True,
-                                    hide_index=True
-                                )
-                                
-                                # Add summary metrics
-                                st.markdown("---")
-                                st.subheader("📈 Summary Metrics")
-                                
-                                metric_col1, metric_col2, metric_col3, metric_col4 = st.columns(4)
-                                
-                                with metric_col1:
-                                    total_products = len(filtered_stock)
-                                    st.metric("Total Products", f"{total_products:,}")
-                                
-                                with metric_col2:
-                                    total_stock = filtered_stock['stock'].sum()
-                                    st.metric("Total Stock", f"{total_stock:,.0f}")
-                                
-                                with metric_col3:
-                                    total_sales = international_data['Quantity_Purchased'].sum()
-                                    st.metric("Total Units Sold", f"{total_sales:,.0f}")
-                                
-                                with metric_col4:
-                                    unique_categories = filtered_stock['category'].nunique()
-                                    st.metric("Product Categories", f"{unique_categories}")
-                                
-                            except Exception as e:
-                                st.error(f"Error analyzing top selling products: {str(e)}")
-                                st.exception(e)
-                
-            except FileNotFoundError as e:
-                st.error(f"Data file not found: {str(e)}")
-                st.info("Please ensure both 'new_stock_report.csv' and 'new_international_sales_report.csv' are in the correct directory.")
-            
-            except Exception as e:
-                st.error(f"An unexpected error occurred: {str(e)}")
-                st.exception(e)
-        
-        # ==================== TAB 1: State Analytics ====================
-        with analysis_tabs[1]:
-            try:
-                df_amazon = pd.read_csv("new_amazon_national_sales.csv")
-                
-                st.subheader("🛍️ Quantity, Sales & Avg Value State-wise Analytics")
-                
-                # Define numeric columns
-                numeric_cols = ['quantity', 'sale', 'avg. value']
-                df_amazon[numeric_cols] = df_amazon[numeric_cols].apply(pd.to_numeric, errors='coerce')
-                df_amazon['state'] = df_amazon['state'].astype(str)
-                
-                # Sidebar filters
-                st.sidebar.header("🔍 State Analytics Filters")
-                
-                selected_metrics = st.sidebar.multiselect(
-                    "Select up to 3 Metrics",
-                    options=numeric_cols,
-                    default=['sale'],
-                    max_selections=3,
-                    key="state_metrics"
-                )
-                
-                all_states = sorted(df_amazon['state'].dropna().unique())
-                selected_states = st.sidebar.multiselect(
-                    "Select States",
-                    options=all_states,
-                    default=all_states[:5],
-                    key="state_filter"
-                )
-                
-                filtered_df = df_amazon[df_amazon['state'].isin(selected_states)]
-                
-                # Range filters
-                range_filters = {}
-                for metric in selected_metrics:
-                    col_values = pd.to_numeric(filtered_df[metric], errors='coerce').dropna()
-                    if not col_values.empty:
-                        min_val = int(col_values.min())
-                        max_val = int(col_values.max())
-                        if min_val == max_val:
-                            max_val += 1
-                        step = max((max_val - min_val) // 100, 1)
-                        range_filters[metric] = st.sidebar.slider(
-                            f"{metric} Range",
-                            min_value=min_val,
-                            max_value=max_val,
-                            value=(min_val, max_val),
-                            step=step,
-                            key=f"state_{metric}_range"
-                        )
-                
-                # Apply range filters
-                for metric in range_filters:
-                    min_val, max_val = range_filters[metric]
-                    filtered_df = filtered_df[(filtered_df[metric] >= min_val) & (filtered_df[metric] <= max_val)]
-                
-                top_n = st.sidebar.number_input("Top N States", min_value=1, max_value=50, value=10, key="state_top_n")
-                use_log = st.sidebar.checkbox("Use Log Scale", value=False, key="state_log")
-                
-                if not filtered_df.empty and selected_metrics:
-                    grouped = filtered_df.groupby("state")[selected_metrics].sum().reset_index()
-                    melted = pd.melt(grouped, id_vars="state", value_vars=selected_metrics,
-                                   var_name="Metric", value_name="Value")
-                    
-                    if use_log:
-                        melted = melted[melted["Value"] > 0]
-                    
-                    melted = melted.sort_values("Value", ascending=False).groupby("Metric").head(top_n)
-                    
-                    fig = px.bar(
-                        melted,
-                        x="state",
-                        y="Value",
-                        color="Metric",
-                        barmode="group",
-                        title="State vs Selected Metrics",
-                        text_auto='.2s',
-                        log_y=use_log
-                    )
-                    fig.update_layout(xaxis_tickangle=-45)
-                    st.plotly_chart(fig, use_container_width=True)
-                else:
-                    st.info("No data to display. Please adjust your filters.")
-                    
-            except Exception as e:
-                st.error(f"Error in State Analytics: {str(e)}")
+    except Exception as e:
+        st.error(f"Error in Product Performance: {str(e)}")
+
+
+def render_time_series():
+    try:
+        df_amazon = load_amazon_cube('month', 'category', 'size')
         
-        # ==================== TAB 3: City Analytics ====================
-        with analysis_tabs[2]:
-            try:
-                df_amazon = pd.read_csv("new_amazon_national_sales.csv")
-                
-                st.subheader("🏙️ Quantity, Sales & Avg Value City-wise Analytics")
-                
-                numeric_cols = ['quantity', 'sale', 'avg. value']
-                df_amazon[numeric_cols] = df_amazon[numeric_cols].apply(pd.to_numeric, errors='coerce')
-                
-                st.sidebar.header("🔍 City Analytics Filters")
-                
-                all_states = sorted(df_amazon['state'].dropna().unique())
-                selected_states_city = st.sidebar.multiselect(
-                    "Select State(s)",
-                    options=all_states,
-                    default=all_states[:3],
-                    key="city_state_filter"
-                )
-                
-                filtered_state_df = df_amazon[df_amazon['state'].isin(selected_states_city)]
-                filtered_state_df = filtered_state_df[filtered_state_df['city'].str.len() > 1]
-                
-                all_cities = sorted(filtered_state_df['city'].dropna().unique())
-                selected_cities = st.sidebar.multiselect(
-                    "Select City(s)",
-                    options=all_cities,
-                    default=all_cities[:10],
-                    key="city_filter"
-                )
-                
-                filtered_city_df = filtered_state_df[filtered_state_df['city'].isin(selected_cities)]
-                
-                selected_metrics_city = st.sidebar.multiselect(
-                    "Select up to 3 Metrics",
-                    options=numeric_cols,
-                    default=['quantity', 'sale'],
-                    max_selections=3,
-                    key="city_metrics"
-                )
-                
-                top_n_city = st.sidebar.number_input("Top N Cities", min_value=1, max_value=50, value=10, key="city_top_n")
-                
-                if not filtered_city_df.empty and selected_metrics_city:
-                    grouped = filtered_city_df.groupby("city")[selected_metrics_city].sum().reset_index()
-                    sort_metric = selected_metrics_city[0]
-                    grouped = grouped.sort_values(by=sort_metric, ascending=False).head(top_n_city)
-                    
-                    melted = pd.melt(grouped, id_vars="city", value_vars=selected_metrics_city,
-                                   var_name="Metric", value_name="Value")
-                    
-                    fig = px.bar(
-                        melted,
-                        x="city",
-                        y="Value",
-                        color="Metric",
-                        barmode="group",
-                        title=f"Top {top_n_city} Cities - Metrics",
-                        text_auto='.2s'
-                    )
-                    fig.update_layout(xaxis_tickangle=-45)
-                    st.plotly_chart(fig, use_container_width=True)
-                else:
-                    st.info("No data to display. Please adjust your filters.")
-                    
-            except Exception as e:
-                st.error(f"Error in City Analytics: {str(e)}")
+        st.subheader("📈 Time Series Analysis")
         
-        # ==================== TAB 4: Promotion Analysis ====================
-        with analysis_tabs[3]:
-            try:
-                df_amazon = pd.read_csv("new_amazon_national_sales.csv")
-                
-                st.subheader("📢 Promotion Analysis")
-                
-                # State-based Promotion Analysis
-                st.markdown("### 🏪 Promotion by State")
-                
-                df_amazon['Promotion_ID_Count'] = df_amazon['Promotion_ID_Count'].astype(str)
-                df_amazon['state'] = df_amazon['state'].astype(str)
-                
-                st.sidebar.header("🔍 Promotion Filters")
-                
-                all_states_promo = sorted(df_amazon['state'].dropna().unique())
-                selected_states_promo = st.sidebar.multiselect(
-                    "Select States (Promo)",
-                    options=all_states_promo,
-                    default=all_states_promo[:10],
-                    key="promo_state_filter"
-                )
-                
-                filtered_df_promo = df_amazon[df_amazon['state'].isin(selected_states_promo)]
-                grouped_promo = filtered_df_promo.groupby("state")["Promotion_ID_Count"].nunique().reset_index(name="Promotion_Count")
-                
-                if not grouped_promo.empty:
-                    top_n_promo = st.sidebar.number_input("Top N States by Promotion", 1, 50, 10, key="promo_top_n")
-                    grouped_promo = grouped_promo.sort_values("Promotion_Count", ascending=False).head(top_n_promo)
-                    
-                    fig_promo_state = px.bar(
-                        grouped_promo,
-                        x="state",
-                        y="Promotion_Count",
-                        title="Top States by Promotion Count",
-                        text_auto=True,
-                        color='Promotion_Count',
-                        color_continuous_scale='Plasma'
-                    )
-                    fig_promo_state.update_layout(xaxis_tickangle=-45)
-                    st.plotly_chart(fig_promo_state, use_container_width=True)
-                
-                # City-based Promotion Analysis
-                st.markdown("---")
-                st.markdown("### 🏙️ Promotion by City")
-                
-                df_promo_city = df_amazon.copy()
-                df_promo_city = df_promo_city[df_promo_city['city'].str.len() > 1]
-                df_promo_city = df_promo_city.dropna(subset=['city', 'state'])
-                
-                cities_promo = sorted(df_promo_city['city'].unique())
-                selected_cities_promo = st.sidebar.multiselect(
-                    "Select Cities (Promo)",
-                    options=cities_promo,
-                    default=cities_promo[:10],
-                    key="promo_city_filter"
-                )
-                
-                filtered_city_promo = df_promo_city[df_promo_city['city'].isin(selected_cities_promo)]
-                
-                min_y_promo = st.sidebar.number_input("Min Promotion Count", min_value=0, value=5, key="promo_min_y")
-                top_n_city_promo = st.sidebar.number_input("Top N Cities (Promo)", min_value=1, max_value=100, value=10, key="promo_city_top_n")
-                
-                grouped_city_promo = filtered_city_promo.groupby("city")["Promotion_ID_Count"].nunique().reset_index(name='Promotion_Count')
-                grouped_city_promo = grouped_city_promo[grouped_city_promo['Promotion_Count'] >= min_y_promo]
-                grouped_city_promo = grouped_city_promo.sort_values(by="Promotion_Count", ascending=False).head(top_n_city_promo)
-                
-                if not grouped_city_promo.empty:
-                    fig_promo_city = px.bar(
-                        grouped_city_promo,
-                        x="city",
-                        y="Promotion_Count",
-                        title="Top Cities by Promotion Count",
-                        text_auto=True,
-                        color='Promotion_Count',
-                        color_continuous_scale='Sunset'
-                    )
-                    fig_promo_city.update_layout(xaxis_tickangle=-45)
-                    st.plotly_chart(fig_promo_city, use_container_width=True)
-                else:
-                    st.warning("No data available for selected filters.")
-                    
-            except Exception as e:
-                st.error(f"Error in Promotion Analysis: {str(e)}")
+        # Months with a parseable order date
+        df_time = df_amazon.dropna(subset=['month'])
         
-        # ==================== TAB 5: Order & Shipping ====================
-        with analysis_tabs[4]:
-            try:
-                df_amazon = pd.read_csv("new_amazon_national_sales.csv")
-                
-                st.subheader("📦 Order Status & Shipping Analysis")
-                
-                df_clean = df_amazon.dropna(subset=["city", "state", "Order_Status", "shipping_level"])
-                df_clean = df_clean[~df_clean['city'].str.fullmatch(r'^[A-Z]$', na=False)]
-                
-                st.sidebar.header("🔍 Order & Shipping Filters")
-                
-                filter_type = st.sidebar.radio("Filter By", ["State", "City"], key="order_filter_type")
-                
-                states_order = sorted(df_clean['state'].dropna().unique())
-                selected_states_order = st.sidebar.multiselect("Select States (Order)", states_order, key="order_state_filter")
-                
-                if selected_states_order:
-                    filtered_cities_order = sorted(df_clean[df_clean['state'].isin(selected_states_order)]['city'].dropna().unique())
-                else:
-                    filtered_cities_order = sorted(df_clean['city'].dropna().unique())
-                
-                selected_cities_order = st.sidebar.multiselect("Select Cities (Order)", filtered_cities_order, key="order_city_filter")
-                
-                metric_type = st.sidebar.radio("Select Metric", ["Count", "Percentage"], key="order_metric")
-                chart_type_order = st.sidebar.selectbox("Chart Type", ['Bar', 'Pie', 'Line'], key="order_chart")
-                
-                if filter_type == "State":
-                    group_col = "state"
-                    df_clean = df_clean[df_clean['state'].isin(selected_states_order)] if selected_states_order else df_clean
-                else:
-                    group_col = "city"
-                    df_clean = df_clean[df_clean['city'].isin(selected_cities_order)] if selected_cities_order else df_clean
-                
-                if metric_type == "Count":
-                    grouped_order = df_clean.groupby([group_col, 'Order_Status']).size().reset_index(name='Count')
-                    y_col = 'Count'
-                else:
-                    grouped_order = df_clean.groupby([group_col, 'Order_Status']).size().reset_index(name='Count')
-                    grouped_order['Percentage'] = grouped_order.groupby(group_col)['Count'].transform(lambda x: x / x.sum() * 100)
-                    y_col = 'Percentage'
-                
-                if not grouped_order.empty:
-                    if chart_type_order == "Bar":
-                        fig_order = px.bar(
-                            grouped_order,
-                            x=group_col,
-                            y=y_col,
-                            color='Order_Status',
-                            title=f"{y_col} by {group_col} and Order Status",
-                            barmode='stack',
-                            text_auto='.2f' if metric_type == "Percentage" else True
-                        )
-                        fig_order.update_layout(xaxis_tickangle=-45)
-                        st.plotly_chart(fig_order, use_container_width=True)
-                    
-                    elif chart_type_order == "Pie":
-                        pie_data_order = grouped_order.groupby('Order_Status')[y_col].sum().reset_index()
-                        fig_order = px.pie(
-                            pie_data_order,
-                            names='Order_Status',
-                            values=y_col,
-                            title=f"Order Status Distribution",
-                            hole=0.3
-                        )
-                        st.plotly_chart(fig_order, use_container_width=True)
-                    
-                    elif chart_type_order == "Line":
-                        fig_order = px.line(
-                            grouped_order,
-                            x=group_col,
-                            y=y_col,
-                            color='Order_Status',
-                            title=f"Order Status Trend",
-                            markers=True
-                        )
-                        st.plotly_chart(fig_order, use_container_width=True)
-                else:
-                    st.warning("No data available for selected filters.")
-                    
-            except Exception as e:
-                st.error(f"Error in Order & Shipping Analysis: {str(e)}")
+        # Month order
+        month_order = {
+            'January': 1, 'February': 2, 'March': 3, 'April': 4,
+            'May': 5, 'June': 6, 'July': 7, 'August': 8,
+            'September': 9, 'October': 10, 'November': 11, 'December': 12
+        }
+        month_names = {number: name for name, number in month_order.items()}
+        df_time = df_time.assign(MonthOrder=df_time['month'].astype(int))
+        df_time['MonthName'] = df_time['MonthOrder'].map(month_names)
         
-        # ==================== TAB 6: B2B Analysis ====================
-        with analysis_tabs[5]:
-            try:
-                df_amazon = pd.read_csv("new_amazon_national_sales.csv")
-                
-                st.subheader("🏢 B2B Distribution Analysis")
-                
-                df_b2b = df_amazon.dropna(subset=['state', 'city', 'b2b'])
-                df_b2b = df_b2b[df_b2b['city'].str.len() > 1]
-                
-                st.sidebar.header("🔍 B2B Filters")
-                
-                analysis_type = st.sidebar.radio("Analysis Type", ['B2B by State', 'B2B by City'], key="b2b_type")
-                
-                if analysis_type == "B2B by State":
-                    state_b2b = df_b2b.groupby(['state', 'b2b']).size().reset_index(name='Count')
-                    state_total = df_b2b.groupby('state').size().reset_index(name='Total')
-                    state_b2b = state_b2b.merge(state_total, on='state')
-                    state_b2b['Percent'] = (state_b2b['Count'] / state_b2b['Total']) * 100
-                    
-                    fig_b2b = px.bar(
-                        state_b2b,
-                        x='state',
-                        y='Percent',
-                        color='b2b',
-                        barmode='stack',
-                        title="B2B % Distribution by State",
-                        text_auto='.2f'
-                    )
-                    fig_b2b.update_layout(xaxis_tickangle=-45)
-                    st.plotly_chart(fig_b2b, use_container_width=True)
-                
-                else:
-                    states_b2b = sorted(df_b2b['state'].unique())
-                    selected_states_b2b = st.sidebar.multiselect("Select States (B2B)", states_b2b, default=states_b2b[:5], key="b2b_state_filter")
-                    
-                    filtered_df_b2b = df_b2b[df_b2b['state'].isin(selected_states_b2b)]
-                    
-                    cities_b2b = sorted(filtered_df_b2b['city'].unique())
-                    selected_cities_b2b = st.sidebar.multiselect("Select Cities (B2B)", cities_b2b, default=cities_b2b[:10], key="b2b_city_filter")
-                    
-                    top_n_b2b = st.sidebar.number_input("Top N Cities (B2B)", 1, 100, 10, key="b2b_top_n")
-                    
-                    df_city_b2b = filtered_df_b2b[filtered_df_b2b['city'].isin(selected_cities_b2b)]
-                    top_cities_b2b = df_city_b2b['city'].value_counts().head(top_n_b2b).index
-                    df_city_b2b = df_city_b2b[df_city_b2b['city'].isin(top_cities_b2b)]
-                    
-                    if not df_city_b2b.empty:
-                        city_b2b = df_city_b2b.groupby(['city', 'b2b']).size().reset_index(name='Count')
-                        city_total = df_city_b2b.groupby('city').size().reset_index(name='Total')
-                        city_b2b = city_b2b.merge(city_total, on='city')
-                        city_b2b['Percent'] = (city_b2b['Count'] / city_b2b['Total']) * 100
-                        
-                        fig_b2b_city = px.bar(
-                            city_b2b,
-                            x='city',
-                            y='Percent',
-                            color='b2b',
-                            barmode='stack',
-                            title="B2B % Distribution by City",
-                            text_auto='.2f'
-                        )
-                        fig_b2b_city.update_layout(xaxis_tickangle=-45)
-                        st.plotly_chart(fig_b2b_city, use_container_width=True)
-                    else:
-                        st.warning("No data for selected filters.")
-                        
-            except Exception as e:
-                st.error(f"Error in B2B Analysis: {str(e)}")
+        # Aggregate by month
+        monthly_agg = df_time.groupby(['MonthOrder', 'MonthName'])[['quantity', 'sale', 'avg. value']].sum().reset_index()
+        monthly_agg = monthly_agg.sort_values('MonthOrder')
         
-        # ==================== TAB 7: Product Performance ====================
-        with analysis_tabs[6]:
-            try:
-                df_amazon = pd.read_csv("new_amazon_national_sales.csv")
-                
-                st.subheader("👗 Product Category & Size Performance")
-                
-                df_product = df_amazon.dropna(subset=['state', 'category', 'size', 'quantity', 'sale'])
-                df_product = df_product[~df_product['state'].str.fullmatch(r"[A-Za-z]", na=False)]
-                
-                st.sidebar.header("🔍 Product Performance Filters")
-                
-                metric_product = st.sidebar.selectbox("Select Metric", ["quantity", "sale"], key="product_metric")
-                
-                states_product = sorted(df_product['state'].dropna().unique())
-                selected_states_product = st.sidebar.multiselect("Select States (Product)", states_product, default=states_product[:5], key="product_state_filter")
-                
-                df_filtered_product = df_product[df_product['state'].isin(selected_states_product)]
-                
-                top_n_product = st.sidebar.number_input("Top N States (Product)", min_value=1, max_value=50, value=10, key="product_top_n")
-                
-                # Category Analysis
-                st.markdown("### 📊 By Product Category")
-                grouped_cat = df_filtered_product.groupby(['state', 'category'])[metric_product].sum().reset_index()
-                grouped_cat = grouped_cat.sort_values(by=metric_product, ascending=False).groupby('state').head(top_n_product)
-                
-                fig_cat = px.bar(grouped_cat, x="state", y=metric_product, color="category",
-                               title=f"{metric_product} by Product Category and State", barmode="group")
-                fig_cat.update_layout(xaxis_tickangle=-45)
-                st.plotly_chart(fig_cat, use_container_width=True)
-                
-                # Percentage by Category
-                df_cat_pct = grouped_cat.copy()
-                df_cat_pct["Percentage"] = df_cat_pct.groupby("state")[metric_product].transform(lambda x: x / x.sum() * 100)
-                fig_pct_cat = px.bar(df_cat_pct, x="state", y="Percentage", color="category",
-                                   title=f"% {metric_product} by Product Category", barmode="stack")
-                fig_pct_cat.update_layout(xaxis_tickangle=-45)
-                st.plotly_chart(fig_pct_cat, use_container_width=True)
-                
-                # Size Analysis
-                st.markdown("---")
-                st.markdown("### 📏 By Product Size")
-                grouped_size = df_filtered_product.groupby(['state', 'size'])[metric_product].sum().reset_index()
-                grouped_size = grouped_size.sort_values(by=metric_product, ascending=False).groupby('state').head(top_n_product)
-                
-                fig_size = px.bar(grouped_size, x="state", y=metric_product, color="size",
-                                title=f"{metric_product} by Product Size and State", barmode="group")
-                fig_size.update_layout(xaxis_tickangle=-45)
-                st.plotly_chart(fig_size, use_container_width=True)
-                
-                # Percentage by Size
-                df_size_pct = grouped_size.copy()
-                df_size_pct["Percentage"] = df_size_pct.groupby("state")[metric_product].transform(lambda x: x / x.sum() * 100)
-                fig_pct_size = px.bar(df_size_pct, x="state", y="Percentage", color="size",
-                                    title=f"% {metric_product} by Product Size", barmode="stack")
-                fig_pct_size.update_layout(xaxis_tickangle=-45)
-                st.plotly_chart(fig_pct_size, use_container_width=True)
-                
-                # Category vs Size Analysis
-                st.markdown("---")
-                st.markdown("### 🔄 Category vs Size Analysis")
-                
-                constant_col = st.selectbox("Group by", ["category", "size"], key="product_group_by")
-                dynamic_col = "size" if constant_col == "category" else "category"
-                
-                grouped_cross = df_filtered_product.groupby([constant_col, dynamic_col])[metric_product].sum().reset_index()
-                options = grouped_cross[constant_col].unique().tolist()
-                selected_group = st.selectbox(f"Select {constant_col}", options, key="product_selected_group")
-                
-                filtered_cross = grouped_cross[grouped_cross[constant_col] == selected_group]
-                
-                fig_cross = px.bar(
-                    filtered_cross,
-                    x=dynamic_col,
-                    y=metric_product,
-                    title=f"{selected_group} - {dynamic_col}: {metric_product}",
-                    color_discrete_sequence=["#1f77b4"]
-                )
-                fig_cross.update_layout(xaxis_tickangle=-45)
-                st.plotly_chart(fig_cross, use_container_width=True)
-                
-            except Exception as e:
-                st.error(f"Error in Product Performance: {str(e)}")
+        # Line Chart
+        st.markdown("### 📊 Monthly Trends")
+        fig_line_time = px.line(
+            monthly_agg,
+            x='MonthName',
+            y=['quantity', 'sale', 'avg. value'],
+            title="Monthly Trends: Quantity, Sales & Avg Value",
+            markers=True,
+            color_discrete_sequence=px.colors.qualitative.Set1
+        )
+        fig_line_time.update_layout(
+            xaxis_title="Month",
+            yaxis_title="Value",
+            xaxis=dict(categoryorder='array', categoryarray=list(month_order.keys()))
+        )
+        plotly_chart(fig_line_time, use_container_width=True)
         
-        # ==================== TAB 8: Time Series ====================
-        with analysis_tabs[7]:
-            try:
-                df_amazon = pd.read_csv("new_amazon_national_sales.csv")
-                
-                st.subheader("📈 Time Series Analysis")
-                
-                # Convert date
-                df_amazon['date'] = pd.to_datetime(df_amazon['date'], errors='coerce')
-                df_time = df_amazon.dropna(subset=['date'])
-                
-                # Extract month info
-                df_time['Month'] = df_time['date'].dt.month
-                df_time['MonthName'] = df_time['date'].dt.strftime('%B')
-                df_time['Year'] = df_time['date'].dt.year
-                
-                # Month order
-                month_order = {
-                    'January': 1, 'February': 2, 'March': 3, 'April': 4,
-                    'May': 5, 'June': 6, 'July': 7, 'August': 8,
-                    'September': 9, 'October': 10, 'November': 11, 'December': 12
-                }
-                df_time['MonthOrder'] = df_time['MonthName'].map(month_order)
-                
-                # Convert numeric
-                df_time['sale'] = pd.to_numeric(df_time['sale'], errors='coerce')
-                df_time['quantity'] = pd.to_numeric(df_time['quantity'], errors='coerce')
-                df_time['avg. value'] = pd.to_numeric(df_time['avg. value'], errors='coerce')
-                
-                # Aggregate by month
-                monthly_agg = df_time.groupby(['MonthOrder', 'MonthName'])[['quantity', 'sale', 'avg. value']].sum().reset_index()
-                monthly_agg = monthly_agg.sort_values('MonthOrder')
-                
-                # Line Chart
-                st.markdown("### 📊 Monthly Trends")
-                fig_line_time = px.line(
-                    monthly_agg,
-                    x='MonthName',
-                    y=['quantity', 'sale', 'avg. value'],
-                    title="Monthly Trends: Quantity, Sales & Avg Value",
-                    markers=True,
-                    color_discrete_sequence=px.colors.qualitative.Set1
-                )
-                fig_line_time.update_layout(
-                    xaxis_title="Month",
-                    yaxis_title="Value",
-                    xaxis=dict(categoryorder='array', categoryarray=list(month_order.keys()))
-                )
-                st.plotly_chart(fig_line_time, use_container_width=True)
-                
-                # Pie Chart
-                st.markdown("---")
-                st.markdown("### 🥧 Monthly Distribution")
-                metric_time = st.selectbox("Select Metric for Pie", ['quantity', 'sale', 'avg. value'], key="time_pie_metric")
-                
-                pie_df = monthly_agg[['MonthName', metric_time]]
-                fig_pie_time = px.pie(
-                    pie_df,
-                    names='MonthName',
-                    values=metric_time,
-                    title=f"Monthly Distribution of {metric_time}",
-                    color_discrete_sequence=px.colors.qualitative.Pastel1
-                )
-                st.plotly_chart(fig_pie_time, use_container_width=True)
-                
-                # Product Category/Size by Month
-                st.markdown("---")
-                st.markdown("### 📅 Product Analysis by Month")
-                
-                months = sorted(df_time['MonthName'].unique(), key=lambda m: month_order[m])
-                selected_months = st.multiselect("Select Months", options=months, default=months[:3], key="time_months")
-                dimension_time = st.selectbox("Select Dimension", ['category', 'size'], key="time_dimension")
-                metric_time_prod = st.selectbox("Select Metric", ['quantity', 'sale', 'avg. value'], key="time_product_metric")
-                
-                filtered_df_time = df_time[df_time['MonthName'].isin(selected_months)]
-                
-                # Line graph
-                line_data_time = filtered_df_time.groupby(['MonthOrder', 'MonthName', dimension_time])[metric_time_prod].sum().reset_index()
-                line_data_time = line_data_time.sort_values('MonthOrder')
-                
-                fig_line_prod = px.line(
-                    line_data_time,
-                    x='MonthName',
-                    y=metric_time_prod,
-                    color=dimension_time,
-                    markers=True,
-                    title=f"{metric_time_prod} over Months by {dimension_time}"
-                )
-                st.plotly_chart(fig_line_prod, use_container_width=True)
+        # Pie Chart
+        st.markdown("---")
+        st.markdown("### 🥧 Monthly Distribution")
+        metric_time = st.selectbox("Select Metric for Pie", ['quantity', 'sale', 'avg. value'], key="time_pie_metric")
+        
+        pie_df = monthly_agg[['MonthName', metric_time]]
+        fig_pie_time = px.pie(
+            pie_df,
+            names='MonthName',
+            values=metric_time,
+            title=f"Monthly Distribution of {metric_time}",
+            color_discrete_sequence=px.colors.qualitative.Pastel1
+        )
+        plotly_chart(fig_pie_time, use_container_width=True)
+        
+        # Product Category/Size by Month
+        st.markdown("---")
+        st.markdown("### 📅 Product Analysis by Month")
+        
+        months = sorted(df_time['MonthName'].unique(), key=lambda m: month_order[m])
+        selected_months = st.multiselect("Select Months", options=months, default=months[:3], key="time_months")
+        dimension_time = st.selectbox("Select Dimension", ['category', 'size'], key="time_dimension")
+        metric_time_prod = st.selectbox("Select Metric", ['quantity', 'sale', 'avg. value'], key="time_product_metric")
+        
+        filtered_df_time = df_time[df_time['MonthName'].isin(selected_months)]
+        
+        # Line graph
+        line_data_time = filtered_df_time.groupby(['MonthOrder', 'MonthName', dimension_time], observed=True)[metric_time_prod].sum().reset_index()
+        line_data_time = line_data_time.sort_values('MonthOrder')
+        
+        fig_line_prod = px.line(
+            line_data_time,
+            x='MonthName',
+            y=metric_time_prod,
+            color=dimension_time,
+            markers=True,
+            title=f"{metric_time_prod} over Months by {dimension_time}"
+        )
+        plotly_chart(fig_line_prod, use_container_width=True)
+        
+        # Percentage stacked bar
+        bar_data_time = filtered_df_time.groupby([dimension_time, 'MonthName'], observed=True)[metric_time_prod].sum().reset_index()
+        bar_data_time['Percent'] = bar_data_time.groupby('MonthName', observed=True)[metric_time_prod].transform(lambda x: 100 * x / x.sum())
+        
+        fig_bar_time = px.bar(
+            bar_data_time,
+            x='MonthName',
+            y='Percent',
+            color=dimension_time,
+            title=f"% Distribution of {metric_time_prod} by {dimension_time}",
+            barmode='stack'
+        )
+        plotly_chart(fig_bar_time, use_container_width=True)
+        
+    except Exception as e:
+        st.error(f"Error in Time Series Analysis: {str(e)}")
+
+
+def render_inventory_stock():
+    st.header("📦 Inventory Stock Management")
+    
+    try:
+        # Load stock data and the per-SKU sales velocity table
+        stock_df = read_dataset(STOCK_REPORT_FILE)
+        velocity_df = load_sku_velocity()
+        
+        # ==================== STOCK LEVEL OVERVIEW ====================
+        trace_section("Stock Level Overview")
+        st.subheader("📊 Stock Level Overview")
+        
+        # Categorize stock levels
+        stock_df = stock_df.assign(Stock_Category=bucket(stock_df['stock'], STOCK_LEVEL_BUCKETS))
+        
+        # Create pie chart with pastel colors
+        stock_distribution = stock_df['Stock_Category'].value_counts()[lambda counts: counts > 0].reset_index()
+        stock_distribution.columns = ['Category', 'Count']
+        
+        fig_stock_pie = px.pie(
+            stock_distribution,
+            values='Count',
+            names='Category',
+            title='Stock Level Distribution',
+            color='Category',
+            color_discrete_map={
+                'Low': '#FFB6C1',      # Light Pink
+                'Medium': '#FFE4B5',   # Moccasin
+                'High': '#B0E0E6'      # Powder Blue
+            }
+        )
+        fig_stock_pie.update_traces(textposition='inside', textinfo='percent+label')
+        plotly_chart(fig_stock_pie, use_container_width=True)
+        
+        # ==================== LOW STOCK ALERT SECTION ====================
+        st.markdown("---")
+        trace_section("Low Stock Alert")
+        st.subheader("⚠️ Low Stock Alert")
+        
+        # Identify low stock items (stock <= 10)
+        low_stock = stock_df[stock_df['stock'] <= 10].copy()
+        
+        if len(low_stock) > 0:
+            st.warning(f"🚨 **{len(low_stock)} items** have critically low stock levels (≤10 units)")
+            
+            # Calculate sales metrics for low stock items
+            if not velocity_df.empty:
+                # Merge sales metrics with low stock data; SKUs without sales get zero counts
+                low_stock = low_stock.merge(velocity_df, on='sku', how='left')
+                low_stock['Sale_Count'] = low_stock['Sale_Count'].fillna(0)
+                low_stock['Total_Quantity_Sold'] = low_stock['Total_Quantity_Sold'].fillna(0)
                 
-                # Percentage stacked bar
-                bar_data_time = filtered_df_time.groupby([dimension_time, 'MonthName'])[metric_time_prod].sum().reset_index()
-                bar_data_time['Percent'] = bar_data_time.groupby('MonthName')[metric_time_prod].transform(lambda x: 100 * x / x.sum())
+                # Days since last sale
+                low_stock['Days_Since_Last_Sale'] = (pd.Timestamp.now() - low_stock['Last_Sale_Date']).dt.days
                 
-                fig_bar_time = px.bar(
-                    bar_data_time,
-                    x='MonthName',
-                    y='Percent',
-                    color=dimension_time,
-                    title=f"% Distribution of {metric_time_prod} by {dimension_time}",
-                    barmode='stack'
-                )
-                st.plotly_chart(fig_bar_time, use_container_width=True)
+                # Classify reorder priority
+                low_stock['Reorder_Priority'] = apply_rules(low_stock, REORDER_PRIORITY_RULES)
                 
-            except Exception as e:
-                st.error(f"Error in Time Series Analysis: {str(e)}")
-    
-    with tab3:
-        st.header("📦 Inventory Stock Management")
+                # Calculate recommended reorder quantity for high priority items
+                reorder_qty = apply_rules(low_stock, REORDER_QUANTITY_RULES)
+                low_stock['Recommended_Reorder_Qty'] = np.trunc(reorder_qty).astype('int64')
+            
+            # Display low stock dataframe
+            display_cols = ['sku', 'design_no', 'category', 'colour', 'stock']
+            if 'Reorder_Priority' in low_stock.columns:
+                display_cols.extend(['Reorder_Priority', 'Sale_Count', 'Days_Since_Last_Sale', 'Recommended_Reorder_Qty'])
+            
+            low_stock_table = low_stock[display_cols].sort_values('stock')
+            paged_dataframe(low_stock_table, "low_stock", use_container_width=True)
+            download_table(low_stock_table, "low_stock_items", "low_stock")
+            
+            # Show high priority items separately
+            if 'Reorder_Priority' in low_stock.columns:
+                high_priority = low_stock[low_stock['Reorder_Priority'] == 'High']
+                if len(high_priority) > 0:
+                    st.error(f"🔥 **{len(high_priority)} HIGH PRIORITY items** need immediate reordering!")
+                    paged_dataframe(
+                        high_priority[['sku', 'design_no', 'category', 'colour', 'stock', 'Sale_Count', 'Recommended_Reorder_Qty']],
+                        "high_priority", use_container_width=True
+                    )
+        else:
+            st.success("✅ No items with critically low stock levels")
         
-        try:
-            # Load stock and sales data
-            stock_df = pd.read_csv("new_stock_report.csv")
-            sales_df = pd.read_csv("new_international_sales_report.csv")
-            
-            # Convert sale date to datetime
-            sales_df['date'] = pd.to_datetime(sales_df['date'], format='%d-%m-%Y', errors='coerce')
-            
-            # ==================== STOCK LEVEL OVERVIEW ====================
-            st.subheader("📊 Stock Level Overview")
-            
-            # Categorize stock levels
-            def categorize_stock(level):
-                if level <= 10:
-                    return "Low"
-                elif level <= 50:
-                    return "Medium"
-                else:
-                    return "High"
-            
-            stock_df['Stock_Category'] = stock_df['stock'].apply(categorize_stock)
-            
-            # Create pie chart with pastel colors
-            stock_distribution = stock_df['Stock_Category'].value_counts().reset_index()
-            stock_distribution.columns = ['Category', 'Count']
-            
-            fig_stock_pie = px.pie(
-                stock_distribution,
-                values='Count',
-                names='Category',
-                title='Stock Level Distribution',
-                color='Category',
-                color_discrete_map={
-                    'Low': '#FFB6C1',      # Light Pink
-                    'Medium': '#FFE4B5',   # Moccasin
-                    'High': '#B0E0E6'      # Powder Blue
-                }
+        # ==================== OVERSTOCKED PRODUCTS ====================
+        st.markdown("---")
+        trace_section("Overstocked Products Analysis")
+        st.subheader("📈 Overstocked Products Analysis")
+        
+        # Total sales by SKU from the shared velocity table
+        if not velocity_df.empty:
+            total_sales = velocity_df[['sku', 'Total_Quantity_Sold']].rename(
+                columns={'Total_Quantity_Sold': 'Total_Sales'}
             )
-            fig_stock_pie.update_traces(textposition='inside', textinfo='percent+label')
-            st.plotly_chart(fig_stock_pie, use_container_width=True)
             
-            # ==================== LOW STOCK ALERT SECTION ====================
-            st.markdown("---")
-            st.subheader("⚠️ Low Stock Alert")
+            # Merge with stock data
+            stock_sales = stock_df.merge(total_sales, on='sku', how='left')
+            stock_sales['Total_Sales'] = stock_sales['Total_Sales'].fillna(0)
             
-            # Identify low stock items (stock <= 10)
-            low_stock = stock_df[stock_df['stock'] <= 10].copy()
+            # Calculate Stock to Sales Ratio
+            stock_sales['Stock_to_Sales_Ratio'] = stock_sales['stock'] / (stock_sales['Total_Sales'] + 1)
             
-            if len(low_stock) > 0:
-                st.warning(f"🚨 **{len(low_stock)} items** have critically low stock levels (≤10 units)")
-                
-                # Calculate sales metrics for low stock items
-                if not sales_df.empty:
-                    sales_metrics = []
-                    
-                    for sku in low_stock['sku'].unique():
-                        sku_sales = sales_df[sales_df['sku'] == sku].copy()
-                        
-                        if len(sku_sales) > 0:
-                            # Sort by date
-                            sku_sales = sku_sales.sort_values('date')
-                            
-                            # Days since last sale
-                            last_sale = sku_sales['date'].max()
-                            days_since_last = (pd.Timestamp.now() - last_sale).days if pd.notna(last_sale) else None
-                            
-                            # Calculate average days between sales
-                            if len(sku_sales) > 1:
-                                date_diffs = sku_sales['date'].diff().dt.days.dropna()
-                                avg_days_between = date_diffs.mean() if len(date_diffs) > 0 else None
-                            else:
-                                avg_days_between = None
-                            
-                            # Sale count
-                            sale_count = len(sku_sales)
-                            total_qty = sku_sales['Quantity_Purchased'].sum()
-                            
-                            sales_metrics.append({
-                                'sku': sku,
-                                'Days_Since_Last_Sale': days_since_last,
-                                'Avg_Days_Between_Sales': avg_days_between,
-                                'Sale_Count': sale_count,
-                                'Total_Quantity_Sold': total_qty
-                            })
-                        else:
-                            sales_metrics.append({
-                                'sku': sku,
-                                'Days_Since_Last_Sale': None,
-                                'Avg_Days_Between_Sales': None,
-                                'Sale_Count': 0,
-                                'Total_Quantity_Sold': 0
-                            })
-                    
-                    # Merge sales metrics with low stock data
-                    metrics_df = pd.DataFrame(sales_metrics)
-                    low_stock = low_stock.merge(metrics_df, on='sku', how='left')
-                    
-                    # Classify reorder priority
-                    def classify_priority(row):
-                        if row['Sale_Count'] > 10 and (row['Days_Since_Last_Sale'] or 0) < 30:
-                            return "High"
-                        elif row['Sale_Count'] > 5:
-                            return "Medium"
-                        else:
-                            return "Low"
-                    
-                    low_stock['Reorder_Priority'] = low_stock.apply(classify_priority, axis=1)
-                    
-                    # Calculate recommended reorder quantity for high priority items
-                    def calculate_reorder_qty(row):
-                        if row['Reorder_Priority'] == "High" and row['Sale_Count'] > 0:
-                            # Frequency-based: estimate monthly demand
-                            if row['Avg_Days_Between_Sales'] and row['Avg_Days_Between_Sales'] > 0:
-                                monthly_demand = (30 / row['Avg_Days_Between_Sales']) * (row['Total_Quantity_Sold'] / row['Sale_Count'])
-                                return int(monthly_demand * 2)  # 2 months buffer
-                            else:
-                                return int(row['Total_Quantity_Sold'] / row['Sale_Count'] * 30)  # Monthly estimate
-                        return 0
-                    
-                    low_stock['Recommended_Reorder_Qty'] = low_stock.apply(calculate_reorder_qty, axis=1)
-                
-                # Display low stock dataframe
-                display_cols = ['sku', 'design_no', 'category', 'colour', 'stock']
-                if 'Reorder_Priority' in low_stock.columns:
-                    display_cols.extend(['Reorder_Priority', 'Sale_Count', 'Days_Since_Last_Sale', 'Recommended_Reorder_Qty'])
+            # Identify overstocked products (stock > 50 and ratio > 5)
+            overstocked = stock_sales[(stock_sales['stock'] > 50) & (stock_sales['Stock_to_Sales_Ratio'] > 5)].copy()
+            
+            if len(overstocked) > 0:
+                st.warning(f"⚠️ **{len(overstocked)} products** appear to be overstocked")
                 
-                st.dataframe(low_stock[display_cols].sort_values('stock'), use_container_width=True)
+                # Add days since last sale
+                last_sale_dates = velocity_df[['sku', 'Last_Sale_Date']]
+                overstocked = overstocked.merge(last_sale_dates, on='sku', how='left')
+                overstocked['Days_Since_Last_Sale'] = (pd.Timestamp.now() - overstocked['Last_Sale_Date']).dt.days
                 
-                # Show high priority items separately
-                if 'Reorder_Priority' in low_stock.columns:
-                    high_priority = low_stock[low_stock['Reorder_Priority'] == 'High']
-                    if len(high_priority) > 0:
-                        st.error(f"🔥 **{len(high_priority)} HIGH PRIORITY items** need immediate reordering!")
-                        st.dataframe(
-                            high_priority[['sku', 'design_no', 'category', 'colour', 'stock', 'Sale_Count', 'Recommended_Reorder_Qty']],
-                            use_container_width=True
-                        )
-            else:
-                st.success("✅ No items with critically low stock levels")
-            
-            # ==================== OVERSTOCKED PRODUCTS ====================
-            st.markdown("---")
-            st.subheader("📈 Overstocked Products Analysis")
-            
-            # Calculate total sales by SKU
-            if not sales_df.empty:
-                total_sales = sales_df.groupby('sku')['Quantity_Purchased'].sum().reset_index()
-                total_sales.columns = ['sku', 'Total_Sales']
+                # Add actionable recommendations
+                overstocked['Recommendation'] = apply_rules(overstocked, OVERSTOCK_RECOMMENDATION_RULES)
                 
-                # Merge with stock data
-                stock_sales = stock_df.merge(total_sales, on='sku', how='left')
-                stock_sales['Total_Sales'] = stock_sales['Total_Sales'].fillna(0)
+                # Display overstocked data
+                overstocked_table = overstocked[['sku', 'design_no', 'category', 'colour', 'stock', 'Total_Sales', 
+                                                 'Stock_to_Sales_Ratio', 'Days_Since_Last_Sale', 'Recommendation']].round(2)
+                paged_dataframe(overstocked_table, "overstocked", use_container_width=True)
+                download_table(overstocked_table, "overstocked_products", "overstocked")
                 
-                # Calculate Stock to Sales Ratio
-                stock_sales['Stock_to_Sales_Ratio'] = stock_sales['stock'] / (stock_sales['Total_Sales'] + 1)
+                # Scatter plot: Stock vs Sales
+                col1, col2 = st.columns(2)
                 
-                # Identify overstocked products (stock > 50 and ratio > 5)
-                overstocked = stock_sales[(stock_sales['stock'] > 50) & (stock_sales['Stock_to_Sales_Ratio'] > 5)].copy()
+                with col1:
+                    fig_scatter = px.scatter(
+                        overstocked,
+                        x='Total_Sales',
+                        y='stock',
+                        color='Recommendation',
+                        hover_data=['sku', 'category', 'colour'],
+                        title='Stock Level vs Total Sales (Overstocked Items)',
+                        labels={'Total_Sales': 'Total Sales', 'stock': 'Stock Level'},
+                        color_discrete_map={
+                            'Consider discontinuing': '#FF6B6B',
+                            'Urgent discount needed': '#FFA07A',
+                            'Promote heavily': '#FFD93D',
+                            'Monitor closely': '#A8E6CF'
+                        }
+                    )
+                    plotly_chart(fig_scatter, use_container_width=True)
                 
-                if len(overstocked) > 0:
-                    st.warning(f"⚠️ **{len(overstocked)} products** appear to be overstocked")
-                    
-                    # Add days since last sale
-                    last_sale_dates = sales_df.groupby('sku')['date'].max().reset_index()
-                    last_sale_dates.columns = ['sku', 'Last_Sale_Date']
-                    overstocked = overstocked.merge(last_sale_dates, on='sku', how='left')
-                    overstocked['Days_Since_Last_Sale'] = (pd.Timestamp.now() - overstocked['Last_Sale_Date']).dt.days
+                with col2:
+                    # Treemap: Category-wise overstock
+                    category_overstock = overstocked.groupby('category', observed=True).agg({
+                        'stock': 'sum',
+                        'sku': 'count'
+                    }).reset_index()
+                    category_overstock.columns = ['Category', 'Total_Stock', 'Product_Count']
                     
-                    # Add actionable recommendations
-                    def get_recommendation(row):
-                        if row['Days_Since_Last_Sale'] > 180 and row['Total_Sales'] < 5:
-                            return "Consider discontinuing"
-                        elif row['Days_Since_Last_Sale'] > 90:
-                            return "Urgent discount needed"
-                        elif row['Stock_to_Sales_Ratio'] > 10:
-                            return "Promote heavily"
-                        else:
-                            return "Monitor closely"
-                    
-                    overstocked['Recommendation'] = overstocked.apply(get_recommendation, axis=1)
-                    
-                    # Display overstocked data
-                    st.dataframe(
-                        overstocked[['sku', 'design_no', 'category', 'colour', 'stock', 'Total_Sales', 
-                                   'Stock_to_Sales_Ratio', 'Days_Since_Last_Sale', 'Recommendation']].round(2),
-                        use_container_width=True
+                    fig_treemap = px.treemap(
+                        category_overstock,
+                        path=['Category'],
+                        values='Total_Stock',
+                        title='Category-wise Overstock Distribution',
+                        color='Product_Count',
+                        color_continuous_scale='Reds'
                     )
-                    
-                    # Scatter plot: Stock vs Sales
-                    col1, col2 = st.columns(2)
-                    
-                    with col1:
-                        fig_scatter = px.scatter(
-                            overstocked,
-                            x='Total_Sales',
-                            y='stock',
-                            color='Recommendation',
-                            hover_data=['sku', 'category', 'colour'],
-                            title='Stock Level vs Total Sales (Overstocked Items)',
-                            labels={'Total_Sales': 'Total Sales', 'stock': 'Stock Level'},
-                            color_discrete_map={
-                                'Consider discontinuing': '#FF6B6B',
-                                'Urgent discount needed': '#FFA07A',
-                                'Promote heavily': '#FFD93D',
-                                'Monitor closely': '#A8E6CF'
-                            }
-                        )
-                        st.plotly_chart(fig_scatter, use_container_width=True)
-                    
-                    with col2:
-                        # Treemap: Category-wise overstock
-                        category_overstock = overstocked.groupby('category').agg({
-                            'stock': 'sum',
-                            'sku': 'count'
-                        }).reset_index()
-                        category_overstock.columns = ['Category', 'Total_Stock', 'Product_Count']
-                        
-                        fig_treemap = px.treemap(
-                            category_overstock,
-                            path=['Category'],
-                            values='Total_Stock',
-                            title='Category-wise Overstock Distribution',
-                            color='Product_Count',
-                            color_continuous_scale='Reds'
-                        )
-                        st.plotly_chart(fig_treemap, use_container_width=True)
-                else:
-                    st.success("✅ No significantly overstocked products detected")
+                    plotly_chart(fig_treemap, use_container_width=True)
             else:
-                st.info("ℹ️ Sales data not available for overstock analysis")
-            
-            # ==================== SUMMARY VISUALS ====================
-            st.markdown("---")
-            st.subheader("📊 Inventory Summary")
-            
-            col1, col2 = st.columns(2)
-            
-            with col1:
-                # Total stock by category
-                total_stock_category = stock_df.groupby('category')['stock'].sum().reset_index()
-                total_stock_category = total_stock_category.sort_values('stock', ascending=False)
-                
-                fig_cat_bar = px.bar(
-                    total_stock_category,
-                    x='category',
-                    y='stock',
-                    title='Total Stock by Category',
-                    labels={'category': 'Category', 'stock': 'Total Stock'},
-                    color='stock',
-                    color_continuous_scale='Blues'
-                )
-                fig_cat_bar.update_layout(xaxis_tickangle=-45)
-                st.plotly_chart(fig_cat_bar, use_container_width=True)
-            
-            with col2:
-                # Total stock by color (top 15)
-                total_stock_color = stock_df.groupby('colour')['stock'].sum().reset_index()
-                total_stock_color = total_stock_color.sort_values('stock', ascending=False).head(15)
-                
-                fig_color_bar = px.bar(
-                    total_stock_color,
-                    x='colour',
-                    y='stock',
-                    title='Total Stock by Color (Top 15)',
-                    labels={'colour': 'Color', 'stock': 'Total Stock'},
-                    color='stock',
-                    color_continuous_scale='Viridis'
-                )
-                fig_color_bar.update_layout(xaxis_tickangle=-45)
-                st.plotly_chart(fig_color_bar, use_container_width=True)
-            
-            # Add third row for size distribution
-            st.markdown("---")
-            
-            # Total stock by size
-            total_stock_size = stock_df.groupby('size')['stock'].sum().reset_index()
-            
-            # Sort by stock in descending order
-            total_stock_size = total_stock_size.sort_values('stock', ascending=False)
+                st.success("✅ No significantly overstocked products detected")
+        else:
+            st.info("ℹ️ Sales data not available for overstock analysis")
+        
+        # ==================== SUMMARY VISUALS ====================
+        st.markdown("---")
+        trace_section("Inventory Summary")
+        st.subheader("📊 Inventory Summary")
+        
+        col1, col2 = st.columns(2)
+        
+        with col1:
+            # Total stock by category
+            total_stock_category = stock_df.groupby('category', observed=True)['stock'].sum().reset_index()
+            total_stock_category = total_stock_category.sort_values('stock', ascending=False)
             
-            fig_size_bar = px.bar(
-                total_stock_size,
-                x='size',
+            fig_cat_bar = px.bar(
+                total_stock_category,
+                x='category',
                 y='stock',
-                title='Total Stock Level by Size',
-                labels={'size': 'Size', 'stock': 'Total Stock'},
+                title='Total Stock by Category',
+                labels={'category': 'Category', 'stock': 'Total Stock'},
                 color='stock',
-                color_continuous_scale='Oranges'
+                color_continuous_scale='Blues'
             )
-            fig_size_bar.update_layout(xaxis_tickangle=0, height=500)
-            st.plotly_chart(fig_size_bar, use_container_width=True)
-            
-            # Key Metrics Summary
-            st.markdown("---")
-            st.subheader("📋 Key Metrics")
-            
-            metric_col1, metric_col2, metric_col3, metric_col4 = st.columns(4)
-            
-            with metric_col1:
-                total_stock = stock_df['stock'].sum()
-                st.metric("Total Stock Units", f"{total_stock:,.0f}")
-            
-            with metric_col2:
-                avg_stock = stock_df['stock'].mean()
-                st.metric("Average Stock per SKU", f"{avg_stock:.1f}")
-            
-            with metric_col3:
-                low_stock_count = len(stock_df[stock_df['stock'] <= 10])
-                st.metric("Low Stock Items", low_stock_count)
-            
-            with metric_col4:
-                unique_skus = stock_df['sku'].nunique()
-                st.metric("Total SKUs", unique_skus)
-            
-        except Exception as e:
-            st.error(f"Error in Inventory Stock Management: {str(e)}")
-            import traceback
-            st.code(traceback.format_exc())
-    
-    with tab4:
-        st.header("🔄 Product Return Analysis")
+            fig_cat_bar.update_layout(xaxis_tickangle=-45)
+            plotly_chart(fig_cat_bar, use_container_width=True)
         
-        try:
-            # Load data files
-            amazon_df = pd.read_csv("new_amazon_national_sales.csv")
-            stock_df = pd.read_csv("new_stock_report.csv")
-            
-            # Clean column names (remove extra spaces)
-            amazon_df.columns = amazon_df.columns.str.strip()
-            stock_df.columns = stock_df.columns.str.strip()
-            
-            # Convert order date to datetime
-            amazon_df['date'] = pd.to_datetime(amazon_df['date'], format='%Y-%m-%d', errors='coerce')
-            
-            # Extract month and year for trend analysis
-            amazon_df['Month'] = amazon_df['date'].dt.to_period('M').astype(str)
-            amazon_df['Year'] = amazon_df['date'].dt.year
-            
-            # Identify returns/cancellations (case-insensitive)
-            amazon_df['is_return'] = amazon_df['Order_Status'].str.lower().str.contains('cancelled|returned', na=False)
-            
-            # Calculate return metrics by SKU
-            sku_metrics = amazon_df.groupby('sku').agg({
-                'Order_ID': 'count',  # Total orders
-                'is_return': 'sum'     # Total returns
-            }).reset_index()
-            sku_metrics.columns = ['sku', 'total_orders', 'total_returns']
-            
-            # Calculate return rate
-            sku_metrics['return_rate'] = (sku_metrics['total_returns'] / sku_metrics['total_orders']) * 100
-            sku_metrics['return_rate'] = sku_metrics['return_rate'].fillna(0)
-            
-            # Merge with stock data for category and stock level info
-            analysis_df = sku_metrics.merge(stock_df, on='sku', how='left')
-            
-            # Clean null values
-            analysis_df = analysis_df.dropna(subset=['category', 'stock'])
-            
-            # ==================== DASHBOARD HEADER ====================
-            st.subheader("📈 Return Rate Analytics")
-            
-            # Key Metrics
-            metric_col1, metric_col2, metric_col3, metric_col4 = st.columns(4)
-            
-            with metric_col1:
-                total_orders = amazon_df['Order_ID'].nunique()
-                st.metric("Total Orders", f"{total_orders:,}")
-            
-            with metric_col2:
-                total_returns = amazon_df[amazon_df['is_return']]['Order_ID'].count()
-                st.metric("Total Returns", f"{total_returns:,}")
-            
-            with metric_col3:
-                overall_return_rate = (total_returns / len(amazon_df)) * 100
-                st.metric("Overall Return Rate", f"{overall_return_rate:.2f}%")
-            
-            with metric_col4:
-                high_return_products = len(analysis_df[analysis_df['return_rate'] >= 90])
-                st.metric("High Return Products (≥90%)", high_return_products)
-            
-            # ==================== 1. PRODUCTS WITH ≥90% RETURN RATE ====================
-            st.markdown("---")
-            st.subheader("🚨 Products with High Return Rate (≥90%)")
-            
-            high_return_df = analysis_df[analysis_df['return_rate'] >= 90].copy()
-            
-            if len(high_return_df) > 0:
-                # Sort by return rate descending
-                high_return_df = high_return_df.sort_values('return_rate', ascending=False).head(20)
-                
-                fig_high_return = px.bar(
-                    high_return_df,
-                    x='sku',
-                    y='return_rate',
-                    title='Top 20 Products with ≥90% Return Rate',
-                    labels={'sku': 'Product SKU', 'return_rate': 'Return Rate (%)'},
-                    color='return_rate',
-                    color_continuous_scale='Reds',
-                    hover_data=['category', 'total_orders', 'total_returns']
-                )
-                fig_high_return.update_layout(xaxis_tickangle=-45, height=500)
-                st.plotly_chart(fig_high_return, use_container_width=True)
-                
-                # Show data table
-                st.dataframe(
-                    high_return_df[['sku', 'category', 'total_orders', 'total_returns', 'return_rate', 'stock']].round(2),
-                    use_container_width=True
-                )
-            else:
-                st.success("✅ No products with return rate ≥90%")
-            
-            # ==================== 2. PIE CHART - RETURN RATE DISTRIBUTION ====================
-            st.markdown("---")
-            st.subheader("📊 Return Rate Distribution by Range")
-            
-            # Categorize products by return rate ranges
-            def categorize_return_rate(rate):
-                if rate <= 10:
-                    return "0-10%"
-                elif rate <= 20:
-                    return "10-20%"
-                elif rate <= 30:
-                    return "20-30%"
-                elif rate <= 40:
-                    return "30-40%"
-                elif rate <= 50:
-                    return "40-50%"
-                elif rate <= 60:
-                    return "50-60%"
-                elif rate <= 70:
-                    return "60-70%"
-                elif rate <= 80:
-                    return "70-80%"
-                elif rate <= 90:
-                    return "80-90%"
-                else:
-                    return "90-100%"
-            
-            analysis_df['return_rate_range'] = analysis_df['return_rate'].apply(categorize_return_rate)
-            
-            # Count products in each range
-            range_distribution = analysis_df['return_rate_range'].value_counts().reset_index()
-            range_distribution.columns = ['Range', 'Count']
-            
-            # Sort by range order
-            range_order = ["0-10%", "10-20%", "20-30%", "30-40%", "40-50%", 
-                          "50-60%", "60-70%", "70-80%", "80-90%", "90-100%"]
-            range_distribution['Range'] = pd.Categorical(range_distribution['Range'], categories=range_order, ordered=True)
-            range_distribution = range_distribution.sort_values('Range')
-            
-            fig_pie = px.pie(
-                range_distribution,
-                values='Count',
-                names='Range',
-                title='Product Distribution by Return Rate Range',
-                color_discrete_sequence=px.colors.qualitative.Set3
-            )
-            fig_pie.update_traces(textposition='inside', textinfo='percent+label')
-            st.plotly_chart(fig_pie, use_container_width=True)
-            
-            # ==================== 3. AVERAGE RETURN RATE BY CATEGORY ====================
-            st.markdown("---")
-            st.subheader("📦 Average Return Rate by Product Category")
-            
-            category_return = analysis_df.groupby('category')['return_rate'].mean().reset_index()
-            category_return = category_return.sort_values('return_rate', ascending=False)
-            
-            fig_category = px.bar(
-                category_return,
-                x='category',
-                y='return_rate',
-                title='Average Return Rate by Category',
-                labels={'category': 'Product Category', 'return_rate': 'Average Return Rate (%)'},
-                color='return_rate',
-                color_continuous_scale='Oranges'
+        with col2:
+            # Total stock by color (top 15)
+            total_stock_color = stock_df.groupby('colour', observed=True)['stock'].sum().reset_index()
+            total_stock_color = total_stock_color.sort_values('stock', ascending=False).head(15)
+            
+            fig_color_bar = px.bar(
+                total_stock_color,
+                x='colour',
+                y='stock',
+                title='Total Stock by Color (Top 15)',
+                labels={'colour': 'Color', 'stock': 'Total Stock'},
+                color='stock',
+                color_continuous_scale='Viridis'
             )
-            fig_category.update_layout(xaxis_tickangle=-45, height=500)
-            st.plotly_chart(fig_category, use_container_width=True)
-            
-            # ==================== 4. SCATTER PLOT - STOCK LEVEL vs RETURN RATE ====================
-            st.markdown("---")
-            st.subheader("🔍 Correlation: Stock Level vs Return Rate")
-            
-            # Filter out extreme outliers for better visualization
-            scatter_df = analysis_df[(analysis_df['stock'] < 500)].copy()
+            fig_color_bar.update_layout(xaxis_tickangle=-45)
+            plotly_chart(fig_color_bar, use_container_width=True)
+        
+        # Add third row for size distribution
+        st.markdown("---")
+        
+        # Total stock by size
+        total_stock_size = stock_df.groupby('size', observed=True)['stock'].sum().reset_index()
+        
+        # Sort by stock in descending order
+        total_stock_size = total_stock_size.sort_values('stock', ascending=False)
+        
+        fig_size_bar = px.bar(
+            total_stock_size,
+            x='size',
+            y='stock',
+            title='Total Stock Level by Size',
+            labels={'size': 'Size', 'stock': 'Total Stock'},
+            color='stock',
+            color_continuous_scale='Oranges'
+        )
+        fig_size_bar.update_layout(xaxis_tickangle=0, height=500)
+        plotly_chart(fig_size_bar, use_container_width=True)
+        
+        # Key Metrics Summary
+        st.markdown("---")
+        trace_section("Key Metrics")
+        st.subheader("📋 Key Metrics")
+        
+        metric_col1, metric_col2, metric_col3, metric_col4 = st.columns(4)
+        
+        with metric_col1:
+            total_stock = stock_df['stock'].sum()
+            st.metric("Total Stock Units", f"{total_stock:,.0f}")
+        
+        with metric_col2:
+            avg_stock = stock_df['stock'].mean()
+            st.metric("Average Stock per SKU", f"{avg_stock:.1f}")
+        
+        with metric_col3:
+            low_stock_count = len(stock_df[stock_df['stock'] <= 10])
+            st.metric("Low Stock Items", low_stock_count)
+        
+        with metric_col4:
+            unique_skus = stock_df['sku'].nunique()
+            st.metric("Total SKUs", unique_skus)
+        
+    except Exception as e:
+        st.error(f"Error in Inventory Stock Management: {str(e)}")
+        import traceback
+        st.code(traceback.format_exc())
+
+
+def render_product_returns():
+    st.header("🔄 Product Return Analysis")
+    
+    try:
+        # Return metrics and the shared SKU fact table (SKUs with orders)
+        order_returns = load_order_returns()
+        return_totals = order_returns['totals']
+        sku_facts = load_sku_facts()
+        analysis_df = sku_facts[sku_facts['ordered']].sort_values('sku').reset_index(drop=True)
+        
+        # ==================== DASHBOARD HEADER ====================
+        trace_section("Return Rate Analytics")
+        st.subheader("📈 Return Rate Analytics")
+        
+        # Key Metrics
+        metric_col1, metric_col2, metric_col3, metric_col4 = st.columns(4)
+        
+        with metric_col1:
+            total_orders = return_totals['orders']
+            st.metric("Total Orders", f"{total_orders:,}")
+        
+        with metric_col2:
+            total_returns = return_totals['returns']
+            st.metric("Total Returns", f"{total_returns:,}")
+        
+        with metric_col3:
+            overall_return_rate = (total_returns / return_totals['lines']) * 100
+            st.metric("Overall Return Rate", f"{overall_return_rate:.2f}%")
+        
+        with metric_col4:
+            high_return_products = len(analysis_df[analysis_df['return_rate'] >= 90])
+            st.metric("High Return Products (≥90%)", high_return_products)
+        
+        # ==================== 1. PRODUCTS WITH ≥90% RETURN RATE ====================
+        st.markdown("---")
+        trace_section("High Return Rate Products")
+        st.subheader("🚨 Products with High Return Rate (≥90%)")
+        
+        high_return_df = analysis_df[analysis_df['return_rate'] >= 90].copy()
+        
+        if len(high_return_df) > 0:
+            # Sort by return rate descending
+            high_return_df = high_return_df.sort_values('return_rate', ascending=False).head(20)
             
-            fig_scatter = px.scatter(
-                scatter_df,
-                x='stock',
+            fig_high_return = px.bar(
+                high_return_df,
+                x='sku',
                 y='return_rate',
-                title='Stock Level vs Return Rate Correlation',
-                labels={'stock': 'Stock Level', 'return_rate': 'Return Rate (%)'},
+                title='Top 20 Products with ≥90% Return Rate',
+                labels={'sku': 'Product SKU', 'return_rate': 'Return Rate (%)'},
                 color='return_rate',
-                color_continuous_scale='Viridis',
-                hover_data=['sku', 'category', 'total_orders'],
-                opacity=0.6
-            )
-            
-            # Add trend line
-            from scipy import stats
-            if len(scatter_df) > 1:
-                slope, intercept, r_value, p_value, std_err = stats.linregress(scatter_df['stock'], scatter_df['return_rate'])
-                trend_line = slope * scatter_df['stock'] + intercept
-                
-                import plotly.graph_objects as go
-                fig_scatter.add_trace(go.Scatter(
-                    x=scatter_df['stock'],
-                    y=trend_line,
-                    mode='lines',
-                    name=f'Trend Line (R²={r_value**2:.3f})',
-                    line=dict(color='red', dash='dash')
-                ))
-            
-            fig_scatter.update_layout(height=500)
-            st.plotly_chart(fig_scatter, use_container_width=True)
-            
-            # Display correlation coefficient
-            if len(scatter_df) > 1:
-                correlation = scatter_df[['stock', 'return_rate']].corr().iloc[0, 1]
-                if abs(correlation) < 0.3:
-                    corr_interpretation = "Weak"
-                elif abs(correlation) < 0.7:
-                    corr_interpretation = "Moderate"
-                else:
-                    corr_interpretation = "Strong"
-                
-                st.info(f"📊 Correlation Coefficient: **{correlation:.3f}** ({corr_interpretation} {'positive' if correlation > 0 else 'negative'} correlation)")
-            
-            # ==================== 5. LINE CHART - RETURN RATE TREND BY MONTH ====================
-            st.markdown("---")
-            st.subheader("📅 Return Rate Trend Over Time")
-            
-            # Calculate monthly return rates
-            monthly_data = amazon_df.groupby('Month').agg({
-                'Order_ID': 'count',
-                'is_return': 'sum'
-            }).reset_index()
-            monthly_data.columns = ['Month', 'total_orders', 'total_returns']
-            monthly_data['return_rate'] = (monthly_data['total_returns'] / monthly_data['total_orders']) * 100
-            
-            # Sort by month
-            monthly_data = monthly_data.sort_values('Month')
-            
-            fig_trend = px.line(
-                monthly_data,
-                x='Month',
-                y='return_rate',
-                title='Monthly Return Rate Trend',
-                labels={'Month': 'Month', 'return_rate': 'Return Rate (%)'},
-                markers=True
+                color_continuous_scale='Reds',
+                hover_data=['category', 'total_orders', 'total_returns']
             )
+            fig_high_return.update_layout(xaxis_tickangle=-45, height=500)
+            plotly_chart(fig_high_return, use_container_width=True)
             
-            fig_trend.update_traces(line_color='#FF6B6B', marker=dict(size=10, color='#FF6B6B'))
-            fig_trend.update_layout(
-                height=500,
-                hovermode='x unified',
-                xaxis_tickangle=-45
+            # Show data table
+            st.dataframe(
+                high_return_df[['sku', 'category', 'total_orders', 'total_returns', 'return_rate', 'stock']].round(2),
+                use_container_width=True
             )
-            st.plotly_chart(fig_trend, use_container_width=True)
-            
-            # Show monthly data table
-            with st.expander("📋 View Monthly Return Data"):
-                st.dataframe(monthly_data.round(2), use_container_width=True)
-            
-            # ==================== ADDITIONAL INSIGHTS ====================
-            st.markdown("---")
-            st.subheader("💡 Key Insights")
-            
-            col1, col2 = st.columns(2)
-            
-            with col1:
-                st.markdown("### 🔴 Top 5 Categories with Highest Return Rate")
-                top_categories = category_return.head(5)
-                for idx, row in top_categories.iterrows():
-                    st.write(f"**{row['category']}**: {row['return_rate']:.2f}%")
+        else:
+            st.success("✅ No products with return rate ≥90%")
+        
+        # ==================== 2. PIE CHART - RETURN RATE DISTRIBUTION ====================
+        st.markdown("---")
+        trace_section("Return Rate Distribution by Range")
+        st.subheader("📊 Return Rate Distribution by Range")
+        
+        # Categorize products by return rate ranges
+        analysis_df['return_rate_range'] = bucket(analysis_df['return_rate'], RETURN_RATE_BUCKETS)
+        
+        # Count products in each range
+        range_distribution = analysis_df['return_rate_range'].value_counts()[lambda counts: counts > 0].reset_index()
+        range_distribution.columns = ['Range', 'Count']
+        
+        # Sort by range order
+        range_order = ["0-10%", "10-20%", "20-30%", "30-40%", "40-50%", 
+                      "50-60%", "60-70%", "70-80%", "80-90%", "90-100%"]
+        range_distribution['Range'] = pd.Categorical(range_distribution['Range'], categories=range_order, ordered=True)
+        range_distribution = range_distribution.sort_values('Range')
+        
+        fig_pie = px.pie(
+            range_distribution,
+            values='Count',
+            names='Range',
+            title='Product Distribution by Return Rate Range',
+            color_discrete_sequence=px.colors.qualitative.Set3
+        )
+        fig_pie.update_traces(textposition='inside', textinfo='percent+label')
+        plotly_chart(fig_pie, use_container_width=True)
+        
+        # ==================== 3. AVERAGE RETURN RATE BY CATEGORY ====================
+        st.markdown("---")
+        trace_section("Average Return Rate by Product Category")
+        st.subheader("📦 Average Return Rate by Product Category")
+        
+        category_return = analysis_df.groupby('category', observed=True)['return_rate'].mean().reset_index()
+        category_return = category_return.sort_values('return_rate', ascending=False)
+        
+        fig_category = px.bar(
+            category_return,
+            x='category',
+            y='return_rate',
+            title='Average Return Rate by Category',
+            labels={'category': 'Product Category', 'return_rate': 'Average Return Rate (%)'},
+            color='return_rate',
+            color_continuous_scale='Oranges'
+        )
+        fig_category.update_layout(xaxis_tickangle=-45, height=500)
+        plotly_chart(fig_category, use_container_width=True)
+        
+        # ==================== 4. SCATTER PLOT - STOCK LEVEL vs RETURN RATE ====================
+        st.markdown("---")
+        trace_section("Correlation: Stock Level vs Return Rate")
+        st.subheader("🔍 Correlation: Stock Level vs Return Rate")
+        
+        # Filter out extreme outliers for better visualization
+        scatter_df = analysis_df[(analysis_df['stock'] < 500)].copy()
+        
+        fig_scatter = large_scatter(
+            scatter_df,
+            x='stock',
+            y='return_rate',
+            title='Stock Level vs Return Rate Correlation',
+            labels={'stock': 'Stock Level', 'return_rate': 'Return Rate (%)'},
+            color='return_rate',
+            color_continuous_scale='Viridis',
+            hover_data=['sku', 'category', 'total_orders'],
+            opacity=0.6
+        )
+        
+        # Add trend line
+        from scipy import stats
+        if len(scatter_df) > 1:
+            slope, intercept, r_value, p_value, std_err = stats.linregress(scatter_df['stock'], scatter_df['return_rate'])
+            fig_scatter.add_trace(trend_line_trace(
+                scatter_df['stock'], slope, intercept,
+                name=f'Trend Line (R²={r_value**2:.3f})',
+                line=dict(color='red', dash='dash')
+            ))
+        
+        fig_scatter.update_layout(height=500)
+        plotly_chart(fig_scatter, use_container_width=True)
+        
+        # Display correlation coefficient
+        if len(scatter_df) > 1:
+            correlation = scatter_df[['stock', 'return_rate']].corr().iloc[0, 1]
+            if abs(correlation) < 0.3:
+                corr_interpretation = "Weak"
+            elif abs(correlation) < 0.7:
+                corr_interpretation = "Moderate"
+            else:
+                corr_interpretation = "Strong"
             
-            with col2:
-                st.markdown("### 🟢 Top 5 Categories with Lowest Return Rate")
-                bottom_categories = category_return.tail(5).sort_values('return_rate')
-                for idx, row in bottom_categories.iterrows():
-                    st.write(f"**{row['category']}**: {row['return_rate']:.2f}%")
+            st.info(f"📊 Correlation Coefficient: **{correlation:.3f}** ({corr_interpretation} {'positive' if correlation > 0 else 'negative'} correlation)")
+        
+        # ==================== 5. LINE CHART - RETURN RATE TREND BY MONTH ====================
+        st.markdown("---")
+        trace_section("Return Rate Trend Over Time")
+        st.subheader("📅 Return Rate Trend Over Time")
+        
+        # Calculate monthly return rates
+        monthly_data = order_returns['monthly']
+        monthly_data = monthly_data.assign(return_rate=(monthly_data['total_returns'] / monthly_data['total_orders']) * 100)
+        
+        # Sort by month
+        monthly_data = monthly_data.sort_values('Month')
+        
+        fig_trend = px.line(
+            monthly_data,
+            x='Month',
+            y='return_rate',
+            title='Monthly Return Rate Trend',
+            labels={'Month': 'Month', 'return_rate': 'Return Rate (%)'},
+            markers=True
+        )
+        
+        fig_trend.update_traces(line_color='#FF6B6B', marker=dict(size=10, color='#FF6B6B'))
+        fig_trend.update_layout(
+            height=500,
+            hovermode='x unified',
+            xaxis_tickangle=-45
+        )
+        plotly_chart(fig_trend, use_container_width=True)
+        
+        # Show monthly data table
+        with st.expander("📋 View Monthly Return Data"):
+            st.dataframe(monthly_data.round(2), use_container_width=True)
+        
+        # ==================== ADDITIONAL INSIGHTS ====================
+        st.markdown("---")
+        trace_section("Key Insights")
+        st.subheader("💡 Key Insights")
+        
+        col1, col2 = st.columns(2)
+        
+        with col1:
+            st.markdown("### 🔴 Top 5 Categories with Highest Return Rate")
+            top_categories = category_return.head(5)
+            for idx, row in top_categories.iterrows():
+                st.write(f"**{row['category']}**: {row['return_rate']:.2f}%")
+        
+        with col2:
+            st.markdown("### 🟢 Top 5 Categories with Lowest Return Rate")
+            bottom_categories = category_return.tail(5).sort_values('return_rate')
+            for idx, row in bottom_categories.iterrows():
+                st.write(f"**{row['category']}**: {row['return_rate']:.2f}%")
+        
+    except Exception as e:
+        st.error(f"Error in Product Return Analysis: {str(e)}")
+        import traceback
+        st.code(traceback.format_exc())
+
+
+def render_stock_returns_correlation():
+    st.header("📊 Stock & Return Correlation Analysis")
+    
+    try:
+        # ==================== DATA PREPARATION ====================
+        
+        # Stock rows with return metrics and per-day holding cost from the
+        # shared SKU fact table
+        merged_df = load_sku_facts()
+        
+        # Rename columns for consistency
+        merged_df = merged_df.rename(columns={
+            'stock': 'Stock_Level',
+            'category': 'Product_Category',
+            'sku': 'Product_SKU'
+        })
+        
+        # ==================== KEY METRICS ====================
+        trace_section("Overview Metrics")
+        st.subheader("📈 Overview Metrics")
+        
+        metric_col1, metric_col2, metric_col3, metric_col4 = st.columns(4)
+        
+        with metric_col1:
+            avg_return_rate = merged_df['return_rate'].mean()
+            st.metric("Avg Return Rate", f"{avg_return_rate:.2f}%")
+        
+        with metric_col2:
+            total_stock = merged_df['Stock_Level'].sum()
+            st.metric("Total Stock Units", f"{total_stock:,.0f}")
+        
+        with metric_col3:
+            avg_cost = merged_df['per-day_cost'].mean()
+            st.metric("Avg Cost/Day", f"₹{avg_cost:.2f}")
+        
+        with metric_col4:
+            high_risk_count = len(merged_df[(merged_df['return_rate'] > 70) & 
+                                           (merged_df['Stock_Level'] > merged_df['Stock_Level'].median())])
+            st.metric("High-Risk Products", high_risk_count)
+        
+        # ==================== SCATTER PLOT 1: STOCK vs RETURN RATE ====================
+        st.markdown("---")
+        trace_section("Stock Level vs Return Rate Analysis")
+        st.subheader("🔵 Stock Level vs Return Rate Analysis")
+        
+        # Filter for better visualization (remove extreme outliers)
+        scatter_df1 = merged_df[merged_df['Stock_Level'] < 500].copy()
+        
+        fig_scatter1 = large_scatter(
+            scatter_df1,
+            x='Stock_Level',
+            y='return_rate',
+            size='per-day_cost',
+            color='Product_Category',
+            hover_name='Product_SKU',
+            hover_data={
+                'Stock_Level': True,
+                'return_rate': ':.2f',
+                'per-day_cost': ':.2f',
+                'total_orders': True
+            },
+            title='Stock Level vs Return Rate (Bubble size = Cost per day)',
+            labels={
+                'Stock_Level': 'Stock Level',
+                'return_rate': 'Return Rate (%)',
+                'per-day_cost': 'Per-day Cost (₹)'
+            },
+            size_max=30
+        )
+        
+        fig_scatter1.update_layout(height=600)
+        plotly_chart(fig_scatter1, use_container_width=True)
+        
+        # Conclusion for Scatter Plot 1
+        stock_return_corr_1 = scatter_df1[['Stock_Level', 'return_rate']].corr().iloc[0, 1]
+        high_stock_high_return = scatter_df1[(scatter_df1['Stock_Level'] > scatter_df1['Stock_Level'].quantile(0.75)) & 
+                                              (scatter_df1['return_rate'] > 50)]
+        
+        st.markdown("### 📝 Conclusion:")
+        if stock_return_corr_1 > 0.3:
+            st.warning(f"""
+            **⚠️ Concerning Pattern Detected**  
+            - Products with higher stock levels tend to have higher return rates (correlation: {stock_return_corr_1:.3f})
+            - **{len(high_stock_high_return)} products** have both high stock (top 25%) and high return rates (>50%)
+            - **Implication**: You may be overstocking products that customers don't like or have quality issues
+            - **Action**: Review high-stock, high-return items for quality, description accuracy, or discontinuation
+            """)
+        elif stock_return_corr_1 < -0.3:
+            st.success(f"""
+            **✅ Positive Pattern**  
+            - Products with higher stock levels have LOWER return rates (correlation: {stock_return_corr_1:.3f})
+            - **Implication**: You're stocking more of the products customers love and keep
+            - **Action**: Continue this strategy - stock up on winners!
+            """)
+        else:
+            st.info(f"""
+            **ℹ️ No Strong Relationship**  
+            - Stock levels and return rates are largely independent (correlation: {stock_return_corr_1:.3f})
+            - **Implication**: How much you stock doesn't affect return likelihood
+            - **Action**: Returns are driven by other factors (quality, fit, description) - focus inventory decisions on demand forecasting
+            """)
+        
+        # ==================== SCATTER PLOT 2: COST vs RETURN RATE ====================
+        st.markdown("---")
+        trace_section("Per-day Cost vs Return Rate Analysis")
+        st.subheader(" Per-day Cost vs Return Rate Analysis")
+        
+        # Filter for better visualization
+        scatter_df2 = merged_df[merged_df['per-day_cost'] < 100].copy()
+        
+        fig_scatter2 = large_scatter(
+            scatter_df2,
+            x='per-day_cost',
+            y='return_rate',
+            size='Stock_Level',
+            color='Product_Category',
+            hover_name='Product_SKU',
+            hover_data={
+                'per-day_cost': ':.2f',
+                'return_rate': ':.2f',
+                'Stock_Level': True,
+                'total_orders': True
+            },
+            title='Per-day Cost vs Return Rate (Bubble size = Stock Level)',
+            labels={
+                'per-day_cost': 'Per-day Cost (₹)',
+                'return_rate': 'Return Rate (%)',
+                'Stock_Level': 'Stock Level'
+            },
+            size_max=30
+        )
+        
+        fig_scatter2.update_layout(height=600)
+        plotly_chart(fig_scatter2, use_container_width=True)
+        
+        # Conclusion for Scatter Plot 2
+        cost_return_corr = scatter_df2[['per-day_cost', 'return_rate']].corr().iloc[0, 1]
+        high_cost_high_return = scatter_df2[(scatter_df2['per-day_cost'] > scatter_df2['per-day_cost'].quantile(0.75)) & 
+                                            (scatter_df2['return_rate'] > 50)]
+        total_waste_cost = high_cost_high_return['per-day_cost'].sum()
+        
+        st.markdown("### 📝 Conclusion:")
+        if len(high_cost_high_return) > 0:
+            st.error(f"""
+            **💸 High Financial Risk Identified**  
+            - **{len(high_cost_high_return)} products** have both high daily costs (top 25%) and high return rates (>50%)
+            - **Daily cost impact**: ₹{total_waste_cost:,.2f} spent holding frequently-returned items
+            - **Correlation**: {cost_return_corr:.3f} - {'Strong' if abs(cost_return_corr) > 0.7 else 'Moderate' if abs(cost_return_corr) > 0.3 else 'Weak'} relationship
+            - **Action**: Prioritize investigating expensive-to-hold items with high returns - these hurt profitability most
+            """)
+        else:
+            st.success(f"""
+            **✅ Good Cost Management**  
+            - No products with both high costs and high return rates
+            - **Correlation**: {cost_return_corr:.3f} - expensive items aren't being returned excessively
+            - **Action**: Continue monitoring, but current cost-return balance is healthy
+            """)
+        
+        # ==================== BAR CHART: AVERAGE RETURN RATE BY CATEGORY ====================
+        st.markdown("---")
+        trace_section("Average Return Rate by Product Category")
+        st.subheader("📊 Average Return Rate by Product Category")
+        
+        category_avg = merged_df.groupby('Product_Category', observed=True)['return_rate'].mean().reset_index()
+        category_avg = category_avg.sort_values('return_rate', ascending=False)
+        
+        fig_category = px.bar(
+            category_avg,
+            x='Product_Category',
+            y='return_rate',
+            title='Average Return Rate by Category',
+            labels={
+                'Product_Category': 'Product Category',
+                'return_rate': 'Average Return Rate (%)'
+            },
+            color='return_rate',
+            color_continuous_scale='Reds'
+        )
+        
+        fig_category.update_layout(
+            xaxis_tickangle=-45,
+            height=500,
+            showlegend=False
+        )
+        plotly_chart(fig_category, use_container_width=True)
+        
+        # Conclusion for Bar Chart
+        worst_category = category_avg.iloc[0]
+        best_category = category_avg.iloc[-1]
+        avg_overall = category_avg['return_rate'].mean()
+        high_return_categories = category_avg[category_avg['return_rate'] > 50]
+        
+        st.markdown("### 📝 Conclusion:")
+        if len(high_return_categories) > 0:
+            st.warning(f"""
+            **⚠️ Problem Categories Identified**  
+            - **Worst performer**: {worst_category['Product_Category']} ({worst_category['return_rate']:.1f}% return rate)
+            - **Best performer**: {best_category['Product_Category']} ({best_category['return_rate']:.1f}% return rate)
+            - **{len(high_return_categories)} categories** have >50% return rates
+            - **Overall average**: {avg_overall:.1f}%
+            - **Action**: Focus quality control and customer feedback analysis on high-return categories
+            - **Consider**: Category-specific improvements (sizing guides, better photos, material descriptions)
+            """)
+        else:
+            st.success(f"""
+            **✅ Good Category Performance**  
+            - **Worst performer**: {worst_category['Product_Category']} ({worst_category['return_rate']:.1f}% return rate)
+            - **Best performer**: {best_category['Product_Category']} ({best_category['return_rate']:.1f}% return rate)
+            - All categories have <50% return rates
+            - **Overall average**: {avg_overall:.1f}%
+            - **Action**: Maintain current quality standards while optimizing worst-performing category
+            """)
+        
+        # ==================== HIGH-RISK TABLE ====================
+        st.markdown("---")
+        trace_section("High-Risk Overstocked Products")
+        st.subheader("🚨 High-Risk Overstocked Products (High Cost & Return)")
+        
+        # Calculate median stock level
+        median_stock = merged_df['Stock_Level'].median()
+        
+        # Filter high-risk products
+        high_risk_df = merged_df[
+            (merged_df['return_rate'] > 70) & 
+            (merged_df['Stock_Level'] > median_stock)
+        ].copy()
+        
+        if len(high_risk_df) > 0:
+            # Sort by return rate and cost
+            high_risk_df = high_risk_df.sort_values(['return_rate', 'per-day_cost'], ascending=[False, False])
+            
+            # Display the table
+            st.warning(f"⚠️ Found **{len(high_risk_df)} high-risk products** with >70% return rate and above-median stock levels")
+            
+            display_df = high_risk_df[[
+                'Product_SKU', 
+                'Product_Category', 
+                'Stock_Level', 
+                'per-day_cost', 
+                'return_rate', 
+                'total_orders'
+            ]].copy()
+            
+            # Format columns
+            display_df['per-day_cost'] = display_df['per-day_cost'].round(2)
+            display_df['return_rate'] = display_df['return_rate'].round(2)
+            display_df['Stock_Level'] = display_df['Stock_Level'].astype(int)
+            display_df['total_orders'] = display_df['total_orders'].astype(int)
+            
+            paged_dataframe(display_df, "high_risk", use_container_width=True)
+            download_table(display_df, "high_risk_products", "high_risk")
+            
+            # Calculate financial impact
+            total_cost_impact = (high_risk_df['per-day_cost']).sum()
+            monthly_impact = total_cost_impact * 30
+            st.error(f"💸 **Daily Holding Cost for High-Risk Items**: ₹{total_cost_impact:,.2f} | **Monthly**: ₹{monthly_impact:,.2f}")
+            
+            # Recommendations
+            st.markdown("### 💡 Recommended Actions:")
+            st.markdown("""
+            - 🔴 **Immediate**: Stop restocking these items
+            - 📉 **Short-term**: Offer discounts to clear inventory
+            - 🔍 **Investigation**: Analyze why return rates are high (quality, sizing, description)
+            - 📊 **Long-term**: Consider discontinuing poor performers
+            """)
             
-        except Exception as e:
-            st.error(f"Error in Product Return Analysis: {str(e)}")
-            import traceback
-            st.code(traceback.format_exc())
+            # Conclusion for High-Risk Table
+            st.markdown("### 📝 Conclusion:")
+            st.error(f"""
+            **🚨 Critical Action Required**  
+            - You're spending ₹{total_cost_impact:,.2f}/day (₹{monthly_impact:,.2f}/month) to hold {len(high_risk_df)} products that customers frequently return
+            - These products have >70% return rates AND higher-than-median inventory levels
+            - **Financial waste**: Every day these items sit in the warehouse costs money while generating returns
+            - **Urgency**: High priority - address within 30 days to minimize losses
+            - **Next steps**: Review top 5 items immediately, investigate root causes, implement corrective actions
+            """)
+        else:
+            st.success("✅ No high-risk overstocked products found!")
+        
+        # ==================== CORRELATION ANALYSIS ====================
+        st.markdown("---")
+        trace_section("Correlation Matrix")
+        st.subheader("📈 Correlation Matrix")
+        
+        # Calculate correlations
+        corr_df = merged_df[['Stock_Level', 'per-day_cost', 'return_rate', 'total_orders']].corr()
+        
+        # Create heatmap
+        fig_corr = px.imshow(
+            corr_df,
+            text_auto='.3f',
+            aspect='auto',
+            color_continuous_scale='RdBu_r',
+            title='Correlation Heatmap: Stock, Cost, Returns, Orders',
+            labels=dict(color="Correlation")
+        )
+        
+        fig_corr.update_layout(height=500)
+        plotly_chart(fig_corr, use_container_width=True)
+        
+        # Interpretation
+        stock_return_corr = corr_df.loc['Stock_Level', 'return_rate']
+        cost_return_corr = corr_df.loc['per-day_cost', 'return_rate']
+        
+        col1, col2 = st.columns(2)
+        
+        with col1:
+            st.info(f"""
+            **Stock Level ↔ Return Rate**  
+            Correlation: **{stock_return_corr:.3f}**  
+            {
+                'Strong positive - More stock = More returns ⚠️' if stock_return_corr > 0.7 else
+                'Moderate positive - Some correlation' if stock_return_corr > 0.3 else
+                'Weak - Little to no relationship ✓' if abs(stock_return_corr) < 0.3 else
+                'Negative - More stock = Fewer returns ✓'
+            }
+            """)
+        
+        with col2:
+            st.info(f"""
+            **Per-day Cost ↔ Return Rate**  
+            Correlation: **{cost_return_corr:.3f}**  
+            {
+                'Strong positive - Higher cost = More returns ⚠️' if cost_return_corr > 0.7 else
+                'Moderate positive - Some correlation' if cost_return_corr > 0.3 else
+                'Weak - Little to no relationship ✓' if abs(cost_return_corr) < 0.3 else
+                'Negative - Higher cost = Fewer returns ✓'
+            }
+            """)
+        
+        # Overall Conclusion for Correlation Matrix
+        st.markdown("---")
+        st.markdown("### 📝 Overall Correlation Analysis:")
+        
+        orders_return_corr = corr_df.loc['total_orders', 'return_rate']
+        stock_cost_corr = corr_df.loc['Stock_Level', 'per-day_cost']
+        
+        st.success(f"""
+        **🎯 Key Findings:**
+        
+        **Inventory Management:**
+        - Stock ↔ Returns: {stock_return_corr:.3f} → {'Your stock levels ARE affecting returns' if abs(stock_return_corr) > 0.3 else 'Stock levels don\'t drive returns'}
+        - Stock ↔ Cost: {stock_cost_corr:.3f} → {'Expected positive relationship - more stock = higher costs' if stock_cost_corr > 0.5 else 'Costs vary independently of stock'}
+        
+        **Product Performance:**
+        - Orders ↔ Returns: {orders_return_corr:.3f} → {'Popular items have high returns' if orders_return_corr > 0.3 else 'Popular items aren\'t necessarily returned more' if abs(orders_return_corr) < 0.3 else 'Popular items have fewer returns'}
+        - Cost ↔ Returns: {cost_return_corr:.3f} → {'Expensive items cause returns' if cost_return_corr > 0.3 else 'Cost doesn\'t affect return likelihood'}
+        
+        **Strategic Recommendation:**
+        {
+            '⚠️ CRITICAL: Your inventory decisions directly impact returns. Focus on stocking low-return products.' if abs(stock_return_corr) > 0.5 else
+            '✅ GOOD: Returns are driven by product quality/fit, not how much you stock. Focus on product improvements rather than inventory adjustments.'
+        }
+        """)
+        
+    except Exception as e:
+        st.error(f"Error in Stock & Return Correlation Analysis: {str(e)}")
+        import traceback
+        st.code(traceback.format_exc())
+
+
+def render_customer_insights():
+    st.header("👥 Customer Insights")
     
-    with tab5:
-        st.header("📊 Stock & Return Correlation Analysis")
+    try:
+        # Customer dimension and the order rows it indexes (rows with missing
+        # customer, amount or date are dropped)
+        customer_summary = load_customer_summary()
+        customers = customer_summary['customers']
+        
+        # ==================== 1. TOP CUSTOMERS BY SALES ====================
+        trace_section("Top 10 Customers by Sales")
+        st.subheader("🏆 Top 10 Customers by Sales")
+        
+        # Customers by total gross amount
+        top_customers = customers['total_spend'].rename('Gross_Amount').reset_index()
+        top_customers = top_customers.sort_values('Gross_Amount', ascending=False).head(10)
+        
+        # Create bar chart
+        fig_top_customers = px.bar(
+            top_customers,
+            x='Customer_Name',
+            y='Gross_Amount',
+            title='Top 10 Customers by Total Purchase',
+            labels={'Customer_Name': 'Customer', 'Gross_Amount': 'Total Purchase (₹)'},
+            color='Gross_Amount',
+            color_continuous_scale='Blues'
+        )
+        
+        fig_top_customers.update_layout(
+            xaxis_tickangle=-45,
+            height=500,
+            yaxis=dict(tickformat=','),
+            showlegend=False
+        )
+        
+        plotly_chart(fig_top_customers, use_container_width=True)
+        
+        # Show summary metrics for top customers
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            top_customer_name = top_customers.iloc[0]['Customer_Name']
+            top_customer_value = top_customers.iloc[0]['Gross_Amount']
+            st.metric("Top Customer", top_customer_name, f"₹{top_customer_value:,.0f}")
+        
+        with col2:
+            top_10_total = top_customers['Gross_Amount'].sum()
+            st.metric("Top 10 Total Sales", f"₹{top_10_total:,.0f}")
+        
+        with col3:
+            overall_total = customers['total_spend'].sum()
+            top_10_percent = (top_10_total / overall_total) * 100
+            st.metric("Top 10 Share", f"{top_10_percent:.1f}%")
+        
+        # ==================== 2. CUSTOMER PURCHASE PATTERNS ====================
+        st.markdown("---")
+        trace_section("Customer Purchase Patterns")
+        st.subheader("🔍 Customer Purchase Patterns")
         
-        try:
-            # Load required data files
-            amazon_df = pd.read_csv("new_amazon_national_sales.csv")
-            stock_df = pd.read_csv("new_stock_report.csv")
-            
-            # Clean column names
-            amazon_df.columns = amazon_df.columns.str.strip()
-            stock_df.columns = stock_df.columns.str.strip()
-            
-            # ==================== DATA PREPARATION ====================
-            
-            # Calculate return metrics from Amazon data
-            amazon_df['is_return'] = amazon_df['Order_Status'].str.lower().str.contains('cancelled|returned', na=False)
-            
-            sku_metrics = amazon_df.groupby('sku').agg({
-                'Order_ID': 'count',
-                'is_return': 'sum',
-                'sale': 'mean'  # Average sale price
-            }).reset_index()
-            sku_metrics.columns = ['sku', 'total_orders', 'total_returns', 'avg_sale_price']
-            sku_metrics['return_rate'] = (sku_metrics['total_returns'] / sku_metrics['total_orders']) * 100
-            sku_metrics['return_rate'] = sku_metrics['return_rate'].fillna(0)
-            
-            # Merge stock with return metrics
-            merged_df = stock_df.merge(sku_metrics, on='sku', how='left')
-            
-            # Calculate estimated per-day cost (warehouse cost estimate)
-            # Using 0.15 per unit per day as base warehouse cost (from comparison chart)
-            merged_df['per-day_cost'] = merged_df['stock'] * 0.15
-            
-            # For products with sales data, add a small percentage of sale price as holding cost
-            merged_df['per-day_cost'] = merged_df['per-day_cost'] + (merged_df['avg_sale_price'].fillna(0) * 0.001)
-            
-            # Clean and prepare final dataset
-            merged_df = merged_df.dropna(subset=['stock', 'category'])
-            merged_df['return_rate'] = merged_df['return_rate'].fillna(0)
-            merged_df['total_orders'] = merged_df['total_orders'].fillna(0)
-            merged_df['per-day_cost'] = merged_df['per-day_cost'].fillna(merged_df['stock'] * 0.15)
-            
-            # Rename columns for consistency
-            merged_df = merged_df.rename(columns={
-                'stock': 'Stock_Level',
-                'category': 'Product_Category',
-                'sku': 'Product_SKU'
-            })
-            
-            # ==================== KEY METRICS ====================
-            st.subheader("📈 Overview Metrics")
+        # New Customer Acquisition by Month - Show always
+        st.markdown("### 📈 New Customer Acquisition Trend")
+        
+        # First purchase date of each customer
+        first_purchase = customers['first_purchase'].rename('First_Purchase_Date').reset_index()
+        
+        # Extract month and count new customers per month
+        first_purchase['Month'] = first_purchase['First_Purchase_Date'].dt.to_period('M').astype(str)
+        monthly_new_customers = first_purchase.groupby('Month').size().reset_index(name='New_Customers')
+        monthly_new_customers = monthly_new_customers.sort_values('Month')
+        
+        # Create line chart
+        fig_acquisition = px.line(
+            monthly_new_customers,
+            x='Month',
+            y='New_Customers',
+            title='New Customer Acquisition by Month',
+            labels={'Month': 'Month', 'New_Customers': 'New Customers'},
+            markers=True
+        )
+        
+        fig_acquisition.update_traces(line_color='#1f77b4', marker=dict(size=8))
+        fig_acquisition.update_layout(
+            height=500,
+            xaxis_tickangle=-45,
+            hovermode='x unified'
+        )
+        
+        plotly_chart(fig_acquisition, use_container_width=True)
+        
+        # Create customer selector with default value
+        st.markdown("---")
+        st.markdown("### 👤 Individual Customer Analysis")
+        
+        # Search-as-you-type: only the top matches by spend reach the browser
+        customer_index = load_customer_index()
+        query = st.text_input(
+            "Search Customer",
+            key="customer_search",
+            placeholder="Type part of a customer name"
+        )
+        
+        if query.strip():
+            customer_list = ['All'] + search_customers(customer_index, query)
+            default_index = 1 if len(customer_list) > 1 else 0
+            if len(customer_list) == 1:
+                st.warning(f"No customers match \"{query.strip()}\".")
+        else:
+            # Default to the first customer containing "avin" (case-insensitive),
+            # otherwise the first customer, followed by the top customers by spend
+            avin = customer_positions(customer_index, 'avin')
+            names = customer_index['names']
+            default_customer = names[avin[0] if len(avin) else 0] if len(names) else None
+            top = search_customers(customer_index, '')
+            customer_list = ['All'] + ([default_customer] if default_customer is not None else [])
+            customer_list += [name for name in top if name != default_customer]
+            default_index = 1 if len(customer_list) > 1 else 0
+        
+        selected_customer = st.selectbox("Select Customer", customer_list, index=default_index)
+        
+        if selected_customer == 'All':
+            # Show overall metrics
+            st.markdown("### 📊 Overall Customer Metrics")
             
-            metric_col1, metric_col2, metric_col3, metric_col4 = st.columns(4)
+            metric_col1, metric_col2 = st.columns(2)
             
             with metric_col1:
-                avg_return_rate = merged_df['return_rate'].mean()
-                st.metric("Avg Return Rate", f"{avg_return_rate:.2f}%")
+                total_customers = len(customers)
+                st.metric("Total Customers", f"{total_customers:,}")
             
             with metric_col2:
-                total_stock = merged_df['Stock_Level'].sum()
-                st.metric("Total Stock Units", f"{total_stock:,.0f}")
+                avg_customer_spend = customers['total_spend'].mean()
+                st.metric("Average Customer Spend", f"₹{avg_customer_spend:,.2f}")
             
-            with metric_col3:
-                avg_cost = merged_df['per-day_cost'].mean()
-                st.metric("Avg Cost/Day", f"₹{avg_cost:.2f}")
-            
-            with metric_col4:
-                high_risk_count = len(merged_df[(merged_df['return_rate'] > 70) & 
-                                               (merged_df['Stock_Level'] > merged_df['Stock_Level'].median())])
-                st.metric("High-Risk Products", high_risk_count)
-            
-            # ==================== SCATTER PLOT 1: STOCK vs RETURN RATE ====================
+            # Additional insights
             st.markdown("---")
-            st.subheader("🔵 Stock Level vs Return Rate Analysis")
-            
-            # Filter for better visualization (remove extreme outliers)
-            scatter_df1 = merged_df[merged_df['Stock_Level'] < 500].copy()
-            
-            fig_scatter1 = px.scatter(
-                scatter_df1,
-                x='Stock_Level',
-                y='return_rate',
-                size='per-day_cost',
-                color='Product_Category',
-                hover_name='Product_SKU',
-                hover_data={
-                    'Stock_Level': True,
-                    'return_rate': ':.2f',
-                    'per-day_cost': ':.2f',
-                    'total_orders': True
-                },
-                title='Stock Level vs Return Rate (Bubble size = Cost per day)',
-                labels={
-                    'Stock_Level': 'Stock Level',
-                    'return_rate': 'Return Rate (%)',
-                    'per-day_cost': 'Per-day Cost (₹)'
-                },
-                size_max=30
-            )
+            st.markdown("### 💡 Key Insights")
             
-            fig_scatter1.update_layout(height=600)
-            st.plotly_chart(fig_scatter1, use_container_width=True)
+            # Customer concentration analysis
+            customer_sales = customers['total_spend'].sort_values(ascending=False)
+            top_20_percent_customers = int(len(customer_sales) * 0.2)
+            top_20_sales = customer_sales.head(top_20_percent_customers).sum()
+            top_20_contribution = (top_20_sales / customer_sales.sum()) * 100
             
-            # Conclusion for Scatter Plot 1
-            stock_return_corr_1 = scatter_df1[['Stock_Level', 'return_rate']].corr().iloc[0, 1]
-            high_stock_high_return = scatter_df1[(scatter_df1['Stock_Level'] > scatter_df1['Stock_Level'].quantile(0.75)) & 
-                                                  (scatter_df1['return_rate'] > 50)]
+            insight_col1, insight_col2 = st.columns(2)
             
-            st.markdown("### 📝 Conclusion:")
-            if stock_return_corr_1 > 0.3:
-                st.warning(f"""
-                **⚠️ Concerning Pattern Detected**  
-                - Products with higher stock levels tend to have higher return rates (correlation: {stock_return_corr_1:.3f})
-                - **{len(high_stock_high_return)} products** have both high stock (top 25%) and high return rates (>50%)
-                - **Implication**: You may be overstocking products that customers don't like or have quality issues
-                - **Action**: Review high-stock, high-return items for quality, description accuracy, or discontinuation
-                """)
-            elif stock_return_corr_1 < -0.3:
-                st.success(f"""
-                **✅ Positive Pattern**  
-                - Products with higher stock levels have LOWER return rates (correlation: {stock_return_corr_1:.3f})
-                - **Implication**: You're stocking more of the products customers love and keep
-                - **Action**: Continue this strategy - stock up on winners!
-                """)
-            else:
+            with insight_col1:
                 st.info(f"""
-                **ℹ️ No Strong Relationship**  
-                - Stock levels and return rates are largely independent (correlation: {stock_return_corr_1:.3f})
-                - **Implication**: How much you stock doesn't affect return likelihood
-                - **Action**: Returns are driven by other factors (quality, fit, description) - focus inventory decisions on demand forecasting
-                """)
-            
-            # ==================== SCATTER PLOT 2: COST vs RETURN RATE ====================
-            st.markdown("---")
-            st.subheader(" Per-day Cost vs Return Rate Analysis")
-            
-            # Filter for better visualization
-            scatter_df2 = merged_df[merged_df['per-day_cost'] < 100].copy()
-            
-            fig_scatter2 = px.scatter(
-                scatter_df2,
-                x='per-day_cost',
-                y='return_rate',
-                size='Stock_Level',
-                color='Product_Category',
-                hover_name='Product_SKU',
-                hover_data={
-                    'per-day_cost': ':.2f',
-                    'return_rate': ':.2f',
-                    'Stock_Level': True,
-                    'total_orders': True
-                },
-                title='Per-day Cost vs Return Rate (Bubble size = Stock Level)',
-                labels={
-                    'per-day_cost': 'Per-day Cost (₹)',
-                    'return_rate': 'Return Rate (%)',
-                    'Stock_Level': 'Stock Level'
-                },
-                size_max=30
-            )
-            
-            fig_scatter2.update_layout(height=600)
-            st.plotly_chart(fig_scatter2, use_container_width=True)
-            
-            # Conclusion for Scatter Plot 2
-            cost_return_corr = scatter_df2[['per-day_cost', 'return_rate']].corr().iloc[0, 1]
-            high_cost_high_return = scatter_df2[(scatter_df2['per-day_cost'] > scatter_df2['per-day_cost'].quantile(0.75)) & 
-                                                (scatter_df2['return_rate'] > 50)]
-            total_waste_cost = high_cost_high_return['per-day_cost'].sum()
-            
-            st.markdown("### 📝 Conclusion:")
-            if len(high_cost_high_return) > 0:
-                st.error(f"""
-                **💸 High Financial Risk Identified**  
-                - **{len(high_cost_high_return)} products** have both high daily costs (top 25%) and high return rates (>50%)
-                - **Daily cost impact**: ₹{total_waste_cost:,.2f} spent holding frequently-returned items
-                - **Correlation**: {cost_return_corr:.3f} - {'Strong' if abs(cost_return_corr) > 0.7 else 'Moderate' if abs(cost_return_corr) > 0.3 else 'Weak'} relationship
-                - **Action**: Prioritize investigating expensive-to-hold items with high returns - these hurt profitability most
-                """)
-            else:
-                st.success(f"""
-                **✅ Good Cost Management**  
-                - No products with both high costs and high return rates
-                - **Correlation**: {cost_return_corr:.3f} - expensive items aren't being returned excessively
-                - **Action**: Continue monitoring, but current cost-return balance is healthy
-                """)
-            
-            # ==================== BAR CHART: AVERAGE RETURN RATE BY CATEGORY ====================
-            st.markdown("---")
-            st.subheader("📊 Average Return Rate by Product Category")
-            
-            category_avg = merged_df.groupby('Product_Category')['return_rate'].mean().reset_index()
-            category_avg = category_avg.sort_values('return_rate', ascending=False)
-            
-            fig_category = px.bar(
-                category_avg,
-                x='Product_Category',
-                y='return_rate',
-                title='Average Return Rate by Category',
-                labels={
-                    'Product_Category': 'Product Category',
-                    'return_rate': 'Average Return Rate (%)'
-                },
-                color='return_rate',
-                color_continuous_scale='Reds'
-            )
-            
-            fig_category.update_layout(
-                xaxis_tickangle=-45,
-                height=500,
-                showlegend=False
-            )
-            st.plotly_chart(fig_category, use_container_width=True)
-            
-            # Conclusion for Bar Chart
-            worst_category = category_avg.iloc[0]
-            best_category = category_avg.iloc[-1]
-            avg_overall = category_avg['return_rate'].mean()
-            high_return_categories = category_avg[category_avg['return_rate'] > 50]
-            
-            st.markdown("### 📝 Conclusion:")
-            if len(high_return_categories) > 0:
-                st.warning(f"""
-                **⚠️ Problem Categories Identified**  
-                - **Worst performer**: {worst_category['Product_Category']} ({worst_category['return_rate']:.1f}% return rate)
-                - **Best performer**: {best_category['Product_Category']} ({best_category['return_rate']:.1f}% return rate)
-                - **{len(high_return_categories)} categories** have >50% return rates
-                - **Overall average**: {avg_overall:.1f}%
-                - **Action**: Focus quality control and customer feedback analysis on high-return categories
-                - **Consider**: Category-specific improvements (sizing guides, better photos, material descriptions)
-                """)
-            else:
-                st.success(f"""
-                **✅ Good Category Performance**  
-                - **Worst performer**: {worst_category['Product_Category']} ({worst_category['return_rate']:.1f}% return rate)
-                - **Best performer**: {best_category['Product_Category']} ({best_category['return_rate']:.1f}% return rate)
-                - All categories have <50% return rates
-                - **Overall average**: {avg_overall:.1f}%
-                - **Action**: Maintain current quality standards while optimizing worst-performing category
+                **📊 Customer Concentration (80/20 Rule)**  
+                - Top 20% of customers ({top_20_percent_customers} customers)
+                - Contribute **{top_20_contribution:.1f}%** of total sales
+                - {'⚠️ High concentration risk' if top_20_contribution > 80 else '✅ Balanced customer base'}
                 """)
             
-            # ==================== HIGH-RISK TABLE ====================
-            st.markdown("---")
-            st.subheader("🚨 High-Risk Overstocked Products (High Cost & Return)")
-            
-            # Calculate median stock level
-            median_stock = merged_df['Stock_Level'].median()
-            
-            # Filter high-risk products
-            high_risk_df = merged_df[
-                (merged_df['return_rate'] > 70) & 
-                (merged_df['Stock_Level'] > median_stock)
-            ].copy()
-            
-            if len(high_risk_df) > 0:
-                # Sort by return rate and cost
-                high_risk_df = high_risk_df.sort_values(['return_rate', 'per-day_cost'], ascending=[False, False])
-                
-                # Display the table
-                st.warning(f"⚠️ Found **{len(high_risk_df)} high-risk products** with >70% return rate and above-median stock levels")
-                
-                display_df = high_risk_df[[
-                    'Product_SKU', 
-                    'Product_Category', 
-                    'Stock_Level', 
-                    'per-day_cost', 
-                    'return_rate', 
-                    'total_orders'
-                ]].copy()
-                
-                # Format columns
-                display_df['per-day_cost'] = display_df['per-day_cost'].round(2)
-                display_df['return_rate'] = display_df['return_rate'].round(2)
-                display_df['Stock_Level'] = display_df['Stock_Level'].astype(int)
-                display_df['total_orders'] = display_df['total_orders'].astype(int)
-                
-                st.dataframe(display_df, use_container_width=True)
-                
-                # Calculate financial impact
-                total_cost_impact = (high_risk_df['per-day_cost']).sum()
-                monthly_impact = total_cost_impact * 30
-                st.error(f"💸 **Daily Holding Cost for High-Risk Items**: ₹{total_cost_impact:,.2f} | **Monthly**: ₹{monthly_impact:,.2f}")
-                
-                # Recommendations
-                st.markdown("### 💡 Recommended Actions:")
-                st.markdown("""
-                - 🔴 **Immediate**: Stop restocking these items
-                - 📉 **Short-term**: Offer discounts to clear inventory
-                - 🔍 **Investigation**: Analyze why return rates are high (quality, sizing, description)
-                - 📊 **Long-term**: Consider discontinuing poor performers
-                """)
+            with insight_col2:
+                # Repeat vs one-time customers
+                repeat_customers = (customers['orders'] > 1).sum()
+                repeat_rate = (repeat_customers / total_customers) * 100
                 
-                # Conclusion for High-Risk Table
-                st.markdown("### 📝 Conclusion:")
-                st.error(f"""
-                **🚨 Critical Action Required**  
-                - You're spending ₹{total_cost_impact:,.2f}/day (₹{monthly_impact:,.2f}/month) to hold {len(high_risk_df)} products that customers frequently return
-                - These products have >70% return rates AND higher-than-median inventory levels
-                - **Financial waste**: Every day these items sit in the warehouse costs money while generating returns
-                - **Urgency**: High priority - address within 30 days to minimize losses
-                - **Next steps**: Review top 5 items immediately, investigate root causes, implement corrective actions
-                """)
-            else:
-                st.success("✅ No high-risk overstocked products found!")
-            
-            # ==================== CORRELATION ANALYSIS ====================
-            st.markdown("---")
-            st.subheader("📈 Correlation Matrix")
-            
-            # Calculate correlations
-            corr_df = merged_df[['Stock_Level', 'per-day_cost', 'return_rate', 'total_orders']].corr()
-            
-            # Create heatmap
-            fig_corr = px.imshow(
-                corr_df,
-                text_auto='.3f',
-                aspect='auto',
-                color_continuous_scale='RdBu_r',
-                title='Correlation Heatmap: Stock, Cost, Returns, Orders',
-                labels=dict(color="Correlation")
-            )
-            
-            fig_corr.update_layout(height=500)
-            st.plotly_chart(fig_corr, use_container_width=True)
-            
-            # Interpretation
-            stock_return_corr = corr_df.loc['Stock_Level', 'return_rate']
-            cost_return_corr = corr_df.loc['per-day_cost', 'return_rate']
-            
-            col1, col2 = st.columns(2)
-            
-            with col1:
-                st.info(f"""
-                **Stock Level ↔ Return Rate**  
-                Correlation: **{stock_return_corr:.3f}**  
-                {
-                    'Strong positive - More stock = More returns ⚠️' if stock_return_corr > 0.7 else
-                    'Moderate positive - Some correlation' if stock_return_corr > 0.3 else
-                    'Weak - Little to no relationship ✓' if abs(stock_return_corr) < 0.3 else
-                    'Negative - More stock = Fewer returns ✓'
-                }
-                """)
-            
-            with col2:
-                st.info(f"""
-                **Per-day Cost ↔ Return Rate**  
-                Correlation: **{cost_return_corr:.3f}**  
-                {
-                    'Strong positive - Higher cost = More returns ⚠️' if cost_return_corr > 0.7 else
-                    'Moderate positive - Some correlation' if cost_return_corr > 0.3 else
-                    'Weak - Little to no relationship ✓' if abs(cost_return_corr) < 0.3 else
-                    'Negative - Higher cost = Fewer returns ✓'
-                }
+                st.success(f"""
+                **🔄 Customer Loyalty**  
+                - **{repeat_customers:,}** repeat customers ({repeat_rate:.1f}%)
+                - **{total_customers - repeat_customers:,}** one-time customers
+                - {'✅ Strong retention' if repeat_rate > 50 else '⚠️ Focus on retention strategies'}
                 """)
             
-            # Overall Conclusion for Correlation Matrix
+            # Every customer from the customer summary, by total spend
             st.markdown("---")
-            st.markdown("### 📝 Overall Correlation Analysis:")
-            
-            orders_return_corr = corr_df.loc['total_orders', 'return_rate']
-            stock_cost_corr = corr_df.loc['Stock_Level', 'per-day_cost']
-            
-            st.success(f"""
-            **🎯 Key Findings:**
-            
-            **Inventory Management:**
-            - Stock ↔ Returns: {stock_return_corr:.3f} → {'Your stock levels ARE affecting returns' if abs(stock_return_corr) > 0.3 else 'Stock levels don\'t drive returns'}
-            - Stock ↔ Cost: {stock_cost_corr:.3f} → {'Expected positive relationship - more stock = higher costs' if stock_cost_corr > 0.5 else 'Costs vary independently of stock'}
-            
-            **Product Performance:**
-            - Orders ↔ Returns: {orders_return_corr:.3f} → {'Popular items have high returns' if orders_return_corr > 0.3 else 'Popular items aren\'t necessarily returned more' if abs(orders_return_corr) < 0.3 else 'Popular items have fewer returns'}
-            - Cost ↔ Returns: {cost_return_corr:.3f} → {'Expensive items cause returns' if cost_return_corr > 0.3 else 'Cost doesn\'t affect return likelihood'}
-            
-            **Strategic Recommendation:**
-            {
-                '⚠️ CRITICAL: Your inventory decisions directly impact returns. Focus on stocking low-return products.' if abs(stock_return_corr) > 0.5 else
-                '✅ GOOD: Returns are driven by product quality/fit, not how much you stock. Focus on product improvements rather than inventory adjustments.'
-            }
-            """)
-            
-        except Exception as e:
-            st.error(f"Error in Stock & Return Correlation Analysis: {str(e)}")
-            import traceback
-            st.code(traceback.format_exc())
-    
-    with tab6:
-        st.header("👥 Customer Insights")
+            st.markdown("### 📋 Customer Summary")
+            
+            customer_table = customers.drop(columns=['start', 'stop', 'favorite_style_spend']).reset_index()
+            customer_table = customer_table.sort_values('total_spend', ascending=False, kind='stable').rename(columns={
+                'Customer_Name': 'Customer',
+                'total_spend': 'Total Spend (₹)',
+                'orders': 'Orders',
+                'quantity': 'Items Purchased',
+                'first_purchase': 'First Purchase',
+                'last_purchase': 'Last Purchase',
+                'active_months': 'Active Months',
+                'favorite_style': 'Favorite Style'
+            })
+            paged_dataframe(customer_table, "customer_summary", use_container_width=True, hide_index=True)
+            download_table(customer_table, "customer_summary", "customer_summary")
         
-        try:
-            # Load data
-            customers_df = pd.read_csv("new_international_sales_report.csv")
-            
-            # Clean column names
-            customers_df.columns = customers_df.columns.str.strip()
-            
-            # Convert date to datetime
-            customers_df['date'] = pd.to_datetime(customers_df['date'], format='%d-%m-%Y', errors='coerce')
-            
-            # Convert numeric columns safely
-            customers_df['Gross_Amount'] = pd.to_numeric(customers_df['Gross_Amount'], errors='coerce')
-            customers_df['Quantity_Purchased'] = pd.to_numeric(customers_df['Quantity_Purchased'], errors='coerce')
-            
-            # Drop rows with missing critical data
-            customers_df = customers_df.dropna(subset=['Customer_Name', 'Gross_Amount', 'date'])
-            
-            # ==================== 1. TOP CUSTOMERS BY SALES ====================
-            st.subheader("🏆 Top 10 Customers by Sales")
-            
-            # Group by customer and sum gross amount
-            top_customers = customers_df.groupby('Customer_Name')['Gross_Amount'].sum().reset_index()
-            top_customers = top_customers.sort_values('Gross_Amount', ascending=False).head(10)
-            
-            # Create bar chart
-            fig_top_customers = px.bar(
-                top_customers,
-                x='Customer_Name',
-                y='Gross_Amount',
-                title='Top 10 Customers by Total Purchase',
-                labels={'Customer_Name': 'Customer', 'Gross_Amount': 'Total Purchase (₹)'},
-                color='Gross_Amount',
-                color_continuous_scale='Blues'
-            )
-            
-            fig_top_customers.update_layout(
-                xaxis_tickangle=-45,
-                height=500,
-                yaxis=dict(tickformat=','),
-                showlegend=False
-            )
-            
-            st.plotly_chart(fig_top_customers, use_container_width=True)
-            
-            # Show summary metrics for top customers
-            col1, col2, col3 = st.columns(3)
-            with col1:
-                top_customer_name = top_customers.iloc[0]['Customer_Name']
-                top_customer_value = top_customers.iloc[0]['Gross_Amount']
-                st.metric("Top Customer", top_customer_name, f"₹{top_customer_value:,.0f}")
-            
-            with col2:
-                top_10_total = top_customers['Gross_Amount'].sum()
-                st.metric("Top 10 Total Sales", f"₹{top_10_total:,.0f}")
-            
-            with col3:
-                overall_total = customers_df['Gross_Amount'].sum()
-                top_10_percent = (top_10_total / overall_total) * 100
-                st.metric("Top 10 Share", f"{top_10_percent:.1f}%")
-            
-            # ==================== 2. CUSTOMER PURCHASE PATTERNS ====================
-            st.markdown("---")
-            st.subheader("🔍 Customer Purchase Patterns")
-            
-            # New Customer Acquisition by Month - Show always
-            st.markdown("### 📈 New Customer Acquisition Trend")
-            
-            # Get first purchase date for each customer
-            first_purchase = customers_df.groupby('Customer_Name')['date'].min().reset_index()
-            first_purchase.columns = ['Customer_Name', 'First_Purchase_Date']
-            
-            # Extract month and count new customers per month
-            first_purchase['Month'] = first_purchase['First_Purchase_Date'].dt.to_period('M').astype(str)
-            monthly_new_customers = first_purchase.groupby('Month').size().reset_index(name='New_Customers')
-            monthly_new_customers = monthly_new_customers.sort_values('Month')
-            
-            # Create line chart
-            fig_acquisition = px.line(
-                monthly_new_customers,
-                x='Month',
-                y='New_Customers',
-                title='New Customer Acquisition by Month',
-                labels={'Month': 'Month', 'New_Customers': 'New Customers'},
-                markers=True
-            )
-            
-            fig_acquisition.update_traces(line_color='#1f77b4', marker=dict(size=8))
-            fig_acquisition.update_layout(
-                height=500,
-                xaxis_tickangle=-45,
-                hovermode='x unified'
-            )
-            
-            st.plotly_chart(fig_acquisition, use_container_width=True)
-            
-            # Create customer selector with default value
-            st.markdown("---")
-            st.markdown("### 👤 Individual Customer Analysis")
-            
-            customer_list = ['All'] + sorted(customers_df['Customer_Name'].unique().tolist())
-            
-            # Set default to customer containing "avin" (case-insensitive), otherwise first customer
-            default_customer = 'All'
-            for customer in customer_list:
-                if customer.lower() == 'avin' or 'avin' in customer.lower():
-                    default_customer = customer
-                    break
-            
-            # If no avin found, use first actual customer (not "All")
-            if default_customer == 'All' and len(customer_list) > 1:
-                default_customer = customer_list[1]
-            
-            default_index = customer_list.index(default_customer)
-            
-            selected_customer = st.selectbox("Select Customer", customer_list, index=default_index)
-            
-            if selected_customer == 'All':
-                # Show overall metrics
-                st.markdown("### 📊 Overall Customer Metrics")
+        else:
+            # Show specific customer analysis
+            if selected_customer in customers.index:
+                profile = customers.loc[selected_customer]
+                customer_data = customer_orders(customer_summary, selected_customer)
+                st.markdown(f"### 📋 Profile: {selected_customer}")
+                download_table(customer_data, "customer_orders", "customer_orders")
                 
-                metric_col1, metric_col2 = st.columns(2)
+                # Customer summary metrics
+                metric_col1, metric_col2, metric_col3, metric_col4 = st.columns(4)
                 
                 with metric_col1:
-                    total_customers = customers_df['Customer_Name'].nunique()
-                    st.metric("Total Customers", f"{total_customers:,}")
+                    total_purchases = profile['total_spend']
+                    st.metric("Total Spent", f"₹{total_purchases:,.0f}")
                 
                 with metric_col2:
-                    avg_customer_spend = customers_df.groupby('Customer_Name')['Gross_Amount'].sum().mean()
-                    st.metric("Average Customer Spend", f"₹{avg_customer_spend:,.2f}")
-                
-                # Additional insights
-                st.markdown("---")
-                st.markdown("### 💡 Key Insights")
-                
-                # Customer concentration analysis
-                customer_sales = customers_df.groupby('Customer_Name')['Gross_Amount'].sum().sort_values(ascending=False)
-                top_20_percent_customers = int(len(customer_sales) * 0.2)
-                top_20_sales = customer_sales.head(top_20_percent_customers).sum()
-                top_20_contribution = (top_20_sales / customer_sales.sum()) * 100
+                    total_orders = int(profile['orders'])
+                    st.metric("Total Orders", total_orders)
                 
-                insight_col1, insight_col2 = st.columns(2)
+                with metric_col3:
+                    avg_order_value = total_purchases / total_orders
+                    st.metric("Avg Order Value", f"₹{avg_order_value:,.0f}")
                 
-                with insight_col1:
-                    st.info(f"""
-                    **📊 Customer Concentration (80/20 Rule)**  
-                    - Top 20% of customers ({top_20_percent_customers} customers)
-                    - Contribute **{top_20_contribution:.1f}%** of total sales
-                    - {'⚠️ High concentration risk' if top_20_contribution > 80 else '✅ Balanced customer base'}
-                    """)
+                with metric_col4:
+                    total_items = profile['quantity']
+                    st.metric("Total Items Purchased", int(total_items))
                 
-                with insight_col2:
-                    # Repeat vs one-time customers
-                    purchase_counts = customers_df.groupby('Customer_Name').size()
-                    repeat_customers = (purchase_counts > 1).sum()
-                    repeat_rate = (repeat_customers / total_customers) * 100
-                    
-                    st.success(f"""
-                    **🔄 Customer Loyalty**  
-                    - **{repeat_customers:,}** repeat customers ({repeat_rate:.1f}%)
-                    - **{total_customers - repeat_customers:,}** one-time customers
-                    - {'✅ Strong retention' if repeat_rate > 50 else '⚠️ Focus on retention strategies'}
-                    """)
-            
-            else:
-                # Show specific customer analysis
-                customer_data = customers_df[customers_df['Customer_Name'] == selected_customer].copy()
+                # Two side-by-side charts
+                col1, col2 = st.columns(2)
                 
-                if len(customer_data) > 0:
-                    st.markdown(f"### 📋 Profile: {selected_customer}")
-                    
-                    # Customer summary metrics
-                    metric_col1, metric_col2, metric_col3, metric_col4 = st.columns(4)
+                with col1:
+                    # Bar chart: Purchase history over time
+                    st.markdown("#### 📅 Purchase History")
                     
-                    with metric_col1:
-                        total_purchases = customer_data['Gross_Amount'].sum()
-                        st.metric("Total Spent", f"₹{total_purchases:,.0f}")
+                    # Extract month-year from date and aggregate
+                    customer_data_copy = customer_data.copy()
+                    customer_data_copy['Month_Year'] = customer_data_copy['date'].dt.strftime('%b-%Y')
+                    customer_data_copy['Month_Sort'] = customer_data_copy['date'].dt.to_period('M')
                     
-                    with metric_col2:
-                        total_orders = len(customer_data)
-                        st.metric("Total Orders", total_orders)
+                    # Group by month-year
+                    purchase_history = customer_data_copy.groupby(['Month_Year', 'Month_Sort']).agg({
+                        'Gross_Amount': 'sum',
+                        'Quantity_Purchased': 'sum'
+                    }).reset_index()
+                    purchase_history = purchase_history.sort_values('Month_Sort')
+                    purchase_history['Order_Count'] = customer_data_copy.groupby(['Month_Year', 'Month_Sort']).size().values
                     
-                    with metric_col3:
-                        avg_order_value = customer_data['Gross_Amount'].mean()
-                        st.metric("Avg Order Value", f"₹{avg_order_value:,.0f}")
+                    # Check if customer has purchases across multiple months
+                    unique_months = int(profile['active_months'])
                     
-                    with metric_col4:
-                        total_items = customer_data['Quantity_Purchased'].sum()
-                        st.metric("Total Items Purchased", int(total_items))
+                    if unique_months == 1:
+                        # Show message if all purchases in one month
+                        st.info(f"ℹ️ All {len(customer_data)} orders were placed in {purchase_history.iloc[0]['Month_Year']}")
                     
-                    # Two side-by-side charts
-                    col1, col2 = st.columns(2)
+                    # Create line chart with month on x-axis
+                    fig_history = px.line(
+                        purchase_history,
+                        x='Month_Year',
+                        y='Gross_Amount',
+                        title=f'Monthly Purchase History ({unique_months} month{"s" if unique_months > 1 else ""}, {len(customer_data)} orders)',
+                        labels={'Month_Year': 'Month', 'Gross_Amount': 'Amount (₹)'},
+                        hover_data={'Quantity_Purchased': True, 'Order_Count': True},
+                        markers=True
+                    )
                     
-                    with col1:
-                        # Bar chart: Purchase history over time
-                        st.markdown("#### 📅 Purchase History")
-                        
-                        # Extract month-year from date and aggregate
-                        customer_data_copy = customer_data.copy()
-                        customer_data_copy['Month_Year'] = customer_data_copy['date'].dt.strftime('%b-%Y')
-                        customer_data_copy['Month_Sort'] = customer_data_copy['date'].dt.to_period('M')
-                        
-                        # Group by month-year
-                        purchase_history = customer_data_copy.groupby(['Month_Year', 'Month_Sort']).agg({
-                            'Gross_Amount': 'sum',
-                            'Quantity_Purchased': 'sum'
-                        }).reset_index()
-                        purchase_history = purchase_history.sort_values('Month_Sort')
-                        purchase_history['Order_Count'] = customer_data_copy.groupby(['Month_Year', 'Month_Sort']).size().values
-                        
-                        # Check if customer has purchases across multiple months
-                        unique_months = len(purchase_history)
-                        
-                        if unique_months == 1:
-                            # Show message if all purchases in one month
-                            st.info(f"ℹ️ All {len(customer_data)} orders were placed in {purchase_history.iloc[0]['Month_Year']}")
-                        
-                        # Create line chart with month on x-axis
-                        fig_history = px.line(
-                            purchase_history,
-                            x='Month_Year',
-                            y='Gross_Amount',
-                            title=f'Monthly Purchase History ({unique_months} month{"s" if unique_months > 1 else ""}, {len(customer_data)} orders)',
-                            labels={'Month_Year': 'Month', 'Gross_Amount': 'Amount (₹)'},
-                            hover_data={'Quantity_Purchased': True, 'Order_Count': True},
-                            markers=True
-                        )
-                        
-                        fig_history.update_traces(
-                            line_color='#2ecc71',
-                            marker=dict(size=10, color='#2ecc71'),
-                            hovertemplate='<b>Month:</b> %{x}<br><b>Amount:</b> ₹%{y:,.0f}<br><b>Items:</b> %{customdata[0]}<br><b>Orders:</b> %{customdata[1]}<extra></extra>'
-                        )
-                        fig_history.update_layout(
-                            height=400,
-                            yaxis=dict(tickformat=','),
-                            xaxis=dict(tickangle=-45),
-                            hovermode='closest',
-                            showlegend=False
-                        )
-                        
-                        st.plotly_chart(fig_history, use_container_width=True)
+                    fig_history.update_traces(
+                        line_color='#2ecc71',
+                        marker=dict(size=10, color='#2ecc71'),
+                        hovertemplate='<b>Month:</b> %{x}<br><b>Amount:</b> ₹%{y:,.0f}<br><b>Items:</b> %{customdata[0]}<br><b>Orders:</b> %{customdata[1]}<extra></extra>'
+                    )
+                    fig_history.update_layout(
+                        height=400,
+                        yaxis=dict(tickformat=','),
+                        xaxis=dict(tickangle=-45),
+                        hovermode='closest',
+                        showlegend=False
+                    )
                     
-                    with col2:
-                        # Pie chart: Product preferences by style
-                        st.markdown("#### 👗 Product Preferences")
-                        
-                        style_preferences = customer_data.groupby('style')['Gross_Amount'].sum().reset_index()
-                        style_preferences = style_preferences.sort_values('Gross_Amount', ascending=False)
-                        
-                        fig_preferences = px.pie(
-                            style_preferences,
-                            values='Gross_Amount',
-                            names='style',
-                            title='Spending by Product Style',
-                            color_discrete_sequence=px.colors.qualitative.Set3
-                        )
-                        
-                        fig_preferences.update_traces(textposition='inside', textinfo='percent+label')
-                        fig_preferences.update_layout(height=400)
-                        
-                        st.plotly_chart(fig_preferences, use_container_width=True)
+                    plotly_chart(fig_history, use_container_width=True)
+                
+                with col2:
+                    # Pie chart: Product preferences by style
+                    st.markdown("#### 👗 Product Preferences")
                     
-                    # Customer insights
-                    st.markdown("### 💡 Customer Insights")
+                    style_preferences = customer_data.groupby('style')['Gross_Amount'].sum().reset_index()
+                    style_preferences = style_preferences.sort_values('Gross_Amount', ascending=False)
                     
-                    first_purchase = customer_data['date'].min()
-                    last_purchase = customer_data['date'].max()
-                    customer_lifetime = (last_purchase - first_purchase).days
+                    fig_preferences = px.pie(
+                        style_preferences,
+                        values='Gross_Amount',
+                        names='style',
+                        title='Spending by Product Style',
+                        color_discrete_sequence=px.colors.qualitative.Set3
+                    )
                     
-                    favorite_style = style_preferences.iloc[0]['style']
-                    favorite_style_spend = style_preferences.iloc[0]['Gross_Amount']
-                    favorite_style_percent = (favorite_style_spend / total_purchases) * 100
+                    fig_preferences.update_traces(textposition='inside', textinfo='percent+label')
+                    fig_preferences.update_layout(height=400)
                     
-                    st.info(f"""
-                    **📊 Customer Behavior Analysis:**
-                    - **Customer Since**: {first_purchase.strftime('%B %d, %Y')}
-                    - **Last Purchase**: {last_purchase.strftime('%B %d, %Y')}
-                    - **Customer Lifetime**: {customer_lifetime} days
-                    - **Favorite Style**: {favorite_style} ({favorite_style_percent:.1f}% of spending)
-                    - **Average Order Value**: ₹{avg_order_value:,.0f}
-                    - **Purchase Frequency**: {total_orders / max(1, customer_lifetime / 30):.1f} orders per month
-                    """)
-                else:
-                    st.warning("No data found for this customer.")
-            
-        except Exception as e:
-            st.error(f"Error in Customer Insights: {str(e)}")
-            import traceback
-            st.code(traceback.format_exc())
+                    plotly_chart(fig_preferences, use_container_width=True)
+                
+                # Customer insights
+                st.markdown("### 💡 Customer Insights")
+                
+                first_purchase = profile['first_purchase']
+                last_purchase = profile['last_purchase']
+                customer_lifetime = (last_purchase - first_purchase).days
+                
+                favorite_style = profile['favorite_style']
+                favorite_style_spend = profile['favorite_style_spend']
+                favorite_style_percent = (favorite_style_spend / total_purchases) * 100
+                
+                st.info(f"""
+                **📊 Customer Behavior Analysis:**
+                - **Customer Since**: {first_purchase.strftime('%B %d, %Y')}
+                - **Last Purchase**: {last_purchase.strftime('%B %d, %Y')}
+                - **Customer Lifetime**: {customer_lifetime} days
+                - **Favorite Style**: {favorite_style} ({favorite_style_percent:.1f}% of spending)
+                - **Average Order Value**: ₹{avg_order_value:,.0f}
+                - **Purchase Frequency**: {total_orders / max(1, customer_lifetime / 30):.1f} orders per month
+                """)
+            else:
+                st.warning("No data found for this customer.")
+        
+    except Exception as e:
+        st.error(f"Error in Customer Insights: {str(e)}")
+        import traceback
+        st.code(traceback.format_exc())
+
+
+# Profit Margin Analysis figures for the filtered products of one year
+def profit_histogram_figure(df_filtered, selected_year):
+    fig_hist = px.histogram(
+        df_filtered,
+        x='Profit_Margin_%',
+        nbins=30,
+        title=f'Profit Margin Distribution - {selected_year}',
+        labels={'Profit_Margin_%': 'Profit Margin (%)'},
+        color_discrete_sequence=['#3498db']
+    )
     
-    with tab7:
-        st.header("💰 Product Profit Margin Analysis")
+    # Add mean line
+    mean_margin = df_filtered['Profit_Margin_%'].mean()
+    fig_hist.add_vline(
+        x=mean_margin,
+        line_dash="dash",
+        line_color="red",
+        annotation_text=f"Mean: {mean_margin:.2f}%",
+        annotation_position="top right"
+    )
+    
+    fig_hist.update_layout(
+        xaxis_title="Profit Margin (%)",
+        yaxis_title="Number of Products",
+        showlegend=False,
+        height=400,
+        plot_bgcolor='rgba(0,0,0,0)',
+        paper_bgcolor='rgba(0,0,0,0)',
+        margin=dict(l=50, r=50, t=50, b=50)
+    )
+    return fig_hist
+
+def profit_scatter_figure(df_filtered, selected_year):
+    import plotly.graph_objects as go
+    
+    fig_scatter = large_scatter(
+        df_filtered,
+        x='cost_price',
+        y='mrp',
+        color='Profit_Margin_%',
+        hover_data=['sku'],
+        title=f'Transfer Price vs MRP - {selected_year}',
+        labels={
+            'cost_price': 'Transfer Price (₹)',
+            'mrp': 'MRP (₹)',
+            'Profit_Margin_%': 'Profit Margin (%)'
+        },
+        color_continuous_scale='Viridis'
+    )
+    
+    # Add reference line (MRP = Cost)
+    max_val = max(df_filtered['cost_price'].max(), df_filtered['mrp'].max())
+    fig_scatter.add_trace(
+        go.Scatter(
+            x=[0, max_val],
+            y=[0, max_val],
+            mode='lines',
+            name='Equal Price Line',
+            line=dict(color='red', dash='dash', width=2)
+        )
+    )
+    
+    fig_scatter.update_layout(
+        height=400,
+        plot_bgcolor='rgba(0,0,0,0)',
+        paper_bgcolor='rgba(0,0,0,0)',
+        margin=dict(l=50, r=50, t=50, b=50)
+    )
+    return fig_scatter
+
+def profit_category_figure(category_stats, selected_year):
+    fig_category = px.bar(
+        category_stats,
+        x='category',
+        y='Average Margin (%)',
+        color='Average Margin (%)',
+        title=f'Average Profit Margin by Category - {selected_year}',
+        labels={'category': 'Product Category'},
+        color_continuous_scale='RdYlGn',
+        text='Average Margin (%)'
+    )
+    
+    fig_category.update_traces(texttemplate='%{text:.1f}%', textposition='outside')
+    fig_category.update_layout(
+        xaxis_tickangle=-45,
+        height=400,
+        showlegend=False,
+        plot_bgcolor='rgba(0,0,0,0)',
+        paper_bgcolor='rgba(0,0,0,0)',
+        margin=dict(l=50, r=50, t=50, b=80)
+    )
+    return fig_category
+
+def render_profit_margin_analysis():
+    st.header("💰 Product Profit Margin Analysis")
+    
+    try:
+        import plotly.graph_objects as go
+        
+        # Period selection with radio button
+        trace_section("Select Period for Analysis")
+        st.subheader("📅 Select Period for Analysis")
         
         try:
-            import plotly.graph_objects as go
-            import numpy as np
-            
-            # Year selection with radio button
-            st.subheader("📅 Select Year for Analysis")
-            selected_year = st.radio(
-                "Choose Year",
-                options=["March 2021", "May 2022"],
-                horizontal=True
-            )
-            
-            # Determine file and cost column based on year
-            if selected_year == "March 2021":
-                file_name = "new_2021_product_info.csv"
-                year_label = "2021"
+            # Price history of every snapshot period (margins already computed)
+            history = load_price_history()
+            periods = sorted(history['period'].unique())
+            period_labels = [period_label(period) for period in periods]
+            
+            if not periods:
+                st.error("❌ No product price snapshots found")
+                st.info(f"Please ensure {PRICE_HISTORY_FILE}, {PRODUCT_INFO_2021_FILE} or {PRODUCT_INFO_2022_FILE} exists in the directory.")
             else:
-                file_name = "new_2022_product_info.csv"
-                year_label = "2022"
-            
-            try:
-                # Load dataset
-                df_year = pd.read_csv(file_name)
+                selected_year = st.radio(
+                    "Choose Period",
+                    options=period_labels,
+                    horizontal=True
+                )
+                selected_period = periods[period_labels.index(selected_year)]
                 
-                # Clean column names
-                df_year.columns = df_year.columns.str.strip()
+                df_year = history[history['period'] == selected_period].rename(columns={'margin': 'Profit_Margin_%'})
+                df_year = df_year.assign(Profit_Amount=df_year['mrp'] - df_year['cost_price'])
                 
-                # Verify required columns exist
-                required_cols = ['sku', 'cost_price', 'mrp']
-                missing_cols = [col for col in required_cols if col not in df_year.columns]
+                # ==================== KEY METRICS ====================
+                st.markdown("---")
+                trace_section("Summary Metrics")
+                st.subheader(f"📊 Summary Metrics for {selected_year}")
                 
-                if missing_cols:
-                    st.error(f"❌ Missing required columns: {missing_cols}")
-                    st.info(f"Available columns: {list(df_year.columns)}")
-                else:
-                    # Convert to numeric
-                    df_year['cost_price'] = pd.to_numeric(df_year['cost_price'], errors='coerce')
-                    df_year['mrp'] = pd.to_numeric(df_year['mrp'], errors='coerce')
-                    
-                    # Remove rows with NaN values
-                    df_year = df_year.dropna(subset=['cost_price', 'mrp'])
-                    
-                    # Calculate Profit Amount and Profit Margin %
-                    df_year['Profit_Amount'] = df_year['mrp'] - df_year['cost_price']
-                    df_year['Profit_Margin_%'] = ((df_year['mrp'] - df_year['cost_price']) / df_year['cost_price']) * 100
-                    
-                    # Handle infinite values
-                    df_year = df_year.replace([np.inf, -np.inf], np.nan)
-                    df_year = df_year.dropna(subset=['Profit_Margin_%'])
-                    
-                    # ==================== KEY METRICS ====================
-                    st.markdown("---")
-                    st.subheader(f"📊 Summary Metrics for {selected_year}")
-                    
-                    col1, col2, col3 = st.columns(3)
-                    
-                    with col1:
-                        avg_margin = df_year['Profit_Margin_%'].mean()
-                        st.metric("Average Profit Margin", f"{avg_margin:.2f}%")
-                    
-                    with col2:
-                        median_margin = df_year['Profit_Margin_%'].median()
-                        st.metric("Median Profit Margin", f"{median_margin:.2f}%")
-                    
-                    with col3:
-                        total_products = len(df_year)
-                        st.metric("Total Products Analyzed", f"{total_products:,}")
-                    
-                    # ==================== FILTERS ====================
-                    st.markdown("---")
-                    st.subheader("🔍 Filters")
-                    
-                    filter_col1, filter_col2 = st.columns(2)
+                col1, col2, col3 = st.columns(3)
+                
+                with col1:
+                    avg_margin = df_year['Profit_Margin_%'].mean()
+                    st.metric("Average Profit Margin", f"{avg_margin:.2f}%")
+                
+                with col2:
+                    median_margin = df_year['Profit_Margin_%'].median()
+                    st.metric("Median Profit Margin", f"{median_margin:.2f}%")
+                
+                with col3:
+                    total_products = len(df_year)
+                    st.metric("Total Products Analyzed", f"{total_products:,}")
+                
+                # ==================== FILTERS ====================
+                st.markdown("---")
+                trace_section("Filters")
+                st.subheader("🔍 Filters")
+                
+                filter_col1, filter_col2 = st.columns(2)
+                
+                with filter_col1:
+                    # Category filter
+                    if 'category' in df_year.columns:
+                        all_categories = ['All'] + sorted(df_year['category'].dropna().unique().tolist())
+                        selected_category = st.selectbox("Select Product Category", all_categories)
+                    else:
+                        selected_category = 'All'
+                        st.info("No category column found in dataset")
+                
+                with filter_col2:
+                    # Profit Margin Range slider
+                    min_margin = float(df_year['Profit_Margin_%'].min())
+                    max_margin = float(df_year['Profit_Margin_%'].max())
                     
-                    with filter_col1:
-                        # Category filter
-                        if 'category' in df_year.columns:
-                            all_categories = ['All'] + sorted(df_year['category'].dropna().unique().tolist())
-                            selected_category = st.selectbox("Select Product Category", all_categories)
-                        else:
-                            selected_category = 'All'
-                            st.info("No category column found in dataset")
+                    margin_range = st.slider(
+                        "Select Profit Margin Range (%)",
+                        min_value=min_margin,
+                        max_value=max_margin,
+                        value=(min_margin, max_margin),
+                        step=0.1
+                    )
+                
+                # Apply filters
+                df_filtered = df_year
+                
+                if selected_category != 'All' and 'category' in df_year.columns:
+                    df_filtered = df_filtered[df_filtered['category'] == selected_category]
+                
+                df_filtered = df_filtered[
+                    (df_filtered['Profit_Margin_%'] >= margin_range[0]) & 
+                    (df_filtered['Profit_Margin_%'] <= margin_range[1])
+                ]
+                
+                # ==================== FILTERED DATA TABLE ====================
+                st.markdown("---")
+                trace_section("Product Profit Margins")
+                st.subheader(f"📋 Product Profit Margins ({len(df_filtered)} products)")
+                
+                if len(df_filtered) > 0:
+                    # Prepare display dataframe
+                    display_cols = ['sku', 'cost_price', 'mrp', 'Profit_Amount', 'Profit_Margin_%']
                     
-                    with filter_col2:
-                        # Profit Margin Range slider
-                        min_margin = float(df_year['Profit_Margin_%'].min())
-                        max_margin = float(df_year['Profit_Margin_%'].max())
-                        
-                        margin_range = st.slider(
-                            "Select Profit Margin Range (%)",
-                            min_value=min_margin,
-                            max_value=max_margin,
-                            value=(min_margin, max_margin),
-                            step=0.1
-                        )
+                    # Add optional columns if they exist
+                    if 'category' in df_filtered.columns:
+                        display_cols.append('category')
+                    if 'catalog' in df_filtered.columns:
+                        display_cols.append('catalog')
                     
-                    # Apply filters
-                    df_filtered = df_year.copy()
+                    display_df = df_filtered[display_cols].copy()
                     
-                    if selected_category != 'All' and 'category' in df_year.columns:
-                        df_filtered = df_filtered[df_filtered['category'] == selected_category]
+                    # Rename columns
+                    column_names = {
+                        'sku': 'Product SKU',
+                        'cost_price': 'Transfer Price (₹)',
+                        'mrp': 'MRP (₹)',
+                        'Profit_Amount': 'Profit Amount (₹)',
+                        'Profit_Margin_%': 'Profit Margin (%)',
+                        'category': 'Category',
+                        'catalog': 'Catalog'
+                    }
+                    display_df = display_df.rename(columns=column_names)
                     
-                    df_filtered = df_filtered[
-                        (df_filtered['Profit_Margin_%'] >= margin_range[0]) & 
-                        (df_filtered['Profit_Margin_%'] <= margin_range[1])
-                    ]
+                    # Format numeric columns
+                    for col in ['Transfer Price (₹)', 'MRP (₹)', 'Profit Amount (₹)']:
+                        if col in display_df.columns:
+                            display_df[col] = display_df[col].round(2)
                     
-                    # ==================== FILTERED DATA TABLE ====================
-                    st.markdown("---")
-                    st.subheader(f"📋 Product Profit Margins ({len(df_filtered)} products)")
+                    if 'Profit Margin (%)' in display_df.columns:
+                        display_df['Profit Margin (%)'] = display_df['Profit Margin (%)'].round(2)
                     
-                    if len(df_filtered) > 0:
-                        # Prepare display dataframe
-                        display_cols = ['sku', 'cost_price', 'mrp', 'Profit_Amount', 'Profit_Margin_%']
-                        
-                        # Add optional columns if they exist
-                        if 'category' in df_filtered.columns:
-                            display_cols.append('category')
-                        if 'catalog' in df_filtered.columns:
-                            display_cols.append('catalog')
-                        
-                        display_df = df_filtered[display_cols].copy()
-                        
-                        # Rename columns
-                        column_names = {
-                            'sku': 'Product SKU',
-                            'cost_price': 'Transfer Price (₹)',
-                            'mrp': 'MRP (₹)',
-                            'Profit_Amount': 'Profit Amount (₹)',
-                            'Profit_Margin_%': 'Profit Margin (%)',
-                            'category': 'Category',
-                            'catalog': 'Catalog'
-                        }
-                        display_df = display_df.rename(columns=column_names)
-                        
-                        # Format numeric columns
-                        for col in ['Transfer Price (₹)', 'MRP (₹)', 'Profit Amount (₹)']:
-                            if col in display_df.columns:
-                                display_df[col] = display_df[col].round(2)
-                        
-                        if 'Profit Margin (%)' in display_df.columns:
-                            display_df['Profit Margin (%)'] = display_df['Profit Margin (%)'].round(2)
-                        
-                        st.dataframe(display_df, use_container_width=True, height=400)
-                    else:
-                        st.warning("⚠️ No products match the selected filters.")
+                    paged_dataframe(display_df, "profit_margins", use_container_width=True, height=400)
+                    download_table(display_df, f"profit_margins_{selected_period:%Y_%m}", "profit_margins")
+                else:
+                    st.warning("⚠️ No products match the selected filters.")
+                
+                # ==================== VISUALIZATIONS ====================
+                if len(df_filtered) > 0:
+                    st.markdown("---")
+                    trace_section("Profit Margin Visualizations")
+                    st.subheader("📈 Profit Margin Visualizations")
                     
-                    # ==================== VISUALIZATIONS ====================
-                    if len(df_filtered) > 0:
-                        st.markdown("---")
-                        st.subheader("📈 Profit Margin Visualizations")
-                        
-                        # 1. HISTOGRAM: Profit Margin Distribution
-                        st.markdown("### 📊 Profit Margin Distribution")
-                        
-                        fig_hist = px.histogram(
-                            df_filtered,
-                            x='Profit_Margin_%',
-                            nbins=30,
-                            title=f'Profit Margin Distribution - {selected_year}',
-                            labels={'Profit_Margin_%': 'Profit Margin (%)'},
-                            color_discrete_sequence=['#3498db']
-                        )
-                        
-                        # Add mean line
-                        mean_margin = df_filtered['Profit_Margin_%'].mean()
-                        fig_hist.add_vline(
-                            x=mean_margin,
-                            line_dash="dash",
-                            line_color="red",
-                            annotation_text=f"Mean: {mean_margin:.2f}%",
-                            annotation_position="top right"
-                        )
-                        
-                        fig_hist.update_layout(
-                            xaxis_title="Profit Margin (%)",
-                            yaxis_title="Number of Products",
-                            showlegend=False,
-                            height=400,
-                            plot_bgcolor='rgba(0,0,0,0)',
-                            paper_bgcolor='rgba(0,0,0,0)',
-                            margin=dict(l=50, r=50, t=50, b=50)
-                        )
-                        
-                        st.plotly_chart(fig_hist, use_container_width=True)
-                        
-                        # 2. SCATTER PLOT: Cost Price vs MRP
-                        st.markdown("---")
-                        st.markdown("### 📍 Transfer Price vs MRP Scatter Plot")
-                        
-                        fig_scatter = px.scatter(
-                            df_filtered,
-                            x='cost_price',
-                            y='mrp',
-                            color='Profit_Margin_%',
-                            hover_data=['sku'],
-                            title=f'Transfer Price vs MRP - {selected_year}',
-                            labels={
-                                'cost_price': 'Transfer Price (₹)',
-                                'mrp': 'MRP (₹)',
-                                'Profit_Margin_%': 'Profit Margin (%)'
-                            },
-                            color_continuous_scale='Viridis'
-                        )
-                        
-                        # Add reference line (MRP = Cost)
-                        max_val = max(df_filtered['cost_price'].max(), df_filtered['mrp'].max())
-                        fig_scatter.add_trace(
-                            go.Scatter(
-                                x=[0, max_val],
-                                y=[0, max_val],
-                                mode='lines',
-                                name='Equal Price Line',
-                                line=dict(color='red', dash='dash', width=2)
-                            )
-                        )
-                        
-                        fig_scatter.update_layout(
-                            height=400,
-                            plot_bgcolor='rgba(0,0,0,0)',
-                            paper_bgcolor='rgba(0,0,0,0)',
-                            margin=dict(l=50, r=50, t=50, b=50)
-                        )
-                        st.plotly_chart(fig_scatter, use_container_width=True)
-                        
-                        # 3. CATEGORY-WISE ANALYSIS
-                        if 'category' in df_filtered.columns and len(df_filtered['category'].unique()) > 1:
-                            st.markdown("---")
-                            st.markdown("### 📦 Category-wise Profit Analysis")
-                            
-                            # Calculate category statistics
-                            category_stats = df_filtered.groupby('category').agg({
-                                'Profit_Margin_%': ['mean', 'median', 'min', 'max', 'count']
-                            }).round(2)
-                            
-                            category_stats.columns = ['Average Margin (%)', 'Median Margin (%)', 
-                                                     'Min Margin (%)', 'Max Margin (%)', 'Product Count']
-                            category_stats = category_stats.reset_index()
-                            category_stats = category_stats.sort_values('Average Margin (%)', ascending=False)
-                            
-                            # Display table
-                            st.dataframe(category_stats, use_container_width=True, hide_index=True)
-                            
-                            # Bar chart
-                            st.markdown("#### Average Profit Margin by Category")
-                            
-                            fig_category = px.bar(
-                                category_stats,
-                                x='category',
-                                y='Average Margin (%)',
-                                color='Average Margin (%)',
-                                title=f'Average Profit Margin by Category - {selected_year}',
-                                labels={'category': 'Product Category'},
-                                color_continuous_scale='RdYlGn',
-                                text='Average Margin (%)'
-                            )
-                            
-                            fig_category.update_traces(texttemplate='%{text:.1f}%', textposition='outside')
-                            fig_category.update_layout(
-                                xaxis_tickangle=-45,
-                                height=400,
-                                showlegend=False,
-                                plot_bgcolor='rgba(0,0,0,0)',
-                                paper_bgcolor='rgba(0,0,0,0)',
-                                margin=dict(l=50, r=50, t=50, b=80)
-                            )
-                            
-                            st.plotly_chart(fig_category, use_container_width=True)
+                    # 1. HISTOGRAM: Profit Margin Distribution
+                    st.markdown("### 📊 Profit Margin Distribution")
+                    
+                    margin_filters = [price_history_version(), selected_period, selected_category, margin_range]
+                    fig_hist = cached_figure('profit_histogram', margin_filters,
+                                             lambda: profit_histogram_figure(df_filtered, selected_year))
+                    plotly_chart(fig_hist, use_container_width=True)
                     
-                    # ==================== YEAR-OVER-YEAR COMPARISON ====================
+                    # 2. SCATTER PLOT: Cost Price vs MRP
                     st.markdown("---")
-                    st.subheader("🔄 Year-over-Year Comparison (March 2021 vs May 2022)")
+                    st.markdown("### 📍 Transfer Price vs MRP Scatter Plot")
                     
-                    try:
-                        # Load both datasets
-                        df_2021 = pd.read_csv("new_2021_product_info.csv")
-                        df_2022 = pd.read_csv("new_2022_product_info.csv")
+                    fig_scatter = cached_figure('profit_scatter', margin_filters + [large_scatter_mode()],
+                                                lambda: profit_scatter_figure(df_filtered, selected_year))
+                    plotly_chart(fig_scatter, use_container_width=True)
+                    
+                    # 3. CATEGORY-WISE ANALYSIS
+                    if 'category' in df_filtered.columns and len(df_filtered['category'].unique()) > 1:
+                        st.markdown("---")
+                        st.markdown("### 📦 Category-wise Profit Analysis")
                         
-                        # Clean column names
-                        df_2021.columns = df_2021.columns.str.strip()
-                        df_2022.columns = df_2022.columns.str.strip()
+                        # Calculate category statistics
+                        category_stats = df_filtered.groupby('category').agg({
+                            'Profit_Margin_%': ['mean', 'median', 'min', 'max', 'count']
+                        }).round(2)
                         
-                        # Convert to numeric
-                        for df_temp in [df_2021, df_2022]:
-                            df_temp['cost_price'] = pd.to_numeric(df_temp['cost_price'], errors='coerce')
-                            df_temp['mrp'] = pd.to_numeric(df_temp['mrp'], errors='coerce')
+                        category_stats.columns = ['Average Margin (%)', 'Median Margin (%)', 
+                                                 'Min Margin (%)', 'Max Margin (%)', 'Product Count']
+                        category_stats = category_stats.reset_index()
+                        category_stats = category_stats.sort_values('Average Margin (%)', ascending=False)
                         
-                        # Remove NaN
-                        df_2021 = df_2021.dropna(subset=['cost_price', 'mrp'])
-                        df_2022 = df_2022.dropna(subset=['cost_price', 'mrp'])
+                        # Display table
+                        st.dataframe(category_stats, use_container_width=True, hide_index=True)
                         
-                        # Calculate margins
-                        df_2021['Profit_Margin_%'] = ((df_2021['mrp'] - df_2021['cost_price']) / df_2021['cost_price']) * 100
-                        df_2022['Profit_Margin_%'] = ((df_2022['mrp'] - df_2022['cost_price']) / df_2022['cost_price']) * 100
+                        # Bar chart
+                        st.markdown("#### Average Profit Margin by Category")
                         
-                        # Handle infinite values
-                        df_2021 = df_2021.replace([np.inf, -np.inf], np.nan).dropna(subset=['Profit_Margin_%'])
-                        df_2022 = df_2022.replace([np.inf, -np.inf], np.nan).dropna(subset=['Profit_Margin_%'])
+                        fig_category = cached_figure('profit_by_category', margin_filters,
+                                                     lambda: profit_category_figure(category_stats, selected_year))
+                        plotly_chart(fig_category, use_container_width=True)
+                
+                # ==================== PERIOD COMPARISON ====================
+                st.markdown("---")
+                trace_section("Period Comparison")
+                st.subheader("🔄 Period-over-Period Comparison")
+                
+                try:
+                    compared_labels = st.multiselect(
+                        "Compare Periods",
+                        options=period_labels,
+                        default=[period_labels[0], period_labels[-1]] if len(periods) > 1 else period_labels,
+                        key="compare_periods"
+                    )
+                    # Earliest selected period is the baseline, latest the comparison
+                    compared = [period for period, label in zip(periods, period_labels) if label in compared_labels]
+                    
+                    if len(compared) < 2:
+                        st.info("Select at least two periods to compare.")
+                    else:
+                        labels = [period_label(period) for period in compared]
+                        baseline, latest = labels[0], labels[-1]
+                        df_compared = history[history['period'].isin(compared)]
+                        period_stats = df_compared.groupby('period')['margin'].agg(['mean', 'median'])
+                        sku_comparison = period_margins(history, compared, 'sku')
                         
                         # Comparison metrics
                         st.markdown("### 📊 Overall Metrics Comparison")
@@ -2836,53 +3716,48 @@ def main():
                         comp_col1, comp_col2, comp_col3 = st.columns(3)
                         
                         with comp_col1:
-                            avg_2021 = df_2021['Profit_Margin_%'].mean()
-                            avg_2022 = df_2022['Profit_Margin_%'].mean()
-                            change = avg_2022 - avg_2021
+                            avg_baseline = period_stats.loc[compared[0], 'mean']
+                            avg_latest = period_stats.loc[compared[-1], 'mean']
+                            change = avg_latest - avg_baseline
                             st.metric(
                                 "Average Margin Change",
-                                f"{avg_2022:.2f}%",
+                                f"{avg_latest:.2f}%",
                                 f"{change:+.2f}%",
                                 delta_color="normal" if change > 0 else "inverse"
                             )
                         
                         with comp_col2:
-                            med_2021 = df_2021['Profit_Margin_%'].median()
-                            med_2022 = df_2022['Profit_Margin_%'].median()
-                            med_change = med_2022 - med_2021
+                            med_baseline = period_stats.loc[compared[0], 'median']
+                            med_latest = period_stats.loc[compared[-1], 'median']
+                            med_change = med_latest - med_baseline
                             st.metric(
                                 "Median Margin Change",
-                                f"{med_2022:.2f}%",
+                                f"{med_latest:.2f}%",
                                 f"{med_change:+.2f}%",
                                 delta_color="normal" if med_change > 0 else "inverse"
                             )
                         
                         with comp_col3:
-                            common_skus = set(df_2021['sku']).intersection(set(df_2022['sku']))
-                            st.metric("Common Products", f"{len(common_skus):,}")
+                            st.metric("Common Products", f"{len(sku_comparison):,}")
                         
                         # Overlay histogram
                         st.markdown("---")
                         st.markdown("### 📊 Profit Margin Distribution Comparison")
                         
-                        # Create combined dataframe for overlay
-                        df_2021_plot = df_2021[['Profit_Margin_%']].copy()
-                        df_2021_plot['Year'] = 'March 2021'
-                        
-                        df_2022_plot = df_2022[['Profit_Margin_%']].copy()
-                        df_2022_plot['Year'] = 'May 2022'
-                        
-                        df_combined = pd.concat([df_2021_plot, df_2022_plot], ignore_index=True)
+                        df_combined = pd.DataFrame({
+                            'Profit_Margin_%': df_compared['margin'],
+                            'Period': df_compared['period'].map(period_label)
+                        })
                         
                         fig_overlay = px.histogram(
                             df_combined,
                             x='Profit_Margin_%',
-                            color='Year',
+                            color='Period',
                             nbins=30,
                             barmode='group',
-                            title='Profit Margin Distribution - March 2021 vs May 2022',
+                            title=f"Profit Margin Distribution - {' vs '.join(labels)}",
                             labels={'Profit_Margin_%': 'Profit Margin (%)'},
-                            color_discrete_map={'March 2021': '#00BFFF', 'May 2022': '#FF6347'}
+                            color_discrete_sequence=['#00BFFF', '#FF6347'] + px.colors.qualitative.Plotly
                         )
                         
                         fig_overlay.update_layout(
@@ -2898,98 +3773,461 @@ def main():
                             yaxis=dict(showgrid=True, gridcolor='rgba(128,128,128,0.2)')
                         )
                         
-                        st.plotly_chart(fig_overlay, use_container_width=True)
+                        plotly_chart(fig_overlay, use_container_width=True)
                         
                         # Category-wise comparison
-                        if 'category' in df_2021.columns and 'category' in df_2022.columns:
+                        st.markdown("---")
+                        st.markdown("### 📊 Category-wise Margin Comparison")
+                        
+                        # Mean margin per category and period, for categories present in every period
+                        cat_comparison = period_margins(history, compared, 'category')
+                        
+                        if len(cat_comparison) > 0:
+                            # Create grouped bar chart
+                            fig_cat_compare = go.Figure()
+                            bar_colors = ['#1E90FF', '#FF4500'] + px.colors.qualitative.Plotly
+                            
+                            for i, label in enumerate(labels):
+                                fig_cat_compare.add_trace(go.Bar(
+                                    x=cat_comparison['category'],
+                                    y=cat_comparison[label],
+                                    name=label,
+                                    marker_color=bar_colors[i % len(bar_colors)]
+                                ))
+                            
+                            fig_cat_compare.update_layout(
+                                title='Category-wise Average Profit Margin Comparison',
+                                xaxis_title='Product Category',
+                                yaxis_title='Average Profit Margin (%)',
+                                barmode='group',
+                                xaxis_tickangle=-45,
+                                height=400,
+                                plot_bgcolor='rgba(0,0,0,0)',
+                                paper_bgcolor='rgba(0,0,0,0)',
+                                margin=dict(l=50, r=50, t=50, b=80)
+                            )
+                            
+                            plotly_chart(fig_cat_compare, use_container_width=True)
+                            
+                            # Show top gainers and losers
                             st.markdown("---")
-                            st.markdown("### 📊 Category-wise Margin Comparison")
+                            st.markdown("### 🔝 Category Performance Changes")
                             
-                            cat_2021 = df_2021.groupby('category')['Profit_Margin_%'].mean().reset_index()
-                            cat_2021.columns = ['category', 'March 2021']
+                            cat_comparison['Change'] = cat_comparison[latest] - cat_comparison[baseline]
+                            cat_comparison = cat_comparison.sort_values('Change', ascending=False)
                             
-                            cat_2022 = df_2022.groupby('category')['Profit_Margin_%'].mean().reset_index()
-                            cat_2022.columns = ['category', 'May 2022']
+                            col_gain, col_loss = st.columns(2)
                             
-                            # Merge on common categories
-                            cat_comparison = cat_2021.merge(cat_2022, on='category', how='inner')
+                            with col_gain:
+                                st.markdown("#### 📈 Top Gainers")
+                                top_gainers = cat_comparison.head(5)[['category', baseline, latest, 'Change']].copy()
+                                top_gainers['Change'] = top_gainers['Change'].apply(lambda x: f"+{x:.2f}%")
+                                top_gainers[baseline] = top_gainers[baseline].apply(lambda x: f"{x:.2f}%")
+                                top_gainers[latest] = top_gainers[latest].apply(lambda x: f"{x:.2f}%")
+                                st.dataframe(top_gainers, use_container_width=True, hide_index=True)
                             
-                            if len(cat_comparison) > 0:
-                                # Create grouped bar chart
-                                fig_cat_compare = go.Figure()
-                                
-                                fig_cat_compare.add_trace(go.Bar(
-                                    x=cat_comparison['category'],
-                                    y=cat_comparison['March 2021'],
-                                    name='March 2021',
-                                    marker_color='#1E90FF'
-                                ))
-                                
-                                fig_cat_compare.add_trace(go.Bar(
-                                    x=cat_comparison['category'],
-                                    y=cat_comparison['May 2022'],
-                                    name='May 2022',
-                                    marker_color='#FF4500'
-                                ))
-                                
-                                fig_cat_compare.update_layout(
-                                    title='Category-wise Average Profit Margin Comparison',
-                                    xaxis_title='Product Category',
-                                    yaxis_title='Average Profit Margin (%)',
-                                    barmode='group',
-                                    xaxis_tickangle=-45,
-                                    height=400,
-                                    plot_bgcolor='rgba(0,0,0,0)',
-                                    paper_bgcolor='rgba(0,0,0,0)',
-                                    margin=dict(l=50, r=50, t=50, b=80)
-                                )
-                                
-                                st.plotly_chart(fig_cat_compare, use_container_width=True)
-                                
-                                # Show top gainers and losers
-                                st.markdown("---")
-                                st.markdown("### 🔝 Category Performance Changes")
-                                
-                                cat_comparison['Change'] = cat_comparison['May 2022'] - cat_comparison['March 2021']
-                                cat_comparison = cat_comparison.sort_values('Change', ascending=False)
-                                
-                                col_gain, col_loss = st.columns(2)
-                                
-                                with col_gain:
-                                    st.markdown("#### 📈 Top Gainers")
-                                    top_gainers = cat_comparison.head(5)[['category', 'March 2021', 'May 2022', 'Change']].copy()
-                                    top_gainers['Change'] = top_gainers['Change'].apply(lambda x: f"+{x:.2f}%")
-                                    top_gainers['March 2021'] = top_gainers['March 2021'].apply(lambda x: f"{x:.2f}%")
-                                    top_gainers['May 2022'] = top_gainers['May 2022'].apply(lambda x: f"{x:.2f}%")
-                                    st.dataframe(top_gainers, use_container_width=True, hide_index=True)
-                                
-                                with col_loss:
-                                    st.markdown("#### 📉 Top Decliners")
-                                    top_losers = cat_comparison.tail(5)[['category', 'March 2021', 'May 2022', 'Change']].copy()
-                                    top_losers['Change'] = top_losers['Change'].apply(lambda x: f"{x:.2f}%")
-                                    top_losers['March 2021'] = top_losers['March 2021'].apply(lambda x: f"{x:.2f}%")
-                                    top_losers['May 2022'] = top_losers['May 2022'].apply(lambda x: f"{x:.2f}%")
-                                    st.dataframe(top_losers, use_container_width=True, hide_index=True)
-                            else:
-                                st.warning("No common categories found for comparison.")
-                    
-                    except FileNotFoundError as e:
-                        st.warning(f"⚠️ Could not load both year files for comparison: {str(e)}")
-                        st.info("Please ensure both new_2021_product_info.csv and new_2022_product_info.csv exist in the directory.")
-                    except Exception as e:
-                        st.error(f"Error in year comparison: {str(e)}")
-            
-            except FileNotFoundError:
-                st.error(f"❌ File not found: {file_name}")
-                st.info("Please ensure the file exists in the current directory.")
-            except KeyError as e:
-                st.error(f"❌ Column not found: {str(e)}")
-                st.info(f"Please check that the required columns exist in {file_name}")
-            
+                            with col_loss:
+                                st.markdown("#### 📉 Top Decliners")
+                                top_losers = cat_comparison.tail(5)[['category', baseline, latest, 'Change']].copy()
+                                top_losers['Change'] = top_losers['Change'].apply(lambda x: f"{x:.2f}%")
+                                top_losers[baseline] = top_losers[baseline].apply(lambda x: f"{x:.2f}%")
+                                top_losers[latest] = top_losers[latest].apply(lambda x: f"{x:.2f}%")
+                                st.dataframe(top_losers, use_container_width=True, hide_index=True)
+                        else:
+                            st.warning("No common categories found for comparison.")
+                        
+                        # SKU-level margin changes across the compared periods
+                        if len(sku_comparison) > 0:
+                            st.markdown("---")
+                            st.markdown("### 🏷️ Product Margin Changes")
+                            
+                            sku_comparison['Change'] = sku_comparison[latest] - sku_comparison[baseline]
+                            sku_comparison = sku_comparison.sort_values('Change', ascending=False)
+                            sku_comparison = sku_comparison.rename(columns={'sku': 'Product SKU'}).round(2)
+                            paged_dataframe(sku_comparison, "sku_margin_changes", use_container_width=True, hide_index=True)
+                
+                except Exception as e:
+                    st.error(f"Error in period comparison: {str(e)}")
+        
+        except FileNotFoundError as e:
+            st.error(f"❌ File not found: {str(e)}")
+            st.info("Please ensure the product price files exist in the current directory.")
+        except KeyError as e:
+            st.error(f"❌ Column not found: {str(e)}")
+            st.info("Please check that the required columns (sku, cost_price, mrp) exist in the product price files")
+        
+    except Exception as e:
+        st.error(f"❌ Error in Product Profit Margin Analysis: {str(e)}")
+        import traceback
+        st.code(traceback.format_exc())
+
+
+def render_product_analysis():
+    st.header("📊 Comprehensive Product Analysis Dashboard")
+    
+    # Create sub-tabs for different analysis types
+    analysis_tabs = st.tabs([
+        "📦 Stock Analysis",
+        "🏪 State Analytics", 
+        "🏙️ City Analytics",
+        "📢 Promotion Analysis",
+        "📦 Order & Shipping",
+        "🏢 B2B Analysis",
+        "👗 Product Performance",
+        "📈 Time Series"
+    ], **tab_navigation("analysis_tab"))
+    
+    # ==================== TAB 0: Original Product Analysis ====================
+    with analysis_tabs[0]:
+        if tab_is_active(analysis_tabs[0]):
+            with timed_span("Stock Analysis"):
+                render_stock_analysis()
+    
+    # ==================== TAB 1: State Analytics ====================
+    with analysis_tabs[1]:
+        if tab_is_active(analysis_tabs[1]):
+            with timed_span("State Analytics"):
+                render_state_analytics()
+    
+    # ==================== TAB 3: City Analytics ====================
+    with analysis_tabs[2]:
+        if tab_is_active(analysis_tabs[2]):
+            with timed_span("City Analytics"):
+                render_city_analytics()
+    
+    # ==================== TAB 4: Promotion Analysis ====================
+    with analysis_tabs[3]:
+        if tab_is_active(analysis_tabs[3]):
+            with timed_span("Promotion Analysis"):
+                render_promotion_analysis()
+    
+    # ==================== TAB 5: Order & Shipping ====================
+    with analysis_tabs[4]:
+        if tab_is_active(analysis_tabs[4]):
+            with timed_span("Order & Shipping"):
+                render_order_shipping()
+    
+    # ==================== TAB 6: B2B Analysis ====================
+    with analysis_tabs[5]:
+        if tab_is_active(analysis_tabs[5]):
+            with timed_span("B2B Analysis"):
+                render_b2b_analysis()
+    
+    # ==================== TAB 7: Product Performance ====================
+    with analysis_tabs[6]:
+        if tab_is_active(analysis_tabs[6]):
+            with timed_span("Product Performance"):
+                render_product_performance()
+    
+    # ==================== TAB 8: Time Series ====================
+    with analysis_tabs[7]:
+        if tab_is_active(analysis_tabs[7]):
+            with timed_span("Time Series"):
+                render_time_series()
+
+# Background warm-up. The first run of the script in a server process (and
+# the first run after any dataset changes) starts a thread that reads the
+# column sets the views load directly and then precomputes the aggregates and
+# charts behind the default views, so sessions find them in the caches. Work a
+# session needs before the warm-up reaches it is not repeated: the session
+# waits for the same cache entry. The Amazon order history is never read
+# whole: its aggregates come from the persisted cube, the SQL engine (when the
+# starting session has it on) or the pruned columns their builders request.
+WARMUP_WORKERS = 4
+
+# Column sets the views read with read_dataset() outside the cached
+# aggregates below; None reads every column
+WARMUP_READS = {
+    STOCK_REPORT_FILE: [None],
+    INTERNATIONAL_SALES_FILE: [None, ['sku', 'Quantity_Purchased']]
+}
+
+# Cube roll-ups read by the Product Analysis sub-tabs
+WARMUP_CUBE_ROLLUPS = [
+    ('state',),
+    ('state', 'city'),
+    ('state', 'city', 'Promotion_ID_Count'),
+    ('state', 'city', 'Order_Status', 'shipping_level'),
+    ('state', 'city', 'b2b'),
+    ('state', 'category', 'size', 'priced'),
+    ('month', 'category', 'size')
+]
+
+def registered_datasets():
+    return [
+        path for path in DATASET_SCHEMAS
+        if os.path.exists(path) or os.path.exists(columnar_path(path))
+    ]
+
+# Default year of the Sales Overview and its charts
+def warm_sales_overview():
+    df = load_data()
+    selected_year = sorted(df['Year'].unique())[0]
+    filtered_df = df[df['Year'] == selected_year]
+    for name, (column, _) in SALES_OVERVIEW_FIGURES.items():
+        if column is None or has_values(filtered_df, column):
+            sales_overview_figure(name, filtered_df, selected_year)
+
+def warmup_steps(datasets, use_sql=False):
+    steps = {}
+    for path in datasets:
+        for columns in WARMUP_READS.get(path, []):
+            name = f"read {path}" if columns is None else f"read {path} ({', '.join(columns)})"
+            steps[name] = lambda path=path, columns=columns: read_dataset(path, columns)
+    aggregates = {}
+    if INTERNATIONAL_SALES_FILE in datasets and STOCK_REPORT_FILE in datasets:
+        aggregates['sales overview'] = warm_sales_overview
+    if INTERNATIONAL_SALES_FILE in datasets:
+        aggregates['sku velocity'] = load_sku_velocity
+        aggregates['customer index'] = load_customer_index
+    if AMAZON_SALES_FILE in datasets:
+        # The background thread has no session, so the SQL setting is passed on
+        amazon_version = source_version(AMAZON_SALES_FILE)
+        for dimensions in WARMUP_CUBE_ROLLUPS:
+            aggregates[f"cube {' / '.join(dimensions)}"] = (
+                lambda dimensions=dimensions: _rollup_amazon_cube(amazon_version, dimensions, use_sql)
+            )
+        aggregates['order returns'] = lambda: _build_order_returns(amazon_version, use_sql)
+        if STOCK_REPORT_FILE in datasets:
+            aggregates['sku facts'] = (
+                lambda: _build_sku_facts(amazon_version, source_version(STOCK_REPORT_FILE), use_sql)
+            )
+    if os.path.exists(PRICE_HISTORY_FILE) or any(path in datasets for path in PRICE_SNAPSHOTS.values()):
+        aggregates['price history'] = load_price_history
+    return steps, aggregates
+
+def _run_warmup(status, datasets, use_sql):
+    def run(name, step):
+        try:
+            step()
         except Exception as e:
-            st.error(f"❌ Error in Product Profit Margin Analysis: {str(e)}")
-            import traceback
-            st.code(traceback.format_exc())
+            status['errors'][name] = str(e)
+        with status['lock']:
+            status['done'] += 1
+    
+    steps, aggregates = warmup_steps(datasets, use_sql)
+    status['total'] = len(steps) + len(aggregates)
+    # Datasets first, so the aggregates start from parsed frames
+    for phase in (steps, aggregates):
+        with ThreadPoolExecutor(max_workers=WARMUP_WORKERS, thread_name_prefix="warmup") as pool:
+            for name, step in phase.items():
+                pool.submit(run, name, step)
+    status['seconds'] = time.perf_counter() - status['started']
+
+# One warm-up per data version and SQL engine setting
+@st.cache_resource(show_spinner=False, max_entries=2)
+def _start_warmup(versions, use_sql):
+    datasets = [path for path, _ in versions]
+    status = {
+        'started': time.perf_counter(), 'seconds': None, 'done': 0, 'total': len(datasets),
+        'errors': {}, 'lock': threading.Lock()
+    }
+    threading.Thread(target=_run_warmup, args=(status, datasets, use_sql), name="warmup", daemon=True).start()
+    return status
+
+def start_warmup():
+    return _start_warmup(
+        tuple((path, source_version(path)) for path in registered_datasets()), sql_engine_enabled()
+    )
+
+# Sidebar readiness indicator, refreshed every second while the warm-up runs.
+# run_every is fixed when the fragment is created, so once the warm-up ends
+# the polling fragment reruns the app to be rebuilt without the interval.
+def warmup_indicator(status):
+    polling = status['seconds'] is None
+    
+    @st.fragment(run_every=1 if polling else None)
+    def indicator():
+        if polling and status['seconds'] is not None:
+            st.rerun()
+        if status['seconds'] is None:
+            st.caption(f"🔥 Warming up caches: {status['done']}/{status['total']} steps, "
+                       f"{time.perf_counter() - status['started']:.1f} s")
+        else:
+            st.caption(f"✅ Caches warm in {status['seconds']:.1f} s")
+        if status['errors']:
+            st.caption("⚠️ Warm-up failed for: " + ", ".join(status['errors']))
+    
+    with st.sidebar:
+        indicator()
+
+def main():
+    st.set_page_config(page_title="Sales Analytics Dashboard", layout="wide")
+    
+    # Custom CSS for attractive tabs
+    st.markdown("""
+        <style>
+        /* Tab styling */
+        .stTabs [data-baseweb="tab-list"] {
+            gap: 4px;
+            background-color: #1e1e1e;
+            padding: 10px;
+            border-radius: 10px;
+            display: flex;
+            justify-content: space-between;
+        }
+        
+        .stTabs [data-baseweb="tab"] {
+            flex: 1;
+            height: 70px;
+            background-color: #2d2d2d;
+            border-radius: 8px;
+            padding: 15px 10px;
+            font-size: 18px;
+            font-weight: 700;
+            color: #ffffff;
+            border: 2px solid transparent;
+            transition: all 0.3s ease;
+            white-space: normal;
+            text-align: center;
+            line-height: 1.3;
+        }
+        
+        .stTabs [data-baseweb="tab"]:hover {
+            background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
+            border-color: #667eea;
+            transform: translateY(-2px);
+            box-shadow: 0 4px 15px rgba(102, 126, 234, 0.4);
+        }
+        
+        .stTabs [aria-selected="true"] {
+            background: linear-gradient(135deg, #f093fb 0%, #f5576c 100%) !important;
+            border-color: #f5576c !important;
+            box-shadow: 0 4px 20px rgba(245, 87, 108, 0.5) !important;
+            transform: scale(1.05);
+        }
+        
+        /* Dashboard title styling */
+        h1 {
+            background: linear-gradient(135deg, #f093fb 0%, #f5576c 100%);
+            -webkit-background-clip: text;
+            -webkit-text-fill-color: transparent;
+            font-size: 3em !important;
+            font-weight: 800 !important;
+            text-align: center;
+            padding: 20px 0;
+            text-shadow: 0 0 30px rgba(245, 87, 108, 0.5);
+            animation: glow 2s ease-in-out infinite alternate;
+        }
+        
+        @keyframes glow {
+            from {
+                text-shadow: 0 0 20px rgba(245, 87, 108, 0.5), 0 0 30px rgba(240, 147, 251, 0.3);
+            }
+            to {
+                text-shadow: 0 0 30px rgba(245, 87, 108, 0.8), 0 0 40px rgba(240, 147, 251, 0.5);
+            }
+        }
+        
+        /* Metric cards styling */
+        [data-testid="stMetricValue"] {
+            font-size: 28px;
+            font-weight: 700;
+            color: #667eea;
+        }
+        
+        [data-testid="stMetricLabel"] {
+            font-size: 14px;
+            font-weight: 600;
+            color: #a0a0a0;
+        }
+        
+        /* Add animation to metrics */
+        div[data-testid="metric-container"] {
+            background: linear-gradient(135deg, rgba(102, 126, 234, 0.1) 0%, rgba(118, 75, 162, 0.1) 100%);
+            padding: 15px;
+            border-radius: 10px;
+            border: 1px solid rgba(102, 126, 234, 0.2);
+            transition: all 0.3s ease;
+        }
+        
+        div[data-testid="metric-container"]:hover {
+            transform: translateY(-5px);
+            box-shadow: 0 8px 25px rgba(102, 126, 234, 0.3);
+            border-color: rgba(102, 126, 234, 0.5);
+        }
+        </style>
+    """, unsafe_allow_html=True)
+    
+    st.title("Amazon Sales & Inventory Analytics Dashboard")
+    
+    warmup_indicator(start_warmup())
+    st.sidebar.toggle(
+        "⏱️ Record timing spans", value=False, key="timing_spans",
+        help=f"Time each tab and section of this rerun, show the spans here and append them to {TRACE_FILE}."
+    )
+    start_trace()
+    
+    st.sidebar.toggle(
+        "⚡ Compute active tab only", value=True, key="on_demand_tabs",
+        help="Only the selected tab and sub-tab load data and build charts on each rerun."
+    )
+    st.sidebar.toggle(
+        "📄 Paginate large tables", value=True, key="paged_tables",
+        help=f"Tables over {PAGED_TABLE_MIN_ROWS} rows are filtered, sorted and paged on the server; only the visible page is sent."
+    )
+    st.sidebar.toggle(
+        "🦆 SQL engine for order aggregations", value=False, key="sql_engine",
+        disabled=duckdb is None,
+        help="Aggregate the Amazon order history with the embedded DuckDB engine instead of loading it into pandas."
+             if duckdb is not None else "Install duckdb to enable the embedded SQL engine."
+    )
+    st.sidebar.selectbox(
+        "🔵 Large scatter plots", LARGE_SCATTER_MODES, key="large_scatter_mode",
+        help=f"Scatter plots above {SCATTER_WEBGL_THRESHOLD:,} points use WebGL. Decimation keeps at most "
+             f"{SCATTER_MAX_POINTS:,} points per plot; the heatmap bins them instead."
+    )
+    
+    # Create tabs
+    tab1, tab2, tab3, tab4, tab5, tab6, tab7 = st.tabs([
+        "📊 Sales Overview", 
+        "🔍 Product Analysis", 
+        "📦 Inventory Stock", 
+        "↩️ Product Returns", 
+        "🔗 Stock & Returns Correlation", 
+        "👥 Customer Insights", 
+        "💰 Profit Margin Analysis"
+    ], **tab_navigation("main_tab"))
+    
+    with tab1:
+        if tab_is_active(tab1):
+            # Only the Sales Overview uses the merged sales frame
+            with timed_span("load_data"):
+                df = load_data()
+            with timed_span("Sales Overview"):
+                render_sales_overview(df)
+    
+    with tab2:
+        if tab_is_active(tab2):
+            with timed_span("Product Analysis"):
+                render_product_analysis()
+    
+    with tab3:
+        if tab_is_active(tab3):
+            with timed_span("Inventory Stock"):
+                render_inventory_stock()
+    
+    with tab4:
+        if tab_is_active(tab4):
+            with timed_span("Product Returns"):
+                render_product_returns()
+    
+    with tab5:
+        if tab_is_active(tab5):
+            with timed_span("Stock & Returns Correlation"):
+                render_stock_returns_correlation()
+    
+    with tab6:
+        if tab_is_active(tab6):
+            with timed_span("Customer Insights"):
+                render_customer_insights()
+    
+    with tab7:
+        if tab_is_active(tab7):
+            with timed_span("Profit Margin Analysis"):
+                render_profit_margin_analysis()
+    
+    finish_trace()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,234 @@
+import argparse
+import glob
+import json
+import os
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from city_normalizer import normalize_cities
+from graphs import (
+    AMAZON_SALES_FILE, AMAZON_CUBE_DIMENSIONS, COMPACT_DTYPES, DATASET_SCHEMAS,
+    apply_schema, build_amazon_cube, columnar_path, compact_frame, cube_path, rollup_cube
+)
+
+# Incremental ingestion of daily Amazon order files. Each raw drop (same
+# columns as "Amazon Sale Report.csv") is cleaned with the steps of
+# "Amazon Sale Report.ipynb", cities going through city_normalizer, and appended to new_amazon_national_sales.csv,
+# its Parquet twin and the pre-aggregated cube. A manifest records how many
+# rows of every source file were ingested, so re-running the command only
+# processes new files and rows appended to files seen before.
+#
+#   python ingest_orders.py daily/orders_2022-07-01.csv
+#   python ingest_orders.py --source-dir daily
+
+MANIFEST_FILE = 'ingest_manifest.json'
+
+FILL_VALUES = {
+    'Order_ID': 0,
+    'Order_Date': 0,
+    'Order_Status': 'Unknown',
+    'Fulfillment_Type': 'Unknown',
+    'Sales_Channel': 'Unknown',
+    'Shipping_Service_Level': 'Unknown',
+    'Product_Style': 'Unknown',
+    'Product_SKU': 'Unknown',
+    'Product_Category': 'Unknown',
+    'Product_Size': 'Unknown',
+    'Amazon_Standard_ID': 'Unknown',
+    'Courier_Status': 'Unknown',
+    'Quantity': 0,
+    'Currency': 'Unknown',
+    'Sale_Amount': 0.0,
+    'Shipping_City': 'Unknown',
+    'Shipping_State': 'Unknown',
+    'Shipping_Postal_Code': 'Unknown',
+    'Shipping_Country': 'Unknown',
+    'Fulfilled_By': 'Unknown',
+    'Promotion_IDs': 'Unknown',
+    'avg. value': 0.0
+}
+
+STATE_CORRECTIONS = {
+    'RAJSHTHAN': 'RAJASTHAN',
+    'RAJSTHAN': 'RAJASTHAN',
+    'RJ': 'RAJASTHAN',
+    'PUNJAB/MOHALI/ZIRAKPUR': 'PUNJAB',
+    'PB': 'PUNJAB',
+    'NEW DELHI': 'DELHI',
+    'NL': 'NAGALAND',
+    'ORISSA': 'ODISHA',
+    'PONDICHERRY': 'PUDUCHERRY',
+    'AR': 'ARUNACHAL PRADESH',
+    'APO': 'ANDHRA PRADESH',
+    'DADRA AND NAGAR': 'DADRA AND NAGAR HAVELI AND DAMAN AND DIU'
+}
+
+DROPPED_COLUMNS = [
+    'index', 'Fulfilled_By', 'Sales_Channel',
+    'Shipping_Country', 'Courier_Status', 'Currency', 'Promotion_IDs'
+]
+
+RENAMED_COLUMNS = DATASET_SCHEMAS[AMAZON_SALES_FILE]['renames']
+
+STRING_COLUMNS = [
+    'Order_ID', 'Order_Status', 'Fulfillment_Type', 'shipping_level', 'style', 'sku',
+    'category', 'size', 'Amazon_Standard_ID', 'city', 'state', 'postal_code'
+]
+
+# Turn raw order rows into rows of the cleaned store. Every step works row by
+# row, so cleaning a batch gives the same rows as cleaning the full history.
+def clean_orders(raw):
+    a = raw.copy()
+    a.columns = a.columns.str.strip()
+    # Number of non-empty comma-separated IDs, as in the notebook: an ID
+    # starts after a comma (one is prefixed for the first) at a character
+    # other than a comma or whitespace
+    a['Promotion_ID_Count'] = (
+        (',' + a['Promotion_IDs'].astype('string')).str.count(r',\s*[^,\s]').fillna(0).astype('int64')
+    )
+    a['avg. value'] = a['Sale_Amount'] / a['Quantity']
+    a = a.fillna({col: value for col, value in FILL_VALUES.items() if col in a.columns})
+
+    a['Shipping_State'] = a['Shipping_State'].astype(str).str.strip().str.upper().replace(STATE_CORRECTIONS)
+    a['Shipping_City'] = normalize_cities(a['Shipping_City'])
+    a['avg. value'] = a['avg. value'].replace([float('inf'), float('-inf')], 0)
+
+    a['Sale_Amount'] = pd.to_numeric(a['Sale_Amount'], errors='coerce').round().astype('Int64')
+    a = a[a['Sale_Amount'] != 0]
+    a = a[a['Shipping_Postal_Code'].astype(str) != 'Unknown']
+    a['Shipping_Postal_Code'] = pd.to_numeric(a['Shipping_Postal_Code'], errors='coerce').astype('Int64')
+
+    b = a.drop(columns=DROPPED_COLUMNS, errors='ignore').rename(columns=RENAMED_COLUMNS)
+    b['date'] = pd.to_datetime(b['date'].astype(str), format='mixed', errors='coerce')
+    return b.astype({col: 'string' for col in STRING_COLUMNS if col in b.columns})
+
+def load_manifest(path):
+    if not os.path.exists(path):
+        return {'store_size': None, 'files': {}}
+    with open(path) as f:
+        return json.load(f)
+
+def save_manifest(manifest, path):
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w') as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(tmp_path, path)
+
+# Append cleaned rows to the CSV store in the store's own column order
+def append_csv(batch, store):
+    if not os.path.exists(store):
+        batch.to_csv(store, index=False)
+        return
+    header = pd.read_csv(store, nrows=0).columns
+    missing = set(header) - set(batch.columns)
+    if missing:
+        raise ValueError(f"Cleaned batch is missing store columns: {sorted(missing)}")
+    batch[list(header)].to_csv(store, mode='a', header=False, index=False)
+
+# Append cleaned rows to the Parquet twin as a new part file. A single-file
+# twin is first moved into a directory so later drops only add files.
+def append_parquet(batch, columnar):
+    if os.path.isfile(columnar):
+        first_part = columnar + '.part-00000'
+        os.replace(columnar, first_part)
+        os.makedirs(columnar)
+        os.replace(first_part, os.path.join(columnar, 'part-00000.parquet'))
+
+    parts = sorted(glob.glob(os.path.join(columnar, 'part-*.parquet')))
+    schema = pq.ParquetDataset(columnar).schema.remove_metadata()
+    table = pa.Table.from_pandas(batch[schema.names], schema=schema, preserve_index=False)
+    pq.write_table(table, os.path.join(columnar, f'part-{len(parts):05d}.parquet'), compression='zstd')
+
+# Read columns of the cleaned store the same way the dashboard does
+def read_store(store, columns, use_columnar):
+    if use_columnar:
+        df = pd.read_parquet(columnar_path(store), columns=columns)
+    else:
+        df = pd.read_csv(store, usecols=columns)
+    return apply_schema(df, store)
+
+# Cube measures are additive, so the cube of the grown store is the roll-up
+# of the existing cube and the cube of the new rows
+def update_cube(batch, store, cube_is_current, use_columnar):
+    cube_file = cube_path(store)
+    batch_cube = build_amazon_cube(compact_frame(batch, COMPACT_DTYPES.get(store, {})))
+    if cube_is_current:
+        cube = rollup_cube(pd.concat([pd.read_parquet(cube_file), batch_cube], ignore_index=True), AMAZON_CUBE_DIMENSIONS)
+    else:
+        columns = ['date'] + [col for col in AMAZON_CUBE_DIMENSIONS if col not in ('month', 'priced')]
+        columns += ['quantity', 'sale', 'avg. value']
+        cube = build_amazon_cube(read_store(store, columns, use_columnar))
+
+    categorical = [col for col in AMAZON_CUBE_DIMENSIONS if COMPACT_DTYPES[store].get(col) == 'category']
+    cube = cube.astype({col: 'category' for col in categorical})
+    cube.to_parquet(cube_file, index=False, compression='zstd')
+
+# Rows of a source file that the manifest has not seen yet
+def read_new_rows(source, entry):
+    size = os.path.getsize(source)
+    if entry and size < entry['size']:
+        raise ValueError(f"{source} shrank since it was ingested; rename it to ingest it as a new file")
+    if entry and size == entry['size']:
+        return None, size
+    skip = entry['rows'] if entry else 0
+    return pd.read_csv(source, skiprows=range(1, skip + 1)), size
+
+def ingest(sources, store=AMAZON_SALES_FILE, manifest_path=MANIFEST_FILE):
+    manifest = load_manifest(manifest_path)
+    if os.path.exists(store) and manifest['store_size'] not in (None, os.path.getsize(store)):
+        raise SystemExit(
+            f"{store} changed outside the ingestion (e.g. a notebook rebuild). "
+            f"Delete {manifest_path} to re-ingest every source file into the rebuilt store."
+        )
+
+    for source in sources:
+        entry = manifest['files'].get(source)
+        raw, size = read_new_rows(source, entry)
+        if raw is None or raw.empty:
+            print(f"{source}: nothing new")
+            continue
+
+        batch = clean_orders(raw)
+
+        # Decide which derived artifacts are in sync before the store changes
+        columnar = columnar_path(store)
+        store_mtime = os.stat(store).st_mtime_ns if os.path.exists(store) else None
+        use_columnar = os.path.exists(columnar) and (
+            store_mtime is None or os.stat(columnar).st_mtime_ns >= store_mtime
+        )
+        cube_is_current = (
+            store_mtime is not None
+            and os.path.exists(cube_path(store))
+            and os.stat(cube_path(store)).st_mtime_ns >= max(
+                store_mtime, os.stat(columnar).st_mtime_ns if use_columnar else 0
+            )
+        )
+
+        append_csv(batch, store)
+        if use_columnar:
+            append_parquet(batch, columnar)
+        elif os.path.exists(columnar):
+            print(f"{columnar} is older than {store}; re-run the notebook to refresh it")
+        update_cube(batch, store, cube_is_current, use_columnar)
+
+        manifest['files'][source] = {'rows': (entry['rows'] if entry else 0) + len(raw), 'size': size}
+        manifest['store_size'] = os.path.getsize(store)
+        save_manifest(manifest, manifest_path)
+        print(f"{source}: {len(raw):,} new rows, {len(batch):,} appended after cleaning")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Append new Amazon order rows to the cleaned sales store")
+    parser.add_argument('sources', nargs='*', help="raw order CSV files")
+    parser.add_argument('--source-dir', help="ingest every CSV file in this directory")
+    parser.add_argument('--manifest', default=MANIFEST_FILE)
+    args = parser.parse_args()
+
+    sources = list(args.sources)
+    if args.source_dir:
+        sources += [
+            path for path in sorted(glob.glob(os.path.join(args.source_dir, '*.csv')))
+            if os.path.abspath(path) != os.path.abspath(AMAZON_SALES_FILE)
+        ]
+    ingest(sources, manifest_path=args.manifest)
@@ -0,0 +1,218 @@
+import argparse
+import json
+import os
+import platform
+import resource
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+from streamlit.runtime import Runtime
+from streamlit.testing.v1 import AppTest
+
+from benchmarks import quiet_streamlit
+
+# Concurrent-session load test. Each simulated session is a Streamlit
+# AppTest of graphs.py running in this process, so sessions share the
+# process-wide caches like sessions of one server do. Sessions replay the
+# interactions of SCENARIO (open a tab, then change its filter) with random
+# choices, and every rerun is timed. AppTest does not carry the st.tabs
+# selection from one rerun to the next, so every step names its tab and the
+# tab is selected again before each rerun. For each concurrency level the report
+# gives rerun latency percentiles, reruns per second and process memory.
+#
+#   python loadtest.py --data-dir synthetic --sessions 1 4 8 16 --rounds 3
+
+APP_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'graphs.py')
+
+# AppTest installs a mock Runtime when a run starts and removes it when the
+# run ends, which would pull it from under the sessions still running. Keep
+# the last installed runtime visible to them.
+def share_test_runtime():
+    installed = {}
+    
+    def instance(cls):
+        if cls._instance is not None:
+            installed['runtime'] = cls._instance
+            return cls._instance
+        if 'runtime' in installed:
+            return installed['runtime']
+        raise RuntimeError("Runtime hasn't been created!")
+    
+    def exists(cls):
+        return cls._instance is not None or 'runtime' in installed
+    
+    Runtime.instance = classmethod(instance)
+    Runtime.exists = classmethod(exists)
+
+# The widget a step changes must have rendered on the previous rerun;
+# otherwise the step would time a tab other than the one it names.
+def widget(widgets, label):
+    found = [w for w in widgets if w.label == label]
+    if not found:
+        raise AssertionError(f"widget {label!r} did not render")
+    return found[0]
+
+def keyed_widget(widgets, key):
+    found = [w for w in widgets if w.key == key]
+    if not found:
+        raise AssertionError(f"widget {key!r} did not render")
+    return found[0]
+
+def open_tab(at, tab, sub_tab=None):
+    at.session_state['main_tab'] = tab
+    if sub_tab is not None:
+        at.session_state['analysis_tab'] = sub_tab
+
+def change_year(at, rng):
+    year = widget(at.selectbox, "Select Year")
+    year.select_index(int(rng.integers(len(year.options))))
+
+def change_states(at, rng):
+    states = keyed_widget(at.multiselect, "state_filter")
+    count = int(rng.integers(1, min(len(states.options), 10) + 1))
+    states.set_value(list(rng.choice(states.options, size=count, replace=False)))
+
+def change_margin(at, rng):
+    margin = widget(at.slider, "Select Profit Margin Range (%)")
+    low, high = sorted(rng.uniform(margin.min, margin.max, size=2))
+    margin.set_range(round(float(low), 1), round(float(high), 1))
+
+def change_customer(at, rng):
+    customer = widget(at.selectbox, "Select Customer")
+    customer.select_index(int(rng.integers(len(customer.options))))
+
+def no_change(at, rng):
+    pass
+
+SALES_OVERVIEW = ("📊 Sales Overview", None)
+STATE_ANALYTICS = ("🔍 Product Analysis", "🏪 State Analytics")
+PROFIT_MARGINS = ("💰 Profit Margin Analysis", None)
+CUSTOMER_INSIGHTS = ("👥 Customer Insights", None)
+
+# (step name, (main tab, analysis sub-tab), action before the rerun). Tab
+# switches are reruns of their own.
+SCENARIO = [
+    ('open dashboard', SALES_OVERVIEW, no_change),
+    ('year change', SALES_OVERVIEW, change_year),
+    ('open state analytics', STATE_ANALYTICS, no_change),
+    ('state multiselect', STATE_ANALYTICS, change_states),
+    ('open profit margins', PROFIT_MARGINS, no_change),
+    ('margin slider', PROFIT_MARGINS, change_margin),
+    ('open customer insights', CUSTOMER_INSIGHTS, no_change),
+    ('customer selection', CUSTOMER_INSIGHTS, change_customer)
+]
+
+def rss_mb():
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / 1024 ** 2
+    except OSError:
+        return None
+
+def peak_rss_mb():
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 1024 ** 2 if platform.system() == 'Darwin' else peak / 1024
+
+def run_session(session_id, rounds, seed, timings, failures, timeout):
+    rng = np.random.default_rng([seed, session_id])
+    at = AppTest.from_file(APP_FILE, default_timeout=timeout)
+    for _ in range(rounds):
+        for step, tab, action in SCENARIO:
+            try:
+                action(at, rng)
+                open_tab(at, *tab)
+                start = time.perf_counter()
+                at.run()
+                elapsed = time.perf_counter() - start
+            except Exception as e:
+                failures.append(f"session {session_id} {step}: {e}")
+                continue
+            timings.append((step, elapsed))
+            failures.extend(f"session {session_id} {step}: {e.value}" for e in at.exception)
+            failures.extend(f"session {session_id} {step}: {e.value}" for e in at.error)
+
+def latency_summary(seconds):
+    values = np.array(seconds)
+    return {
+        'reruns': len(values),
+        'p50': round(float(np.percentile(values, 50)), 4),
+        'p95': round(float(np.percentile(values, 95)), 4),
+        'p99': round(float(np.percentile(values, 99)), 4),
+        'max': round(float(values.max()), 4)
+    }
+
+def run_level(sessions, rounds, seed, cold, timeout):
+    if cold:
+        st.cache_resource.clear()
+        st.cache_data.clear()
+    timings, failures = [], []
+    threads = [
+        threading.Thread(target=run_session, args=(i, rounds, seed, timings, failures, timeout))
+        for i in range(sessions)
+    ]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    wall = time.perf_counter() - start
+
+    result = {'sessions': sessions, 'wall_seconds': round(wall, 3), 'failures': failures}
+    if timings:
+        result['latency'] = latency_summary([seconds for _, seconds in timings])
+        result['throughput_reruns_per_s'] = round(len(timings) / wall, 3)
+        result['steps'] = {
+            step: latency_summary([seconds for name, seconds in timings if name == step])
+            for step, _, _ in SCENARIO
+            if any(name == step for name, _ in timings)
+        }
+    rss = rss_mb()
+    result['rss_mb'] = None if rss is None else round(rss, 1)
+    result['peak_rss_mb'] = round(peak_rss_mb(), 1)
+    return result
+
+def main():
+    parser = argparse.ArgumentParser(description="Load-test the dashboard with concurrent simulated sessions")
+    parser.add_argument('--data-dir', default='.', help="directory holding the cleaned datasets")
+    parser.add_argument('--sessions', type=int, nargs='+', default=[1, 2, 4, 8], help="concurrency levels")
+    parser.add_argument('--rounds', type=int, default=2, help="scenario repetitions per session")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--cold', action='store_true', help="clear the caches before every concurrency level")
+    parser.add_argument('--timeout', type=float, default=600, help="seconds allowed per rerun")
+    parser.add_argument('--output', default='loadtest_results.json')
+    args = parser.parse_args()
+
+    quiet_streamlit()
+    share_test_runtime()
+    output = os.path.abspath(args.output)
+    os.chdir(args.data_dir)
+
+    report = {
+        'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'python': platform.python_version(),
+        'pandas': pd.__version__,
+        'streamlit': st.__version__,
+        'cpus': os.cpu_count(),
+        'scenario': [step for step, _, _ in SCENARIO],
+        'results': []
+    }
+    for sessions in args.sessions:
+        result = run_level(sessions, args.rounds, args.seed, args.cold, args.timeout)
+        report['results'].append(result)
+        latency = result.get('latency')
+        summary = (
+            f"p50 {latency['p50']:7.3f}s p95 {latency['p95']:7.3f}s p99 {latency['p99']:7.3f}s "
+            f"{result['throughput_reruns_per_s']:6.2f} reruns/s" if latency else "no completed reruns"
+        )
+        print(f"{sessions:>3} sessions: {summary} | RSS {result['rss_mb'] or 0:8.1f} MB "
+              f"(peak {result['peak_rss_mb']:.1f} MB) | {len(result['failures'])} failures")
+
+    with open(output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"Results written to {args.output}")
+
+if __name__ == "__main__":
+    main()
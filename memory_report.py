@@ -0,0 +1,40 @@
+import pandas as pd
+
+from graphs import COMPACT_DTYPES, compact_frame
+
+# Compare the memory used by each cleaned dataset when loaded with plain
+# pd.read_csv (inferred string/int64/float64 columns) against the compact
+# schema that graphs.py applies at load time.
+
+def frame_memory_mb(df):
+    return df.memory_usage(index=False, deep=True) / 1024 ** 2
+
+rows = []
+for path, plan in COMPACT_DTYPES.items():
+    try:
+        raw = pd.read_csv(path)
+    except FileNotFoundError:
+        print(f"Skipping {path}: file not found")
+        continue
+
+    compact = compact_frame(raw, plan)
+    before = frame_memory_mb(raw)
+    after = frame_memory_mb(compact)
+
+    for col in raw.columns:
+        rows.append({
+            'dataset': path,
+            'column': col,
+            'before_dtype': str(raw[col].dtype),
+            'after_dtype': str(compact[col].dtype),
+            'before_mb': round(before[col], 3),
+            'after_mb': round(after[col], 3)
+        })
+
+    print(f"{path}: {len(raw):,} rows, {before.sum():.2f} MB -> {after.sum():.2f} MB "
+          f"({before.sum() / max(after.sum(), 1e-9):.1f}x smaller)")
+
+report = pd.DataFrame(rows)
+if not report.empty:
+    print()
+    print(report.to_string(index=False))
@@ -0,0 +1,52 @@
+import argparse
+import os
+
+import pandas as pd
+
+from graphs import (
+    PRICE_HISTORY_FILE, PRODUCT_INFO_2021_FILE, PRODUCT_INFO_2022_FILE,
+    apply_schema, period_label, price_snapshot
+)
+
+# Append P&L snapshots to the product price history store read by the
+# Profit Margin tab (see price_snapshot in graphs.py). A snapshot is a product
+# info table for one month with the columns of new_2021_product_info.csv or
+# new_2022_product_info.csv; its SKU rows are typed and renamed with that
+# dataset's schema, given their margin and stored under the month. Appending
+# a month that is already stored replaces its rows, so re-running a notebook
+# is safe. The store is rewritten through a temporary file.
+#
+#   python price_history.py 2022-06 "P L June 2022.csv"
+#   python price_history.py 2021-03 new_2021_product_info.csv --layout new_2021_product_info.csv
+
+SNAPSHOT_LAYOUTS = [PRODUCT_INFO_2021_FILE, PRODUCT_INFO_2022_FILE]
+
+def append_price_snapshot(df, period, layout=PRODUCT_INFO_2022_FILE, path=PRICE_HISTORY_FILE):
+    snapshot = price_snapshot(apply_schema(df, layout), period)
+    month = pd.Timestamp(period).to_period('M').to_timestamp()
+    if os.path.exists(path):
+        history = pd.read_parquet(path)
+        snapshot = pd.concat([history[history['period'] != month], snapshot], ignore_index=True)
+    snapshot = snapshot.sort_values('period', kind='stable')
+
+    temporary = path + ".tmp"
+    snapshot.to_parquet(temporary, index=False, compression='zstd')
+    os.replace(temporary, path)
+    return int((snapshot['period'] == month).sum())
+
+def read_snapshot(source):
+    if source.endswith('.parquet'):
+        return pd.read_parquet(source)
+    return pd.read_csv(source)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Append a P&L product price snapshot to the price history store")
+    parser.add_argument('period', help="snapshot month, e.g. 2022-06")
+    parser.add_argument('source', help="product info CSV or Parquet file of that month")
+    parser.add_argument('--layout', choices=SNAPSHOT_LAYOUTS, default=PRODUCT_INFO_2022_FILE,
+                        help="bundled dataset whose column names the snapshot uses")
+    parser.add_argument('--store', default=PRICE_HISTORY_FILE, help="price history Parquet file")
+    args = parser.parse_args()
+
+    rows = append_price_snapshot(read_snapshot(args.source), args.period, args.layout, args.store)
+    print(f"Stored {rows:,} products for {period_label(args.period)} in {args.store}")
@@ -0,0 +1,111 @@
+import argparse
+import glob
+import json
+import os
+import tempfile
+
+import pandas as pd
+
+from graphs import AMAZON_CUBE_DIMENSIONS, AMAZON_SALES_FILE, COMPACT_DTYPES, build_amazon_cube, cube_path, rollup_cube
+from ingest_orders import clean_orders
+
+# Streaming aggregation over a raw Amazon order export ("Amazon Sale
+# Report.csv" columns) too large to load at once. The file is read in chunks
+# of a fixed number of rows; every chunk is cleaned with clean_orders() and
+# folded into a running cube (see build_amazon_cube), so memory depends on the
+# chunk size and the number of dimension combinations, not on the file size.
+# Distinct promotion IDs are collected alongside. The result is the cube of
+# the whole export plus a JSON summary of state, city, category and month
+# totals, order status counts and the number of distinct promotions.
+# Promotion IDs are not held in memory: each chunk's IDs are appended to one
+# of PROMOTION_PARTITIONS spill files chosen by hash, and the distinct count
+# is the sum of the distinct counts of the partitions, read one at a time.
+#
+#   python stream_orders.py "Amazon Sale Report.csv"
+#   python stream_orders.py "Amazon Sale Report.csv" --chunk-size 50000 --summary report.json
+
+CHUNK_SIZE = 100_000
+PROMOTION_PARTITIONS = 64
+
+SUMMARY_DIMENSIONS = {
+    'states': 'state',
+    'cities': 'city',
+    'categories': 'category',
+    'months': 'month'
+}
+
+def promotion_ids(raw):
+    ids = raw['Promotion_IDs'].dropna().astype(str).str.split(',').explode().str.strip()
+    return pd.Series(ids[ids != ''].unique(), dtype=object)
+
+def spill_promotions(ids, spill_dir):
+    partitions = pd.util.hash_pandas_object(ids, index=False).to_numpy() % PROMOTION_PARTITIONS
+    for partition, group in ids.groupby(partitions):
+        with open(os.path.join(spill_dir, f"{partition}.txt"), 'a', encoding='utf-8') as f:
+            f.write('\n'.join(group) + '\n')
+
+def count_spilled_promotions(spill_dir):
+    distinct = 0
+    for path in glob.glob(os.path.join(spill_dir, '*.txt')):
+        with open(path, encoding='utf-8') as f:
+            distinct += len(set(f.read().splitlines()))
+    return distinct
+
+# Fold one cleaned chunk into the running cube. Cube measures are additive,
+# so rolling up the concatenation at full grain gives the cube of both.
+def fold_chunk(cube, batch):
+    batch_cube = build_amazon_cube(batch)
+    if cube is None:
+        return batch_cube
+    return rollup_cube(pd.concat([cube, batch_cube], ignore_index=True), AMAZON_CUBE_DIMENSIONS)
+
+def stream_cube(source, chunk_size=CHUNK_SIZE):
+    plan = COMPACT_DTYPES[AMAZON_SALES_FILE]
+    cube = None
+    rows_read = rows_kept = 0
+    with tempfile.TemporaryDirectory() as spill_dir:
+        for raw in pd.read_csv(source, chunksize=chunk_size):
+            batch = clean_orders(raw)
+            spill_promotions(promotion_ids(raw.loc[batch.index]), spill_dir)
+            cube = fold_chunk(cube, batch.astype({col: 'category' for col in batch.columns if plan.get(col) == 'category'}))
+            rows_read += len(raw)
+            rows_kept += len(batch)
+            print(f"{source}: {rows_read:,} rows read, {rows_kept:,} kept, {len(cube):,} cube cells")
+        promotions = count_spilled_promotions(spill_dir)
+
+    categorical = [col for col in AMAZON_CUBE_DIMENSIONS if plan.get(col) == 'category']
+    cube = cube.astype({col: 'category' for col in categorical})
+    return cube, promotions, rows_read, rows_kept
+
+def totals(cube, dimension):
+    grouped = rollup_cube(cube, [dimension]).dropna(subset=[dimension])
+    return {
+        str(row[dimension]): {'orders': int(row['orders']), 'quantity': float(row['quantity']), 'sale': float(row['sale'])}
+        for _, row in grouped.iterrows()
+    }
+
+def summarize(cube, distinct_promotions, rows_read, rows_kept):
+    summary = {'rows_read': rows_read, 'rows_kept': rows_kept}
+    for name, dimension in SUMMARY_DIMENSIONS.items():
+        summary[name] = totals(cube, dimension)
+    statuses = rollup_cube(cube, ['Order_Status'])
+    summary['status_counts'] = {str(status): int(orders) for status, orders in zip(statuses['Order_Status'], statuses['orders'])}
+    summary['distinct_promotions'] = distinct_promotions
+    return summary
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Aggregate a raw Amazon order export in bounded memory")
+    parser.add_argument('source', help="raw order CSV file")
+    parser.add_argument('--chunk-size', type=int, default=CHUNK_SIZE, help="rows read per chunk")
+    parser.add_argument('--cube', help="cube Parquet file to write (default: next to the source)")
+    parser.add_argument('--summary', help="summary JSON file to write (default: next to the source)")
+    args = parser.parse_args()
+
+    cube, promotions, rows_read, rows_kept = stream_cube(args.source, args.chunk_size)
+    cube_file = args.cube or cube_path(args.source)
+    summary_file = args.summary or os.path.splitext(args.source)[0] + ".summary.json"
+
+    cube.to_parquet(cube_file, index=False, compression='zstd')
+    with open(summary_file, 'w') as f:
+        json.dump(summarize(cube, promotions, rows_read, rows_kept), f, indent=2, ensure_ascii=False)
+    print(f"Wrote {cube_file} ({len(cube):,} cells) and {summary_file}")
@@ -0,0 +1,378 @@
+import argparse
+import math
+import os
+import shutil
+import zlib
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from city_normalizer import CITY_LOOKUP_FILE, load_canonical_cities
+from graphs import (
+    AMAZON_SALES_FILE, INTERNATIONAL_SALES_FILE, STOCK_REPORT_FILE,
+    PRODUCT_INFO_2021_FILE, PRODUCT_INFO_2022_FILE, DATASET_SCHEMAS, columnar_path, cube_path
+)
+from ingest_orders import STRING_COLUMNS
+
+# Synthetic copies of the cleaned datasets at any size, for load-testing the
+# dashboard. The bundled files are the model:
+#   - the SKU catalog is repeated as many times as needed. Each copy shifts the
+#     first number of every SKU and style code by the same amount in every
+#     file, so formats survive (AN201-RED-L -> AN100201-RED-L, Os206_3141_S ->
+#     Os100206_3141_S) and SKUs still join across stock, sales and product info
+#   - order and sale rows are drawn from the bundled rows, which keeps the
+#     joint distribution of SKU, size, price, status, place and date, and are
+#     assigned to a random catalog copy. Order IDs, ASINs and customers of the
+#     added copies are generated.
+#   - stock levels of the added copies follow the bundled stock distribution
+# Without the cleaned Amazon file, order rows are first built from the stock
+# catalog with the order mix recorded in "Amazon Sale Report.ipynb"; cities
+# then come from indian_cities.xlsx and are not tied to their state.
+#
+# Fact tables are written chunk by chunk (CSV plus Parquet twin), so memory
+# stays flat whatever the requested size.
+#
+#   python synthetic_data.py --orders 10000000 --output-dir synthetic
+#   cd synthetic && streamlit run ../graphs.py
+
+# Order mix of the cleaned Amazon data, from the notebook's value counts
+ORDER_STATUS_COUNTS = {
+    'Cancelled': 10761,
+    'Pending': 639,
+    'Pending - Waiting for Pick Up': 272,
+    'Shipped': 76062,
+    'Shipped - Damaged': 1,
+    'Shipped - Delivered to Buyer': 28038,
+    'Shipped - Lost in Transit': 3,
+    'Shipped - Out for Delivery': 35,
+    'Shipped - Picked Up': 945,
+    'Shipped - Rejected by Buyer': 11,
+    'Shipped - Returned to Seller': 1896,
+    'Shipped - Returning to Seller': 143
+}
+FULFILLMENT_COUNTS = {'Amazon': 82094, 'Merchant': 36712}
+SHIPPING_LEVEL_COUNTS = {'Expedited': 82033, 'Standard': 36773}
+AMAZON_DATE_RANGE = ('2022-03-31', '2022-06-29')
+AMAZON_FALLBACK_ROWS = 118806
+ORDER_LINES_SHARE = 120378 / 128975
+PROMOTION_SHARE = 79822 / 128975
+B2B_SHARE = 0.007
+ORDER_ID_PREFIXES = ['171', '402', '403', '404', '405', '406', '407', '408']
+
+# Cleaned state names (see STATE_CORRECTIONS in ingest_orders.py)
+INDIAN_STATES = [
+    'ANDAMAN & NICOBAR', 'ANDHRA PRADESH', 'ARUNACHAL PRADESH', 'ASSAM', 'BIHAR',
+    'CHANDIGARH', 'CHHATTISGARH', 'DADRA AND NAGAR HAVELI AND DAMAN AND DIU', 'DELHI',
+    'GOA', 'GUJARAT', 'HARYANA', 'HIMACHAL PRADESH', 'JAMMU & KASHMIR', 'JHARKHAND',
+    'KARNATAKA', 'KERALA', 'LADAKH', 'LAKSHADWEEP', 'MADHYA PRADESH', 'MAHARASHTRA',
+    'MANIPUR', 'MEGHALAYA', 'MIZORAM', 'NAGALAND', 'ODISHA', 'PUDUCHERRY', 'PUNJAB',
+    'RAJASTHAN', 'SIKKIM', 'TAMIL NADU', 'TELANGANA', 'TRIPURA', 'UTTAR PRADESH',
+    'UTTARAKHAND', 'WEST BENGAL'
+]
+
+# Columns holding SKU-like codes that are renumbered per catalog copy
+CODE_COLUMNS = {
+    AMAZON_SALES_FILE: ['sku', 'style'],
+    INTERNATIONAL_SALES_FILE: ['sku', 'style'],
+    STOCK_REPORT_FILE: ['sku', 'design_no'],
+    PRODUCT_INFO_2021_FILE: ['sku', 'style'],
+    PRODUCT_INFO_2022_FILE: ['sku', 'style']
+}
+
+def read_source(data_dir, name):
+    path = os.path.join(data_dir, name)
+    if os.path.exists(path):
+        return pd.read_csv(path)
+    if os.path.exists(columnar_path(path)):
+        return pd.read_parquet(columnar_path(path))
+    return None
+
+# Step between catalog copies: one more digit than the longest code number,
+# so shifted codes never collide with bundled ones
+def code_shift(frames):
+    width = 1
+    for name, df in frames.items():
+        for col in CODE_COLUMNS[name]:
+            digits = df[col].astype(str).str.extract(r'^\D*(\d*)', expand=False).str.len()
+            width = max(width, int(digits.max()))
+    return 10 ** width
+
+# Shift the first number of each code, keeping its zero padding. Codes
+# without a number get the shift inserted after their letters.
+def renumber(codes, shift):
+    if shift == 0:
+        return codes
+    def shifted(match):
+        digits = match.group(2)
+        number = str(int(digits) + shift).zfill(len(digits)) if digits else str(shift)
+        return match.group(1) + number
+    return codes.str.replace(r'^(\D*)(\d*)', shifted, n=1, regex=True)
+
+# Codes of a column for every catalog copy, laid out so that the value of
+# template code j in copy k is lookup[k * len(uniques) + j]
+def copy_lookup(values, copies, shift):
+    codes, uniques = pd.factorize(values.astype(str))
+    uniques = pd.Series(uniques, dtype=object)
+    lookup = np.concatenate([renumber(uniques, k * shift).to_numpy(dtype=object) for k in range(copies)])
+    return codes, len(uniques), lookup
+
+# Sample a numeric column by inverting its empirical distribution
+def numeric_sampler(values):
+    levels = np.linspace(0, 1, 201)
+    quantiles = np.quantile(values.dropna().to_numpy(dtype=float), levels)
+    return lambda rng, n: np.interp(rng.random(n), levels, quantiles)
+
+def weighted_choice(rng, counts, n):
+    values = list(counts)
+    weights = np.array([counts[value] for value in values], dtype=float)
+    return np.array(values, dtype=object)[rng.choice(len(values), size=n, p=weights / weights.sum())]
+
+# Catalog tables repeated `copies` times with renumbered codes. Stock levels of
+# the added copies are drawn from the bundled stock distribution.
+def scale_catalog(name, df, copies, shift, rng):
+    parts = []
+    stock_sampler = numeric_sampler(df['stock']) if 'stock' in df.columns else None
+    for k in range(copies):
+        part = df.copy()
+        for col in CODE_COLUMNS[name]:
+            part[col] = renumber(part[col].astype(str), k * shift)
+        if stock_sampler is not None and k > 0:
+            part['stock'] = np.rint(stock_sampler(rng, len(part))).astype('int64')
+        parts.append(part)
+    return pd.concat(parts, ignore_index=True).drop_duplicates(subset='sku')
+
+# Stand-in for the cleaned Amazon orders when the file is not available: rows
+# follow the stock catalog (weighted by international sales of each SKU) and
+# the notebook's order mix, priced from the international sales
+def fallback_amazon_template(stock, international, cities, rng, rows=AMAZON_FALLBACK_ROWS):
+    popularity = international['sku'].value_counts()
+    weights = stock['sku'].map(popularity).fillna(0).to_numpy(dtype=float) + 1
+    items = stock.iloc[rng.choice(len(stock), size=rows, p=weights / weights.sum())].reset_index(drop=True)
+
+    unit_prices = international.groupby('sku')['Price_per_Unit'].mean()
+    price = np.array(items['sku'].map(unit_prices), dtype=float)
+    unknown = np.isnan(price)
+    price[unknown] = numeric_sampler(international['Price_per_Unit'])(rng, int(unknown.sum()))
+
+    quantities = international['Quantity_Purchased'].value_counts()
+    quantity = weighted_choice(rng, quantities.to_dict(), rows).astype('int64')
+    status = weighted_choice(rng, ORDER_STATUS_COUNTS, rows)
+    sale = np.maximum(np.rint(price * quantity), 1).astype('int64')
+    # Cancelled orders keep their amount but no units, as in the source data
+    quantity[status == 'Cancelled'] = 0
+
+    start, end = pd.Timestamp(AMAZON_DATE_RANGE[0]), pd.Timestamp(AMAZON_DATE_RANGE[1])
+    days = (end - start).days + 1
+    promotions = np.where(
+        rng.random(rows) < PROMOTION_SHARE,
+        np.minimum(rng.geometric(0.11, size=rows), 36),
+        0
+    )
+
+    return pd.DataFrame({
+        'Order_ID': '',
+        'date': start + pd.to_timedelta(rng.integers(0, days, rows), unit='D'),
+        'Order_Status': status,
+        'Fulfillment_Type': weighted_choice(rng, FULFILLMENT_COUNTS, rows),
+        'shipping_level': weighted_choice(rng, SHIPPING_LEVEL_COUNTS, rows),
+        'style': items['design_no'],
+        'sku': items['sku'],
+        'category': items['category'],
+        'size': items['size'],
+        'Amazon_Standard_ID': '',
+        'quantity': quantity,
+        'sale': sale,
+        'city': cities[rng.integers(0, len(cities), rows)],
+        'state': np.array(INDIAN_STATES, dtype=object)[rng.integers(0, len(INDIAN_STATES), rows)],
+        'postal_code': rng.integers(110001, 855118, rows),
+        'b2b': rng.random(rows) < B2B_SHARE,
+        'Promotion_ID_Count': promotions,
+        'avg. value': np.where(quantity > 0, sale / np.maximum(quantity, 1), 0.0)
+    })
+
+def asin(sku):
+    return 'B0' + np.base_repr(zlib.crc32(sku.encode()), 36).zfill(8)
+
+# Order IDs in Amazon's 3-7-7 digit format. Sequence numbers are scrambled by
+# an affine map that is invertible modulo 10**14, so IDs never repeat.
+def order_ids(sequence, prefixes):
+    scrambled = (sequence.astype(np.uint64) * np.uint64(48271043) + np.uint64(53480807305151)) % np.uint64(10 ** 14)
+    digits = pd.Series(scrambled.astype(str)).str.zfill(14)
+    prefix = pd.Series(np.array(prefixes, dtype=object)[sequence % len(prefixes)])
+    return (prefix + '-' + digits.str[:7] + '-' + digits.str[7:]).to_numpy(dtype=object)
+
+def amazon_chunks(template, rows, copies, shift, chunk_size, seed):
+    sku_codes, sku_count, sku_lookup = copy_lookup(template['sku'], copies, shift)
+    style_codes, style_count, style_lookup = copy_lookup(template['style'], copies, shift)
+
+    # Bundled SKUs keep their ASIN; added copies get one derived from the SKU
+    first_asin = template.groupby(sku_codes)['Amazon_Standard_ID'].first().astype(str).to_numpy(dtype=object)
+    asin_lookup = np.array([asin(sku) for sku in sku_lookup], dtype=object)
+    known = first_asin != ''
+    asin_lookup[:sku_count][known] = first_asin[known]
+
+    prefixes = ORDER_ID_PREFIXES
+    if template['Order_ID'].astype(str).str.match(r'^\d{3}-').any():
+        prefixes = sorted(template['Order_ID'].astype(str).str[:3].loc[lambda s: s.str.isdigit()].unique())
+        lines_share = template['Order_ID'].nunique() / len(template)
+    else:
+        lines_share = ORDER_LINES_SHARE
+
+    next_order = 0
+    for index, start in enumerate(range(0, rows, chunk_size)):
+        rng = np.random.default_rng([seed, 1, index])
+        n = min(chunk_size, rows - start)
+        picked = rng.integers(0, len(template), n)
+        copy = rng.integers(0, copies, n)
+
+        chunk = template.iloc[picked].reset_index(drop=True)
+        sku_index = copy * sku_count + sku_codes[picked]
+        chunk['sku'] = sku_lookup[sku_index]
+        chunk['style'] = style_lookup[copy * style_count + style_codes[picked]]
+        chunk['Amazon_Standard_ID'] = asin_lookup[sku_index]
+
+        new_order = rng.random(n) < lines_share
+        new_order[0] = True
+        sequence = next_order + np.cumsum(new_order) - 1
+        next_order = int(sequence[-1]) + 1
+        chunk['Order_ID'] = order_ids(sequence, prefixes)
+        yield chunk
+
+# Bundled customers first, then generated names that pair a first name and a
+# surname from different bundled customers
+def customer_names(names, copies, rng):
+    bundled = pd.unique(names.astype(str))
+    first = [name.split()[0] for name in bundled]
+    last = [name.split()[-1] for name in bundled]
+    seen = set(bundled)
+    result = list(bundled)
+    for k in range(1, copies):
+        for i in range(len(bundled)):
+            name = f"{first[rng.integers(len(first))]} {last[rng.integers(len(last))]}"
+            if name in seen:
+                name = f"{name} {k}"
+            seen.add(name)
+            result.append(name)
+    return np.array(result, dtype=object)
+
+def international_chunks(template, rows, copies, shift, chunk_size, seed):
+    sku_codes, sku_count, sku_lookup = copy_lookup(template['sku'], copies, shift)
+    style_codes, style_count, style_lookup = copy_lookup(template['style'], copies, shift)
+    customer_codes, bundled_customers = pd.factorize(template['Customer_Name'].astype(str))
+    customer_count = len(bundled_customers)
+    customers = customer_names(template['Customer_Name'], copies, np.random.default_rng([seed, 2]))
+
+    for index, start in enumerate(range(0, rows, chunk_size)):
+        rng = np.random.default_rng([seed, 3, index])
+        n = min(chunk_size, rows - start)
+        picked = rng.integers(0, len(template), n)
+        copy = rng.integers(0, copies, n)
+        buyer_copy = rng.integers(0, copies, n)
+
+        chunk = template.iloc[picked].reset_index(drop=True)
+        chunk['sku'] = sku_lookup[copy * sku_count + sku_codes[picked]]
+        chunk['style'] = style_lookup[copy * style_count + style_codes[picked]]
+        chunk['Customer_Name'] = customers[buyer_copy * customer_count + customer_codes[picked]]
+        yield chunk
+
+# Write a dataset chunk by chunk to CSV and, optionally, to its Parquet twin.
+# `to_columnar` converts a chunk to the dtypes the notebooks store in Parquet.
+def write_dataset(path, chunks, parquet=True, to_columnar=None):
+    columnar = columnar_path(path)
+    if os.path.isdir(columnar):
+        shutil.rmtree(columnar)
+    elif os.path.exists(columnar):
+        os.remove(columnar)
+
+    writer = None
+    rows = 0
+    try:
+        for chunk in chunks:
+            chunk.to_csv(path, mode='w' if rows == 0 else 'a', header=rows == 0, index=False)
+            if parquet:
+                table_frame = to_columnar(chunk) if to_columnar else chunk
+                if writer is None:
+                    table = pa.Table.from_pandas(table_frame, preserve_index=False)
+                    writer = pq.ParquetWriter(columnar, table.schema, compression='zstd')
+                else:
+                    table = pa.Table.from_pandas(table_frame, schema=writer.schema, preserve_index=False)
+                writer.write_table(table)
+            rows += len(chunk)
+    finally:
+        if writer is not None:
+            writer.close()
+    print(f"{path}: {rows:,} rows")
+
+def amazon_columnar(chunk):
+    return chunk.astype({col: 'string' for col in STRING_COLUMNS if col in chunk.columns})
+
+def international_columnar(chunk):
+    date_format = DATASET_SCHEMAS[INTERNATIONAL_SALES_FILE]['dates']['date']
+    return chunk.assign(date=pd.to_datetime(chunk['date'], format=date_format))
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate synthetic datasets shaped like the bundled ones")
+    parser.add_argument('--data-dir', default='.', help="directory holding the bundled cleaned datasets")
+    parser.add_argument('--output-dir', default='synthetic')
+    parser.add_argument('--orders', type=int, default=1_000_000, help="Amazon order rows to generate")
+    parser.add_argument('--international', type=int, default=None,
+                        help="international sale rows (default: same multiple of the bundled rows as --orders)")
+    parser.add_argument('--catalog-copies', type=int, default=None,
+                        help="copies of the SKU catalog (default: enough to keep orders per SKU as bundled)")
+    parser.add_argument('--chunk-size', type=int, default=500_000)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--no-parquet', action='store_true', help="write CSV files only")
+    args = parser.parse_args()
+
+    frames = {}
+    for name in CODE_COLUMNS:
+        df = read_source(args.data_dir, name)
+        if df is not None:
+            frames[name] = df
+        elif name != AMAZON_SALES_FILE:
+            raise SystemExit(f"{name} not found in {args.data_dir}")
+
+    shift = code_shift(frames)
+    if AMAZON_SALES_FILE in frames:
+        amazon = frames[AMAZON_SALES_FILE]
+        date_format = DATASET_SCHEMAS[AMAZON_SALES_FILE]['dates']['date']
+        amazon = amazon.assign(date=pd.to_datetime(amazon['date'], format=date_format, errors='coerce'))
+    else:
+        print(f"{AMAZON_SALES_FILE} not found; building orders from the stock catalog and the notebook's order mix")
+        amazon = fallback_amazon_template(
+            frames[STOCK_REPORT_FILE], frames[INTERNATIONAL_SALES_FILE],
+            np.array(sorted(load_canonical_cities(os.path.join(args.data_dir, CITY_LOOKUP_FILE))), dtype=object),
+            np.random.default_rng([args.seed, 0])
+        )
+    international = frames[INTERNATIONAL_SALES_FILE]
+
+    scale = args.orders / len(amazon)
+    copies = args.catalog_copies or max(1, math.ceil(scale))
+    international_rows = args.international
+    if international_rows is None:
+        international_rows = max(1, round(len(international) * scale))
+
+    os.makedirs(args.output_dir, exist_ok=True)
+    parquet = not args.no_parquet
+    for index, name in enumerate([STOCK_REPORT_FILE, PRODUCT_INFO_2021_FILE, PRODUCT_INFO_2022_FILE]):
+        catalog = scale_catalog(name, frames[name], copies, shift, np.random.default_rng([args.seed, 4, index]))
+        write_dataset(os.path.join(args.output_dir, name), [catalog], parquet)
+
+    write_dataset(
+        os.path.join(args.output_dir, INTERNATIONAL_SALES_FILE),
+        international_chunks(international, international_rows, copies, shift, args.chunk_size, args.seed),
+        parquet, international_columnar
+    )
+
+    amazon_path = os.path.join(args.output_dir, AMAZON_SALES_FILE)
+    if os.path.exists(cube_path(amazon_path)):
+        os.remove(cube_path(amazon_path))
+    write_dataset(
+        amazon_path, amazon_chunks(amazon, args.orders, copies, shift, args.chunk_size, args.seed),
+        parquet, amazon_columnar
+    )
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+import json
+import os
+
+import pandas as pd
+import pytest
+
+import city_normalizer
+from city_normalizer import (
+    CITY_ALIASES, build_trigram_index, fuzzy_match, load_canonical_cities, lookup_version,
+    normalize_cities, resolve_city
+)
+
+LOOKUP_FILE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'indian_cities.xlsx')
+
+@pytest.fixture(scope='module')
+def canonical():
+    return load_canonical_cities(LOOKUP_FILE)
+
+@pytest.fixture(scope='module')
+def index(canonical):
+    return build_trigram_index(canonical)
+
+@pytest.mark.parametrize('raw, city', [
+    ('Bangalore', 'BENGALURU'),
+    ('BANGALORE (EAST)', 'BENGALURU'),
+    ('Bengaluru', 'BENGALURU'),
+    ('Mangalore', 'MANGALORE'),
+    ('Gurugram', 'GURGAON'),
+    ('Bombay', 'MUMBAI'),
+    ('Calcutta', 'KOLKATA'),
+    ('Madras', 'CHENNAI'),
+    ('Pune, Maharashtra', 'PUNE'),
+    ('Noida, Sector 62', 'NOIDA'),
+    ('Sector 62, Noida', 'NOIDA'),
+    ('Flat 2, Navi Mumbai', 'NAVI MUMBAI'),
+    ('NEW DELHI 110001', 'NEW DELHI'),
+    ('Thane West', 'THANE'),
+    ('', 'UNKNOWN')
+])
+def test_resolve_city(raw, city, canonical, index):
+    assert resolve_city(raw, canonical, index)[0] == city
+
+def test_aliases_point_at_canonical_names(canonical):
+    assert {target for target in CITY_ALIASES.values() if target not in canonical} == set()
+
+def test_fuzzy_match_rejects_a_different_city(index):
+    assert fuzzy_match('BANGALORE', index) is None
+
+def test_fuzzy_match_rejects_ties():
+    index = build_trigram_index({'ABCDEX', 'ABCDEY'})
+    assert fuzzy_match('ABCDEZ', index, threshold=0.5) is None
+
+def test_normalize_cities_uses_and_persists_the_cache(tmp_path):
+    cache_path = str(tmp_path / 'city_cache.json')
+    cities = pd.Series(['Bangalore', 'Pune, Maharashtra', None])
+    normalized = normalize_cities(cities, cache_path, LOOKUP_FILE)
+    assert normalized.tolist()[:2] == ['BENGALURU', 'PUNE']
+    assert pd.isna(normalized.iloc[2])
+    with open(cache_path) as f:
+        assert json.load(f)['cities']['Bangalore'] == 'BENGALURU'
+
+def test_cache_from_older_rules_is_discarded(tmp_path, monkeypatch):
+    cache_path = str(tmp_path / 'city_cache.json')
+    stale = {'lookup_version': lookup_version(LOOKUP_FILE), 'cities': {'Bangalore': 'MANGALORE'}, 'methods': {}}
+    with open(cache_path, 'w') as f:
+        json.dump(stale, f)
+    monkeypatch.setattr(city_normalizer, 'RESOLVER_VERSION', city_normalizer.RESOLVER_VERSION + 1)
+    assert normalize_cities(pd.Series(['Bangalore']), cache_path, LOOKUP_FILE).tolist() == ['BENGALURU']
@@ -0,0 +1,48 @@
+import io
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import exports
+from exports import EXPORT_FORMATS, frame_chunks, write_csv, write_excel, write_parquet
+
+@pytest.fixture
+def table():
+    return pd.DataFrame({
+        'sku': [f'SKU-{i}' for i in range(7)],
+        'stock': np.arange(7),
+        'price': [1.5, np.nan, 3.0, 4.25, 5.0, 6.5, 7.0]
+    })
+
+def test_frame_chunks(table):
+    assert [len(chunk) for chunk in frame_chunks(table, 3)] == [3, 3, 1]
+    assert [len(chunk) for chunk in frame_chunks(table.head(0), 3)] == [0]
+
+def test_csv_is_written_in_chunks_with_one_header(table, monkeypatch):
+    monkeypatch.setattr(exports, 'frame_chunks', lambda df: frame_chunks(df, 3))
+    out = io.BytesIO()
+    write_csv(table, out)
+    assert out.getvalue().count(b'sku,') == 1
+    pd.testing.assert_frame_equal(pd.read_csv(io.BytesIO(out.getvalue())), table)
+
+def test_parquet_round_trips(table):
+    out = io.BytesIO()
+    write_parquet(table, out)
+    pd.testing.assert_frame_equal(pd.read_parquet(io.BytesIO(out.getvalue())), table)
+
+def test_excel_continues_on_a_new_sheet(table, monkeypatch):
+    monkeypatch.setattr(exports, 'EXCEL_MAX_ROWS', 5)
+    out = io.BytesIO()
+    write_excel(table, out)
+    sheets = pd.read_excel(io.BytesIO(out.getvalue()), sheet_name=None)
+    assert list(sheets) == ['Sheet1', 'Sheet2']
+    pd.testing.assert_frame_equal(pd.concat(sheets.values(), ignore_index=True), table)
+
+def test_empty_tables_keep_their_header():
+    empty = pd.DataFrame(columns=['sku', 'stock'])
+    for _, _, writer in EXPORT_FORMATS.values():
+        writer(empty, io.BytesIO())
+    out = io.BytesIO()
+    write_excel(empty, out)
+    assert list(pd.read_excel(io.BytesIO(out.getvalue())).columns) == ['sku', 'stock']
@@ -0,0 +1,39 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import ingest_orders
+from ingest_orders import clean_orders
+
+def notebook_count(ids):
+    return len([i for i in ids.split(',') if i.strip() != ''])
+
+def raw_orders(promotions):
+    return pd.DataFrame({
+        'Order_ID': [f'ORDER-{i}' for i in range(len(promotions))],
+        'Order_Date': '04-30-22',
+        'Order_Status': 'Shipped',
+        'Sale_Amount': 100.0,
+        'Quantity': 1,
+        'Shipping_City': 'MUMBAI',
+        'Shipping_State': 'MAHARASHTRA',
+        'Shipping_Postal_Code': 400001,
+        'Promotion_IDs': promotions
+    })
+
+# City resolution is covered by test_city_normalizer.py
+@pytest.fixture(autouse=True)
+def keep_cities(monkeypatch):
+    monkeypatch.setattr(ingest_orders, 'normalize_cities', lambda cities: cities)
+
+@pytest.mark.parametrize('ids', [
+    '', ' ', ',', 'A', 'A,B', 'A, B,', 'D,,E', ',A', ' , A ,  ,B ', 'A,B,C,D',
+    'IN Core Free Shipping 2015/04/08 23-48-5-108', 'Amazon PLCC Free-Financing, IN Core Free Shipping 1,'
+])
+def test_promotion_id_count_matches_notebook(ids):
+    cleaned = clean_orders(raw_orders([ids]))
+    assert cleaned['Promotion_ID_Count'].tolist() == [notebook_count(ids)]
+
+def test_promotion_id_count_of_missing_ids_is_zero():
+    cleaned = clean_orders(raw_orders([np.nan, None, 'A,B']))
+    assert cleaned['Promotion_ID_Count'].tolist() == [0, 0, 2]
@@ -0,0 +1,34 @@
+import json
+
+import pytest
+
+import graphs
+from graphs import TRACE_HISTORY, append_trace, read_trace_history, tail_lines
+
+@pytest.fixture
+def trace_file(tmp_path):
+    graphs._trace_log.clear()
+    yield str(tmp_path / 'dashboard_trace.jsonl')
+    graphs._trace_log.clear()
+
+def test_tail_lines_reads_across_blocks(tmp_path, monkeypatch):
+    monkeypatch.setattr(graphs, 'TRACE_READ_BLOCK', 7)
+    path = tmp_path / 'lines.txt'
+    path.write_bytes(b''.join(f'line {i}\n'.encode() for i in range(100)))
+    assert tail_lines(str(path), 3) == [b'line 97\n', b'line 98\n', b'line 99\n']
+    assert len(tail_lines(str(path), 500)) == 100
+
+def test_read_trace_history_keeps_the_last_records(trace_file):
+    with open(trace_file, 'w') as f:
+        f.writelines(json.dumps({'rerun': i, 'spans': []}) + '\n' for i in range(20))
+    assert [record['rerun'] for record in read_trace_history(trace_file, 5)] == [15, 16, 17, 18, 19]
+    assert read_trace_history(trace_file + '.missing') == []
+
+def test_append_trace_truncates_the_file(trace_file):
+    for i in range(2 * TRACE_HISTORY + 10):
+        append_trace({'rerun': i, 'spans': []}, trace_file)
+    with open(trace_file) as f:
+        reruns = [json.loads(line)['rerun'] for line in f]
+    assert len(reruns) == TRACE_HISTORY + 10
+    assert reruns[-1] == 2 * TRACE_HISTORY + 9
+    assert reruns == list(range(reruns[0], reruns[-1] + 1))